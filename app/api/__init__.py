@@ -3,7 +3,7 @@
 This module initializes the API router and includes all route modules.
 """
 from fastapi import APIRouter
-from .routes import watchlist_router, learning_router, selectedcategories_router,dashboard_router
+from .routes import watchlist_router, learning_router, selectedcategories_router,dashboard_router, metrics_router
 # research_router
 
 # Create the main API router
@@ -14,4 +14,5 @@ api_router.include_router(watchlist_router, prefix="/watchlist", tags=["watchlis
 # api_router.include_router(research_router, tags=["research"])
 api_router.include_router(learning_router, tags=["learning"])
 api_router.include_router(selectedcategories_router, prefix="/selectedcategories", tags=["selectedcategories"])
-api_router.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
\ No newline at end of file
+api_router.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""API middleware package.
+
+This module exports the ASGI middleware installed on the app.
+"""
+from .compression import CompressionMiddleware
+from .etag import ETagMiddleware
+from .firestore_metrics import FirestoreMetricsMiddleware
+from .rate_limit import RateLimitMiddleware
+
+__all__ = ["CompressionMiddleware", "ETagMiddleware", "FirestoreMetricsMiddleware", "RateLimitMiddleware"]
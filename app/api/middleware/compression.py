@@ -0,0 +1,195 @@
+"""Response compression.
+
+``CompressionMiddleware`` compresses responses above a size threshold with
+brotli (when installed and accepted) or gzip. Responses that are already
+encoded, e.g. spliced from pre-compressed cached payloads by
+``PrecompressedJSONResponse``, are passed through untouched.
+
+Pre-compressed payloads are raw deflate data ending in a full flush, so they
+are byte aligned and do not reference earlier data. ``gzip_splice`` joins
+such segments into one deflate stream inside a single gzip member, which lets
+a cached article be compressed once and wrapped in a per-request envelope.
+"""
+import logging
+import os
+import struct
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+# Streaming responses are flushed per chunk, so they are not buffered for compression
+UNCOMPRESSED_MEDIA_TYPES = ("application/x-ndjson", "text/event-stream")
+COMPRESSIBLE_MEDIA_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+
+# Gzip header: magic, deflate, no flags, no mtime, no extra flags, unknown OS
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+# Final empty deflate block
+_DEFLATE_END = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS).flush(zlib.Z_FINISH)
+
+
+def deflate_segment(data: bytes, level: int = GZIP_LEVEL) -> bytes:
+    """Compress data into a self-contained, byte-aligned raw deflate segment."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+
+def gzip_splice(segments: Iterable[Tuple[bytes, Optional[bytes]]]) -> bytes:
+    """Build a gzip body from segments, reusing pre-compressed ones.
+
+    Args:
+        segments: ``(data, deflated)`` pairs, where ``deflated`` is the
+            ``deflate_segment`` of ``data`` or None to compress it here
+
+    Returns:
+        A single-member gzip body of the concatenated data
+    """
+    parts: List[bytes] = [_GZIP_HEADER]
+    crc = 0
+    size = 0
+    for data, deflated in segments:
+        parts.append(deflated if deflated is not None else deflate_segment(data))
+        crc = zlib.crc32(data, crc)
+        size += len(data)
+    parts.append(_DEFLATE_END)
+    parts.append(struct.pack("<II", crc, size & 0xFFFFFFFF))
+    return b"".join(parts)
+
+
+def _header(headers: Iterable, name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def accepted_encodings(scope) -> List[str]:
+    """Get the content codings a request accepts, without q=0 entries."""
+    header = _header(scope.get("headers", []), b"accept-encoding") or ""
+    encodings = []
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            encodings.append(coding.strip().lower())
+    return encodings
+
+
+def vary_headers(headers: Iterable) -> List[Tuple[bytes, bytes]]:
+    """Add Accept-Encoding to the Vary header of a response.
+
+    Caches must not serve a compressed representation to a client that did
+    not accept it, nor an identity one in its place, so every response that
+    could be compressed varies on Accept-Encoding, whether it was or not.
+    """
+    rewritten = []
+    has_vary = False
+    for key, value in headers:
+        if key.lower() == b"vary":
+            has_vary = True
+            if b"accept-encoding" not in value.lower() and value.strip() != b"*":
+                value += b", Accept-Encoding"
+        rewritten.append((key, value))
+    if not has_vary:
+        rewritten.append((b"vary", b"Accept-Encoding"))
+    return rewritten
+
+
+def encoded_headers(headers: Iterable, encoding: str, length: int) -> List[Tuple[bytes, bytes]]:
+    """Rewrite response headers for an encoded body.
+
+    The ETag is weakened, as the encoded body is a different representation.
+    """
+    rewritten = []
+    for key, value in headers:
+        name = key.lower()
+        if name == b"content-length":
+            continue
+        if name == b"etag" and not value.startswith(b"W/"):
+            value = b"W/" + value
+        rewritten.append((key, value))
+    rewritten.append((b"content-encoding", encoding.encode("latin-1")))
+    rewritten.append((b"content-length", str(length).encode("latin-1")))
+    return vary_headers(rewritten)
+
+
+class CompressionMiddleware:
+    """Compress sizeable responses with brotli or gzip, depending on Accept-Encoding."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    def _choose_encoding(self, scope) -> Optional[str]:
+        encodings = accepted_encodings(scope)
+        if brotli is not None and "br" in encodings:
+            return "br"
+        if "gzip" in encodings:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(scope)
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = _header(headers, b"content-type") or ""
+                if (
+                    _header(headers, b"content-encoding") is not None
+                    or content_type.startswith(UNCOMPRESSED_MEDIA_TYPES)
+                    or not content_type.startswith(COMPRESSIBLE_MEDIA_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                if encoding is None or message["status"] in (204, 304):
+                    # Sent as is, but another client may get this response compressed
+                    passthrough = True
+                    await send({**message, "headers": vary_headers(headers)})
+                    return
+                start = message
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            if len(body) < self.minimum_size:
+                await send({**start, "headers": vary_headers(start.get("headers", []))})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            if encoding == "br":
+                compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+            else:
+                compressed = gzip_splice([(body, None)])
+            await send({**start, "headers": encoded_headers(start.get("headers", []), encoding, len(compressed))})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,149 @@
+"""ETags and conditional GETs for cacheable content endpoints.
+
+Routes that know the version of the content they serve set an ETag derived
+from it (``make_etag``) and can answer ``If-None-Match`` with a 304 before
+loading or generating anything (``etag_matches`` / ``not_modified``). For
+other responses on the configured paths the middleware hashes the body.
+Either way, a matching ``If-None-Match`` gets a 304 without a body.
+"""
+import hashlib
+import logging
+from typing import Iterable, Optional
+
+from fastapi import Response
+
+logger = logging.getLogger(__name__)
+
+# Content is per user and changes at most daily, so clients keep it but revalidate
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+# GET endpoints whose responses get ETags
+ETAG_PATH_PREFIXES = (
+    "/article/topic/",
+    "/watchlist/research/",
+    "/dashboard/home/",
+    "/dashboard/news/",
+)
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the parts that identify a content version."""
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode("utf-8"), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def _body_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches an ETag.
+
+    Uses the weak comparison that RFC 9110 prescribes for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """Build a 304 response for an ETag."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+
+def _header(headers: Iterable, name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ETagMiddleware:
+    """Add ETags to JSON GET responses on content paths and answer conditional GETs."""
+
+    def __init__(self, app, path_prefixes: Iterable[str] = ETAG_PATH_PREFIXES):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = _header(scope.get("headers", []), b"if-none-match")
+        start = None
+        chunks = []
+        passthrough = False
+        not_modified_sent = False
+
+        async def send_with_etag(message):
+            nonlocal start, passthrough, not_modified_sent
+
+            if passthrough:
+                await send(message)
+                return
+            if not_modified_sent:
+                return
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = _header(headers, b"content-type") or ""
+                if message["status"] != 200 or not content_type.startswith("application/json"):
+                    passthrough = True
+                    await send(message)
+                    return
+
+                start = message
+                etag = _header(headers, b"etag")
+                if etag is not None:
+                    # The route versioned the content itself, no need to buffer the body
+                    if etag_matches(if_none_match, etag):
+                        not_modified_sent = True
+                        await self._send_not_modified(send, etag)
+                        return
+                    passthrough = True
+                    await send(self._with_cache_headers(start))
+                return
+
+            # Buffer the body so it can be hashed
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = _body_etag(body)
+            if etag_matches(if_none_match, etag):
+                await self._send_not_modified(send, etag)
+                return
+            await send(self._with_cache_headers(start, etag))
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
+
+    @staticmethod
+    def _with_cache_headers(start, etag: Optional[str] = None):
+        headers = list(start.get("headers", []))
+        if etag is not None:
+            headers.append((b"etag", etag.encode("latin-1")))
+        if _header(headers, b"cache-control") is None:
+            headers.append((b"cache-control", ETAG_CACHE_CONTROL.encode("latin-1")))
+        return {**start, "headers": headers}
+
+    @staticmethod
+    async def _send_not_modified(send, etag: str):
+        await send({
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [
+                (b"etag", etag.encode("latin-1")),
+                (b"cache-control", ETAG_CACHE_CONTROL.encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
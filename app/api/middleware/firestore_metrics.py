@@ -0,0 +1,68 @@
+"""Per-request Firestore operation accounting."""
+import logging
+import os
+
+from app.services.firebase.instrumentation import (
+    finish_request_stats,
+    get_request_stats,
+    record_route_stats,
+    start_request_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+# Set FIRESTORE_SERVER_TIMING=1 to report each request's Firestore usage in a Server-Timing header
+FIRESTORE_SERVER_TIMING = os.environ.get("FIRESTORE_SERVER_TIMING", "0") == "1"
+
+
+def _route_name(scope) -> str:
+    """Identify a request by method and endpoint, e.g. ``GET learning.get_yearly_heatmap``.
+
+    The endpoint is used rather than the raw path so that path parameters
+    (symbols, topic IDs) do not create a separate entry per value.
+    """
+    route = scope.get("route")
+    endpoint = getattr(route, "endpoint", None)
+    if endpoint is None:
+        return f"{scope.get('method', '')} unmatched"
+    module = endpoint.__module__.rsplit(".", 1)[-1]
+    return f"{scope.get('method', '')} {module}.{endpoint.__name__}"
+
+
+def _server_timing(stats) -> bytes:
+    """Format request stats as a Server-Timing header value."""
+    totals = stats.to_dict()
+    return (
+        f'firestore;dur={totals["duration_ms"]};'
+        f'desc="reads={totals["reads"]} writes={totals["writes"]} deletes={totals["deletes"]} '
+        f'queries={totals["queries"]} docs={totals["documents"]} bytes={totals["bytes"]}"'
+    ).encode("latin-1")
+
+
+class FirestoreMetricsMiddleware:
+    """Count the Firestore operations of each HTTP request and aggregate them per route."""
+
+    def __init__(self, app, server_timing: bool = FIRESTORE_SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_request_stats()
+        stats = get_request_stats()
+
+        async def send_with_timing(message):
+            if self.server_timing and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stats)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finish_request_stats(token)
+            record_route_stats(_route_name(scope), stats)
@@ -0,0 +1,233 @@
+"""Per-user token bucket rate limiting.
+
+Each user (the ``user_id`` query parameter, or the client address when a
+request has none) gets two token buckets:
+
+    requests: every request; when it is empty the request is rejected with a
+        429 and a Retry-After header.
+    refresh: ``refresh=true`` on endpoints that generate content with the
+        LLM. When it is empty the request is not rejected but degraded: the
+        refresh flag is dropped so the route serves its cached result, and the
+        response carries an ``X-RateLimit-Degraded: refresh`` header.
+
+Buckets are refilled continuously and kept in memory per process, so the
+limits apply per instance. Budgets are configured with
+RATE_LIMIT_REQUESTS_PER_MINUTE / RATE_LIMIT_REQUESTS_BURST and
+RATE_LIMIT_REFRESHES_PER_HOUR / RATE_LIMIT_REFRESHES_BURST; set
+RATE_LIMIT=0 to disable limiting.
+"""
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT", "1") != "0"
+RATE_LIMIT_REQUESTS_PER_MINUTE = float(os.environ.get("RATE_LIMIT_REQUESTS_PER_MINUTE", 120))
+RATE_LIMIT_REQUESTS_BURST = float(os.environ.get("RATE_LIMIT_REQUESTS_BURST", 60))
+RATE_LIMIT_REFRESHES_PER_HOUR = float(os.environ.get("RATE_LIMIT_REFRESHES_PER_HOUR", 20))
+RATE_LIMIT_REFRESHES_BURST = float(os.environ.get("RATE_LIMIT_REFRESHES_BURST", 5))
+
+REQUESTS_BUDGET = "requests"
+REFRESH_BUDGET = "refresh"
+
+# Endpoints where refresh=true forces a new LLM generation
+GENERATION_PATH_PREFIXES = (
+    "/article/topic/",
+    "/summary",
+    "/user/recommendedtopics",
+    "/dashboard/home",
+    "/dashboard/news/",
+    "/watchlist/research/",
+    "/watchlist/analysis/",
+    "/watchlist/related/",
+)
+
+# Operational endpoints that are never limited
+EXEMPT_PATH_PREFIXES = ("/health", "/metrics/")
+
+MAX_TRACKED_BUCKETS = 10000
+TOP_LIMITED_USERS = 10
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _anonymize(user: str) -> str:
+    """Replace the id in a ``user:`` or ``ip:`` client key with a short hash, for metrics."""
+    kind, _, value = user.partition(":")
+    return f"{kind}:{hashlib.sha256(value.encode('utf-8')).hexdigest()[:12]}"
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second up to ``capacity``."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated", "limited")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.limited = 0
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take tokens from the bucket.
+
+        Args:
+            cost: Tokens the request costs
+
+        Returns:
+            0 if the tokens were taken, else the seconds until enough are refilled
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        self.limited += 1
+        # A budget without refill never recovers; report an hour so clients back off
+        return (cost - self.tokens) / self.rate if self.rate > 0 else 3600.0
+
+
+class RateLimiter:
+    """Buckets per user and budget, evicting the least recently used beyond a bound."""
+
+    def __init__(self, budgets: Dict[str, Tuple[float, float]], max_buckets: int = MAX_TRACKED_BUCKETS):
+        self.budgets = budgets
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.totals = {budget: {"allowed": 0, "limited": 0} for budget in self.budgets}
+        for bucket in self._buckets.values():
+            bucket.limited = 0
+
+    def take(self, user: str, budget: str) -> float:
+        """Spend one token of a user's budget; returns the seconds to wait, 0 if allowed."""
+        key = (user, budget)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            capacity, rate = self.budgets[budget]
+            bucket = self._buckets[key] = TokenBucket(capacity, rate)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        retry_after = bucket.take()
+        self.totals[budget]["limited" if retry_after else "allowed"] += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        budgets = {}
+        for budget, (capacity, rate) in self.budgets.items():
+            limited = sorted(
+                ((user, bucket.limited) for (user, name), bucket in self._buckets.items()
+                 if name == budget and bucket.limited),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+            budgets[budget] = {
+                "burst": capacity,
+                "refill_per_second": round(rate, 4),
+                **self.totals[budget],
+                "top_limited_users": [
+                    {"user": _anonymize(user), "limited": count} for user, count in limited[:TOP_LIMITED_USERS]
+                ],
+            }
+        return {
+            "enabled": RATE_LIMIT_ENABLED,
+            "tracked_buckets": len(self._buckets),
+            "budgets": budgets,
+        }
+
+
+_limiter = RateLimiter({
+    REQUESTS_BUDGET: (RATE_LIMIT_REQUESTS_BURST, RATE_LIMIT_REQUESTS_PER_MINUTE / 60),
+    REFRESH_BUDGET: (RATE_LIMIT_REFRESHES_BURST, RATE_LIMIT_REFRESHES_PER_HOUR / 3600),
+})
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """Get allowed and limited counts per budget and the most limited users, by hashed id."""
+    return _limiter.stats()
+
+
+def reset_rate_limit_stats() -> None:
+    """Clear the rate limit counters; the buckets keep their tokens."""
+    _limiter.reset_stats()
+
+
+def _client_key(scope, params) -> Optional[str]:
+    for key, value in params:
+        if key == "user_id" and value:
+            return f"user:{value}"
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else None
+
+
+class RateLimitMiddleware:
+    """Reject users over their request budget and degrade refreshes over their refresh budget."""
+
+    def __init__(self, app, limiter: RateLimiter = _limiter, enabled: bool = RATE_LIMIT_ENABLED):
+        self.app = app
+        self.limiter = limiter
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(EXEMPT_PATH_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        params = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        user = _client_key(scope, params)
+        if user is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.limiter.take(user, REQUESTS_BUDGET)
+        if retry_after:
+            logger.warning(f"Rate limited {user} on {scope['path']}, retry in {retry_after:.1f}s")
+            response = JSONResponse(
+                {"detail": "Too many requests, please retry later"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+
+        refresh = any(key == "refresh" and value.lower() in _TRUE_VALUES for key, value in params)
+        if not refresh or not scope["path"].startswith(GENERATION_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.take(user, REFRESH_BUDGET):
+            await self.app(scope, receive, send)
+            return
+
+        # Out of refreshes: serve the cached result instead of generating a new one
+        logger.info(f"Refresh budget of {user} exhausted, serving cached {scope['path']}")
+        query = urlencode([(key, value) for key, value in params if key != "refresh"])
+        scope = {**scope, "query_string": query.encode("latin-1")}
+
+        async def send_degraded(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-ratelimit-degraded", b"refresh"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_degraded)
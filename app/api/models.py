@@ -89,6 +89,21 @@ class AddAssetRequest(BaseModel):
             }
         }
 
+class AssetRef(BaseModel):
+    symbol: str
+    asset_type: AssetType
+
+class BulkAddAssetsRequest(BaseModel):
+    assets: List[AddAssetRequest] = Field(..., min_items=1, max_items=100)
+
+class BulkRemoveAssetsRequest(BaseModel):
+    assets: List[AssetRef] = Field(..., min_items=1, max_items=100)
+
+class UpdateNotesRequest(BaseModel):
+    symbol: str
+    asset_type: AssetType
+    notes: Optional[str] = None
+
 class WatchlistItem(BaseModel):
     symbol: str
     asset_type: AssetType
@@ -0,0 +1,145 @@
+"""Fast JSON serialization for API responses.
+
+Responses are serialized with orjson when it is installed, falling back to
+the standard library otherwise. Routes returning large payloads can return a
+``FastJSONResponse`` directly to skip FastAPI's ``jsonable_encoder`` pass, and
+embed already serialized JSON (e.g. a cached article) with ``json_fragment``.
+
+Cached content can also be kept as a ``PrecompressedJSON`` payload, which
+``PrecompressedJSONResponse`` sends gzip-encoded without compressing it again.
+
+Progressive endpoints stream newline-delimited JSON messages (``ndjson_line``)
+with ``NDJSONResponse``.
+"""
+import json
+import uuid
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterable, Dict, NamedTuple, Optional
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from app.api.middleware.compression import (
+    COMPRESSION_MINIMUM_SIZE,
+    accepted_encodings,
+    deflate_segment,
+    encoded_headers,
+    gzip_splice,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the JSON encoders do not handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8")
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    if hasattr(obj, "tolist"):
+        # numpy scalars and arrays, e.g. from yfinance
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_fragment(serialized: bytes) -> Any:
+    """Wrap serialized JSON so it is embedded verbatim when its parent is serialized.
+
+    Falls back to the decoded value when orjson is not installed or predates
+    ``orjson.Fragment`` (3.10).
+    """
+    if orjson is None:
+        return json.loads(serialized)
+    if not hasattr(orjson, "Fragment"):
+        return orjson.loads(serialized)
+    return orjson.Fragment(serialized)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, used as the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ndjson_line(message_type: str, **fields: Any) -> bytes:
+    """Serialize one typed NDJSON message, including its trailing newline."""
+    return dumps({"type": message_type, **fields}) + b"\n"
+
+
+class NDJSONResponse(StreamingResponse):
+    """Streaming response of NDJSON messages, flushed as they are produced."""
+
+    def __init__(self, content: AsyncIterable[bytes], status_code: int = 200, headers: Optional[Dict[str, str]] = None):
+        super().__init__(content, status_code=status_code, headers=headers, media_type="application/x-ndjson")
+
+
+class PrecompressedJSON(NamedTuple):
+    """Serialized JSON together with its deflate segment."""
+    json: bytes
+    deflated: bytes
+
+
+def precompress(content: Any) -> PrecompressedJSON:
+    """Serialize content and compress it once for reuse in gzip responses."""
+    serialized = dumps(content)
+    return PrecompressedJSON(serialized, deflate_segment(serialized))
+
+
+class PrecompressedJSONResponse(FastJSONResponse):
+    """JSON response embedding a pre-compressed payload in a per-request envelope.
+
+    When the client accepts gzip, only the small envelope is compressed and
+    the payload's stored deflate segment is spliced in.
+    """
+
+    def __init__(
+        self,
+        content: Dict[str, Any],
+        payload_field: str,
+        payload: PrecompressedJSON,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        # Serialize the envelope around a placeholder, then split on it
+        placeholder = f"__payload_{uuid.uuid4().hex}__"
+        envelope = dumps({**content, payload_field: placeholder})
+        self._prefix, _, self._suffix = envelope.partition(dumps(placeholder))
+        self._payload = payload
+        super().__init__(None, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return self._prefix + self._payload.json + self._suffix
+
+    async def __call__(self, scope, receive, send):
+        if len(self.body) >= COMPRESSION_MINIMUM_SIZE and "gzip" in accepted_encodings(scope):
+            self.body = gzip_splice([
+                (self._prefix, None),
+                (self._payload.json, self._payload.deflated),
+                (self._suffix, None),
+            ])
+            self.raw_headers = encoded_headers(self.raw_headers, "gzip", len(self.body))
+        await super().__call__(scope, receive, send)
@@ -7,5 +7,6 @@ from .watchlist import router as watchlist_router
 from .learning import router as learning_router
 from .selectedcategories import router as selectedcategories_router
 from .dashboard import router as dashboard_router
+from .metrics import router as metrics_router
 
-__all__ = ["watchlist_router", "learning_router", "selectedcategories_router", "dashboard_router"]
+__all__ = ["watchlist_router", "learning_router", "selectedcategories_router", "dashboard_router", "metrics_router"]
@@ -3,8 +3,10 @@
 This module provides endpoints for the user dashboard including daily content and trending news.
 """
 import asyncio
+import os
 import time
-from fastapi import APIRouter, Query
+from functools import partial
+from fastapi import APIRouter, Query, Request, Response
 from typing import Dict, Any
 from datetime import datetime
 import logging
@@ -12,32 +14,140 @@ import logging
 logger = logging.getLogger(__name__)
 
 from app.api.models import DashboardEssentialResponse, DashboardNewsResponse
-from app.services.dashboard.cache import get_cached_finance_quote_async, get_cached_glossary_term_async, get_cached_news_article, get_cached_trending_news
-from app.services.firebase.watchlist import get_user_expertise_level, get_user_interests
+from app.services.dashboard.cache import get_cached_finance_quote_async, get_cached_glossary_term_async, get_cached_news_article, get_cached_trending_news_async, load_shared, load_with_deadline
+from app.services.firebase.watchlist import DEFAULT_PREFERENCES, get_user_expertise_level, get_user_preferences
+from app.services.firebase.cache import get_content_version
+from app.api.middleware.etag import etag_matches, make_etag, not_modified
+from app.api.responses import PrecompressedJSONResponse
+from app.services.firebase.trending_news import get_news_article_payload, get_news_article_version, get_trending_news_version
+from app.services.workers import FIRESTORE_POOL, LLM_POOL, run_in_pool
 
 
 router = APIRouter()
 
+# Per-section deadlines of the aggregated dashboard, in seconds
+PREFERENCES_DEADLINE = float(os.environ.get("DASHBOARD_PREFERENCES_DEADLINE_SECONDS", 0.5))
+GLOSSARY_DEADLINE = float(os.environ.get("DASHBOARD_GLOSSARY_DEADLINE_SECONDS", 1.0))
+QUOTE_DEADLINE = float(os.environ.get("DASHBOARD_QUOTE_DEADLINE_SECONDS", 1.0))
+NEWS_DEADLINE = float(os.environ.get("DASHBOARD_NEWS_DEADLINE_SECONDS", 1.5))
+
+# Endpoints that return a section left pending by the aggregated dashboard
+SECTION_ENDPOINTS = {
+    "glossary_term": "/dashboard/home/essential",
+    "quote": "/dashboard/home/essential",
+    "trending_news": "/dashboard/home/news",
+}
+
+
+def _load_glossary(expertise_level: str, refresh: bool):
+    """Key and loader of the glossary section."""
+    key = f"glossary:{expertise_level}:{'refresh' if refresh else 'cached'}"
+    return key, partial(get_cached_glossary_term_async, expertise_level, force_refresh=refresh)
+
+
+def _load_quote(refresh: bool):
+    """Key and loader of the quote section."""
+    key = f"quote:{'refresh' if refresh else 'cached'}"
+    return key, partial(get_cached_finance_quote_async, force_refresh=refresh)
+
+
+def _load_trending_news(expertise_level: str, interests, refresh: bool):
+    """Key and loader of the trending news section."""
+    key = f"trending_news:{expertise_level}:{'refresh' if refresh else 'cached'}"
+    return key, partial(get_cached_trending_news_async, expertise_level, interests, force_refresh=refresh)
+
+
+@router.get("/home")
+async def get_dashboard_home(
+    user_id: str = Query(...),
+    refresh: bool = Query(False)
+) -> Dict[str, Any]:
+    """Get the whole dashboard within bounded latency.
+    
+    Glossary, quote and trending news load concurrently, each with its own
+    deadline. Sections that miss their deadline (or fail) are returned as
+    None and listed in ``pending`` with the endpoint to fetch them from; their
+    loads keep running, so the follow-up fetch is served from cache or joins
+    the load in flight.
+    
+    Args:
+        user_id: User identifier
+        refresh: Force refresh cached content
+        
+    Returns:
+        Dashboard sections that are ready, and the pending ones
+    """
+    try:
+        preferences = await asyncio.wait_for(run_in_pool(FIRESTORE_POOL, get_user_preferences, user_id), PREFERENCES_DEADLINE)
+    except asyncio.TimeoutError:
+        logger.warning(f"Preferences for user {user_id} missed their deadline, using defaults")
+        preferences = dict(DEFAULT_PREFERENCES)
+    expertise_level = preferences.get('expertise_level', 'beginner')
+    interests = preferences.get('categories', [])
+    
+    sections = {
+        "glossary_term": (_load_glossary(expertise_level, refresh), GLOSSARY_DEADLINE),
+        "quote": (_load_quote(refresh), QUOTE_DEADLINE),
+        "trending_news": (_load_trending_news(expertise_level, interests, refresh), NEWS_DEADLINE),
+    }
+    results = await asyncio.gather(
+        *(load_with_deadline(key, loader, deadline) for (key, loader), deadline in sections.values()),
+        return_exceptions=True
+    )
+    
+    dashboard = {
+        "user_id": user_id,
+        "expertise_level": expertise_level,
+    }
+    pending = {}
+    for name, result in zip(sections, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error loading dashboard section {name}: {str(result)}")
+            ready, value = False, None
+        else:
+            ready, value = result
+        dashboard[name] = value
+        if not ready:
+            pending[name] = SECTION_ENDPOINTS[name]
+    
+    dashboard["pending"] = pending
+    dashboard["timestamp"] = datetime.now()
+    return dashboard
+
+
+def _essential_etag(user_id: str, expertise_level: str):
+    """ETag of the essential dashboard content, if its cached versions are known."""
+    glossary_version = get_content_version(f"glossary:{expertise_level}")
+    quote_version = get_content_version("quote")
+    if not glossary_version or not quote_version:
+        return None
+    return make_etag("essential", user_id, expertise_level, glossary_version, quote_version)
+
 @router.get("/home/essential", response_model=DashboardEssentialResponse)
 async def get_dashboard_essential_content(
+    request: Request,
+    response: Response,
     user_id: str = Query(...),
     refresh: bool = Query(False)
 ) -> DashboardEssentialResponse:
     """Get lighter dashboard content (glossary and quote) with parallel execution."""
     # Get user's expertise level
-    expertise_level = get_user_expertise_level(user_id)
+    expertise_level = await run_in_pool(FIRESTORE_POOL, get_user_expertise_level, user_id)
     
-    # Create tasks for parallel execution
-    glossary_task = asyncio.create_task(
-        get_cached_glossary_term_async(expertise_level, force_refresh=refresh)
-    )
-    quote_task = asyncio.create_task(
-        get_cached_finance_quote_async(force_refresh=refresh)
-    )
+    etag = None if refresh else _essential_etag(user_id, expertise_level)
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    # Run both loads concurrently, joining any already in flight
+    glossary_task = load_shared(*_load_glossary(expertise_level, refresh))
+    quote_task = load_shared(*_load_quote(refresh))
     
-    # Run both tasks concurrently
     glossary_terms, quote = await asyncio.gather(glossary_task, quote_task)
     
+    etag = _essential_etag(user_id, expertise_level)
+    if etag:
+        response.headers["ETag"] = etag
+    
     return DashboardEssentialResponse(
         user_id=user_id,
         expertise_level=expertise_level,
@@ -47,21 +157,31 @@ async def get_dashboard_essential_content(
     )
 
 @router.get("/home/news", response_model=DashboardNewsResponse)
-def get_dashboard_news(
+async def get_dashboard_news(
+    request: Request,
+    response: Response,
     user_id: str = Query(...),
     refresh: bool = Query(False)
 ) -> DashboardNewsResponse:
     """Get trending news for the dashboard."""
     # Get user's expertise level and interests
-    expertise_level = get_user_expertise_level(user_id)
-    interests = get_user_interests(user_id)
+    preferences = await run_in_pool(FIRESTORE_POOL, get_user_preferences, user_id)
+    expertise_level = preferences.get('expertise_level', 'beginner')
+    interests = preferences.get('categories', [])
+    version_key = f"trending_news:{expertise_level}"
     
-    # Get trending news
-    trending_news = get_cached_trending_news(
-        expertise_level=expertise_level,
-        interests=interests,
-        force_refresh=refresh
-    )
+    version = None if refresh else await run_in_pool(FIRESTORE_POOL, get_trending_news_version, expertise_level)
+    if version:
+        etag = make_etag(version_key, user_id, version)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+    
+    # Get trending news, joining a load already in flight
+    trending_news = await load_shared(*_load_trending_news(expertise_level, interests, refresh))
+    
+    version = get_content_version(version_key)
+    if version:
+        response.headers["ETag"] = make_etag(version_key, user_id, version)
     
     return DashboardNewsResponse(
         user_id=user_id,
@@ -72,6 +192,8 @@ def get_dashboard_news(
 
 @router.get("/news/{news_id}")
 async def get_news_article(
+    request: Request,
+    response: Response,
     news_id: str,
     user_id: str = Query(...),
     refresh: bool = Query(False)
@@ -90,10 +212,31 @@ async def get_news_article(
     
     try:
         # Get user's expertise level
-        expertise_level = get_user_expertise_level(user_id)
+        expertise_level = await run_in_pool(FIRESTORE_POOL, get_user_expertise_level, user_id)
+        version_key = f"news_article:{news_id}:{expertise_level}"
+        
+        # Answer a conditional GET from the stored article version without loading the article
+        version = None if refresh else await run_in_pool(FIRESTORE_POOL, get_news_article_version, news_id, expertise_level)
+        if version:
+            etag = make_etag(version_key, user_id, version)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return not_modified(etag)
         
-        # Get cached or generate new article
-        article = await asyncio.to_thread(
+        # Cached articles are served as pre-serialized, pre-compressed bytes
+        payload = None if refresh else await run_in_pool(FIRESTORE_POOL, get_news_article_payload, news_id, expertise_level)
+        if payload is not None:
+            version = get_content_version(version_key)
+            headers = {"ETag": make_etag(version_key, user_id, version)} if version else None
+            return PrecompressedJSONResponse({
+                "user_id": user_id,
+                "news_id": news_id,
+                "expertise_level": expertise_level,
+                "timestamp": datetime.now().isoformat()
+            }, "article", payload, headers=headers)
+        
+        # Generate new article
+        article = await run_in_pool(
+            LLM_POOL,
             get_cached_news_article, 
             news_id, 
             expertise_level,
@@ -103,6 +246,10 @@ async def get_news_article(
         elapsed = time.time() - start_time
         logger.info(f"Article generated in {elapsed:.2f}s (cached: {not refresh})")
         
+        version = get_content_version(version_key)
+        if version:
+            response.headers["ETag"] = make_etag(version_key, user_id, version)
+        
         return {
             "user_id": user_id,
             "news_id": news_id,
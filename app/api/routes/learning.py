@@ -4,8 +4,7 @@ This module provides endpoints for financial learning and educational content.
 """
 import asyncio
 from datetime import datetime, timedelta
-from functools import partial
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Dict, Any, Optional, List
 from enum import Enum
 import calendar
@@ -27,15 +26,18 @@ from app.services.firebase.reading_log import (
 )
 from app.services.ai.perplexity import generate_article, generate_quiz_questions
 from app.api.models import DeepDiveResponse,ArticleResponse, TooltipView
-from app.services.firebase.cache import cache_article, cache_topics, get_cached_article, get_cached_topics,find_topic_by_id, get_cached_topics_fast, get_cached_user_preferences, get_topic_by_id_fast
+from app.services.firebase.cache import cache_article, cache_topics, get_cached_article, get_cached_article_payload, get_cached_topics,find_topic_by_id, get_cached_topics_fast, get_cached_user_preferences, get_topic_by_id_fast
 from app.services.firebase.categories import get_user_categories
 
 from app.services.firebase.cache import should_refresh_topics
 from app.services.firebase.reading_log import log_tooltip_viewed
 
 from app.services.firebase.selectedcategories import get_user_selected_categories
-from app.services.firebase.cache import get_cache_timestamp
+from app.services.firebase.cache import get_article_version, get_cache_timestamp, get_content_version
+from app.api.middleware.etag import etag_matches, make_etag, not_modified
+from app.api.responses import FastJSONResponse, NDJSONResponse, PrecompressedJSONResponse, json_fragment, ndjson_line
 from app.services.firebase.watchlist import get_user_expertise_level
+from app.services.workers import FIRESTORE_POOL, LLM_POOL, run_in_pool, submit_background
 
 # Define expertise levels as an enum for validation
 class ExpertiseLevel(str, Enum):
@@ -60,12 +62,9 @@ async def get_user_recommended_topics(
         List of recommended topics across user's selected categories
     """
     # 1. First get user preferences
-    cached_preferences = get_cached_user_preferences(user_id)
-    if cached_preferences:
-        expertise_level = cached_preferences.get("expertise_level", "intermediate")
-        selected_categories = cached_preferences.get("categories", [])
-    else:
-        user_preferences = get_user_selected_categories(user_id)
+    user_preferences = get_cached_user_preferences(user_id)
+    if not user_preferences:
+        user_preferences = await run_in_pool(FIRESTORE_POOL, get_user_selected_categories, user_id)
     
     
     if not user_preferences:
@@ -95,17 +94,13 @@ async def get_user_recommended_topics(
     
     # Define an async function to process each category
     async def process_category(cat):
-        need_refresh = refresh or should_refresh_topics(cat, expertise_level)
+        need_refresh = refresh or await run_in_pool(FIRESTORE_POOL, should_refresh_topics, cat, expertise_level)
         
         if need_refresh:
-            # Run CPU-intensive operation in a thread pool
-            loop = asyncio.get_event_loop()
-            topics = await loop.run_in_executor(
-                None, 
-                partial(get_daily_topics, cat, expertise_level, user_id)
-            )
+            # Generate topics on the LLM pool
+            topics = await run_in_pool(LLM_POOL, get_daily_topics, cat, expertise_level, user_id)
         else:
-            topics = get_cached_topics_fast(cat, expertise_level) or []
+            topics = await run_in_pool(FIRESTORE_POOL, get_cached_topics_fast, cat, expertise_level) or []
         
         return cat, topics[:2] if topics else []
 
@@ -122,7 +117,7 @@ async def get_user_recommended_topics(
     start_date = end_date - timedelta(days=7)
     
     # 5. Get unified reading history for all categories
-    user_history = get_user_read_history(user_id, start_date, end_date)
+    user_history = await run_in_pool(FIRESTORE_POOL, get_user_read_history, user_id, start_date, end_date)
 
     # 6. Create a lookup dictionary for efficiency
     viewed_topics_by_category = {}
@@ -143,7 +138,7 @@ async def get_user_recommended_topics(
     # 8. Get cache refresh timestamp
     cache_time = None
     if categories_to_process:
-        cache_time = get_cache_timestamp(categories_to_process[0], expertise_level)
+        cache_time = await run_in_pool(FIRESTORE_POOL, get_cache_timestamp, categories_to_process[0], expertise_level)
     
     return {
         "user_id": user_id,
@@ -155,6 +150,7 @@ async def get_user_recommended_topics(
 
 @router.get("/article/topic/{topic_id}")
 async def get_topic_article(
+    request: Request,
     user_id: str,
     topic_id: str,
     level: ExpertiseLevel = None,  # Optional - will use the topic's level if not specified
@@ -171,7 +167,7 @@ async def get_topic_article(
         Generated article with tooltips for the specific topic
     """
     # Get the topic details from cache
-    topic = get_topic_by_id_fast(topic_id)
+    topic = await run_in_pool(FIRESTORE_POOL, get_topic_by_id_fast, topic_id)
     
     if not topic:
         raise HTTPException(status_code=404, detail=f"Topic with ID {topic_id} not found")
@@ -180,63 +176,72 @@ async def get_topic_article(
     expertise_level = level.value if level else topic.get("expertise_level", "intermediate")
     category = topic.get("category")
     title = topic.get("title")
+    version_key = f"article:{topic_id}:{expertise_level}"
+    
+    # Answer a conditional GET from the stored article version without loading the article
+    version = None if refresh else await run_in_pool(FIRESTORE_POOL, get_article_version, topic_id, expertise_level)
+    if version:
+        etag = make_etag(version_key, user_id, version)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            submit_background(
+                track_viewed_topic,
+                user_id=user_id,
+                category=category,
+                topic_id=topic_id,
+                topic_title=title,
+                expertise_level=expertise_level
+            )
+            return not_modified(etag)
     
-    if refresh:
+    # Cache hits are served as pre-serialized, pre-compressed bytes
+    payload = None if refresh else await run_in_pool(FIRESTORE_POOL, get_cached_article_payload, topic_id, expertise_level)
+    
+    if payload is not None:
         article = None
     else:
-        article = get_cached_article(topic_id, expertise_level)
-    
-    if not article:
         # Generate article - tooltips are already extracted in this function
-        article = generate_article(
+        article = await run_in_pool(
+            LLM_POOL,
+            generate_article,
             category=category,
             topic=title,
             expertise_level=expertise_level,
             user_id=user_id
         )
         
-        # Cache the article for future requests
-        cache_article(topic_id, expertise_level, article)
+        # Cache the article for future requests; its cache time is its version
+        cached_at = datetime.now()
+        submit_background(
+            cache_article,
+            topic_id=topic_id,
+            expertise_level=expertise_level,
+            article=article,
+            cached_at=cached_at
+        )
     
-    response = {
+    headers = {}
+    version = get_content_version(version_key) if payload is not None else cached_at.isoformat()
+    if version:
+        headers["ETag"] = make_etag(version_key, user_id, version)
+    
+    result = {
         "user_id": user_id,
-        "topic_id": topic_id,
-        "article": article
+        "topic_id": topic_id
     }
 
     # Schedule background task for tracking
-    asyncio.create_task(track_article_view(
-        user_id=user_id,
-        category=category,
-        topic_id=topic_id,
-        topic_title=title,
-        expertise_level=expertise_level,
-        tooltips=article.get("tooltip_words", [])
-    ))
-    
-    return response
-
-async def track_article_view(
-    user_id: str,
-    category: str,
-    topic_id: str,
-    topic_title: str,
-    expertise_level: str,
-    tooltips: List[Dict]
-):
-    """Track article view and tooltips in background."""
-    # Run blocking operations in thread pool
-    await asyncio.to_thread(
+    submit_background(
         track_viewed_topic,
         user_id=user_id,
         category=category,
         topic_id=topic_id,
-        topic_title=topic_title,
+        topic_title=title,
         expertise_level=expertise_level
     )
-
-from fastapi.responses import StreamingResponse
-import json
+    
+    if payload is not None:
+        return PrecompressedJSONResponse(result, "article", payload, headers=headers)
+    return FastJSONResponse({**result, "article": article}, headers=headers)
 
 @router.get("/article/topic/{topic_id}/stream")
 async def get_topic_article_streaming(
@@ -247,7 +252,7 @@ async def get_topic_article_streaming(
 ):
     """Streaming version that shows progress as article is generated."""
     # Get topic details
-    topic = get_topic_by_id_fast(topic_id)
+    topic = await run_in_pool(FIRESTORE_POOL, get_topic_by_id_fast, topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail=f"Topic with ID {topic_id} not found")
     
@@ -257,32 +262,33 @@ async def get_topic_article_streaming(
     
     async def generate_stream():
         # Send metadata immediately
-        yield json.dumps({
-            "type": "metadata",
-            "user_id": user_id,
-            "topic_id": topic_id,
-            "title": title,
-            "category": category
-        }) + "\n"
+        yield ndjson_line(
+            "metadata",
+            user_id=user_id,
+            topic_id=topic_id,
+            title=title,
+            category=category
+        )
         
         # Check cache unless refresh requested
-        article = None if refresh else get_cached_article(topic_id, expertise_level)
+        payload = None if refresh else await run_in_pool(FIRESTORE_POOL, get_cached_article_payload, topic_id, expertise_level)
         
-        if article:
+        if payload is not None:
             # Send cached article
-            yield json.dumps({
-                "type": "article",
-                "content": article
-            }) + "\n"
+            yield ndjson_line(
+                "article",
+                content=json_fragment(payload.json)
+            )
         else:
             # Send generation status
-            yield json.dumps({
-                "type": "status",
-                "message": "Generating article..."
-            }) + "\n"
+            yield ndjson_line(
+                "status",
+                message="Generating article..."
+            )
             
             # Generate article in thread pool
-            article = await asyncio.to_thread(
+            article = await run_in_pool(
+                LLM_POOL,
                 generate_article,
                 category=category,
                 topic=title,
@@ -291,39 +297,36 @@ async def get_topic_article_streaming(
             )
             
             # Cache generated article
-            asyncio.create_task(asyncio.to_thread(
+            submit_background(
                 cache_article,
                 topic_id=topic_id,
                 expertise_level=expertise_level,
                 article=article
-            ))
+            )
             
             # Send generated article
-            yield json.dumps({
-                "type": "article",
-                "content": article
-            }) + "\n"
+            yield ndjson_line(
+                "article",
+                content=article
+            )
         
         # Track view in background
-        asyncio.create_task(track_article_view(
+        submit_background(
+            track_viewed_topic,
             user_id=user_id,
             category=category,
             topic_id=topic_id,
             topic_title=title,
-            expertise_level=expertise_level,
-            tooltips=article.get("tooltip_words", [])
-        ))
+            expertise_level=expertise_level
+        )
         
         # Send completion
-        yield json.dumps({
-            "type": "complete",
-            "timestamp": datetime.now().isoformat()
-        }) + "\n"
-    
-    return StreamingResponse(
-        generate_stream(),
-        media_type="application/x-ndjson"
-    )
+        yield ndjson_line(
+            "complete",
+            timestamp=datetime.now().isoformat()
+        )
+    
+    return NDJSONResponse(generate_stream())
 
 @router.post("/tooltip/view")
 async def log_tooltip_view(tooltip_data: TooltipView) -> Dict[str, Any]:
@@ -335,15 +338,14 @@ async def log_tooltip_view(tooltip_data: TooltipView) -> Dict[str, Any]:
     Returns:
         Success confirmation
     """
-    log_tooltip_viewed(
+    await run_in_pool(
+        FIRESTORE_POOL,
+        log_tooltip_viewed,
         tooltip_data.user_id, 
         tooltip_data.word, 
         tooltip_data.tooltip, 
         tooltip_data.from_topic
     )
-
-    from app.services.firebase.cache import update_user_activity_timestamp
-    update_user_activity_timestamp(tooltip_data.user_id, "tooltip_view")
     
     return {
         "status": "success",
@@ -395,22 +397,25 @@ async def get_user_summary(
     # Try to get from cache first (unless refresh is requested)
     if not refresh:
         from app.services.firebase.cache import get_cached_user_summary
-        cached_summary = get_cached_user_summary(user_id, period, start_date_str, end_date_str)
+        cached_summary = await run_in_pool(FIRESTORE_POOL, get_cached_user_summary, user_id, period, start_date_str, end_date_str)
         
         if cached_summary:
             logger.info(f"Returning cached summary for user {user_id}")
             return cached_summary
     
     # Run Firebase queries concurrently - REMOVED TOOLTIP QUERY
-    read_history_task = asyncio.create_task(asyncio.to_thread(
+    read_history_task = asyncio.create_task(run_in_pool(
+        FIRESTORE_POOL,
         get_user_read_history, user_id, start_date_obj, end_date_obj
     ))
     
-    streak_data_task = asyncio.create_task(asyncio.to_thread(
+    streak_data_task = asyncio.create_task(run_in_pool(
+        FIRESTORE_POOL,
         get_user_streak_data, user_id
     ))
     
-    expertise_level_task = asyncio.create_task(asyncio.to_thread(
+    expertise_level_task = asyncio.create_task(run_in_pool(
+        FIRESTORE_POOL,
         get_user_expertise_level, user_id
     ))
     
@@ -426,7 +431,8 @@ async def get_user_summary(
     stats = calculate_reading_stats(read_history, [])
     
     # Run AI operations concurrently - PASS EMPTY LIST FOR TOOLTIPS
-    ai_summary_task = asyncio.create_task(asyncio.to_thread(
+    ai_summary_task = asyncio.create_task(run_in_pool(
+        LLM_POOL,
         generate_reading_summary,
         user_id=user_id,
         read_articles=read_history,
@@ -435,7 +441,8 @@ async def get_user_summary(
         stats=stats
     ))
     
-    quiz_questions_task = asyncio.create_task(asyncio.to_thread(
+    quiz_questions_task = asyncio.create_task(run_in_pool(
+        LLM_POOL,
         generate_quiz_questions,
         read_articles=read_history,
         expertise_level=expertise_level
@@ -467,14 +474,14 @@ async def get_user_summary(
     
     # Cache the summary for future requests
     from app.services.firebase.cache import cache_user_summary
-    asyncio.create_task(asyncio.to_thread(
+    submit_background(
         cache_user_summary,
         user_id=user_id,
         period=period,
         start_date_str=start_date_str,
         end_date_str=end_date_str,
         summary_data=summary
-    ))
+    )
     
     return summary
 
@@ -564,7 +571,7 @@ async def get_progress_chart(
         label_format = "%d %b"  # Day with month abbreviation
     
     # Get daily reading counts
-    daily_history = get_daily_reading_stats(user_id, start_date, end_date)
+    daily_history = await run_in_pool(FIRESTORE_POOL, get_daily_reading_stats, user_id, start_date, end_date)
     
     # Format data for chart
     articles_data = []
@@ -611,7 +618,7 @@ async def get_user_streak(user_id: str) -> Dict[str, Any]:
     Returns:
         Details about user's learning streak
     """
-    streak_data = get_user_streak_data(user_id)
+    streak_data = await run_in_pool(FIRESTORE_POOL, get_user_streak_data, user_id)
     
     return {
         "user_id": user_id,
@@ -641,21 +648,15 @@ async def get_yearly_heatmap(
     start_date = datetime(year, 1, 1).date()
     end_date = datetime(year, 12, 31).date()
     
-    # Get activity history from your unified database
-    from app.services.firebase.reading_log import get_user_activity_history
-    activities = get_user_activity_history(user_id, start_date, end_date)
-    
-    # Count activities by date
-    activity_counts = {}
-    for activity in activities:
-        date_str = activity.get('date')
-        if date_str:
-            activity_counts[date_str] = activity_counts.get(date_str, 0) + 1
+    # Get daily activity counters (at most 12 monthly rollup documents)
+    from app.services.firebase.activity_rollups import get_activity_rollups
+    rollups = await run_in_pool(FIRESTORE_POOL, get_activity_rollups, user_id, start_date, end_date)
     
     # Format for heatmap - array of {date, count} objects
     heatmap_data = [
-        {"date": date_str, "count": count}
-        for date_str, count in activity_counts.items()
+        {"date": date_str, "count": counters.get("total", 0)}
+        for date_str, counters in sorted(rollups.items())
+        if counters.get("total", 0) > 0
     ]
     
     return {
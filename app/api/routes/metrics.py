@@ -0,0 +1,73 @@
+"""Metrics routes.
+
+This module exposes operational metrics collected in-process. Counters are
+reset with a POST to the ``/reset`` route of each metric.
+"""
+from fastapi import APIRouter
+from typing import Dict, Any
+
+from app.api.middleware.rate_limit import get_rate_limit_stats, reset_rate_limit_stats
+from app.services.firebase.instrumentation import get_operation_totals, get_route_totals, reset_operation_totals
+from app.services.monitoring import get_loop_stats, reset_loop_stats
+from app.services.workers import get_background_stats, get_pool_stats, reset_background_stats, reset_pool_stats
+
+
+router = APIRouter()
+
+@router.get("/firestore")
+async def get_firestore_metrics() -> Dict[str, Any]:
+    """Get Firestore operation counts, bytes and latency per operation and per route."""
+    return {
+        "operations": get_operation_totals(),
+        "routes": get_route_totals()
+    }
+
+@router.post("/firestore/reset")
+async def reset_firestore_metrics() -> Dict[str, str]:
+    """Reset the Firestore operation counters."""
+    reset_operation_totals()
+    return {"message": "Firestore metrics reset"}
+
+@router.get("/event-loop")
+async def get_event_loop_metrics() -> Dict[str, Any]:
+    """Get event loop lag, stall counts and durations, and the stacks of recent stalls."""
+    return get_loop_stats()
+
+@router.post("/event-loop/reset")
+async def reset_event_loop_metrics() -> Dict[str, str]:
+    """Reset the event loop lag statistics."""
+    reset_loop_stats()
+    return {"message": "Event loop metrics reset"}
+
+@router.get("/background")
+async def get_background_metrics() -> Dict[str, Any]:
+    """Get background queue depth and per-job counts, rejections, durations and recent failures."""
+    return get_background_stats()
+
+@router.post("/background/reset")
+async def reset_background_metrics() -> Dict[str, str]:
+    """Reset the background job counters."""
+    reset_background_stats()
+    return {"message": "Background metrics reset"}
+
+@router.get("/pools")
+async def get_pool_metrics() -> Dict[str, Any]:
+    """Get utilization, queue times and saturation counts of the worker pools."""
+    return get_pool_stats()
+
+@router.post("/pools/reset")
+async def reset_pool_metrics() -> Dict[str, str]:
+    """Reset the worker pool counters."""
+    reset_pool_stats()
+    return {"message": "Pool metrics reset"}
+
+@router.get("/rate-limits")
+async def get_rate_limit_metrics() -> Dict[str, Any]:
+    """Get allowed and limited requests per budget and the most limited users, by hashed id."""
+    return get_rate_limit_stats()
+
+@router.post("/rate-limits/reset")
+async def reset_rate_limit_metrics() -> Dict[str, str]:
+    """Reset the rate limit counters; the buckets keep their tokens."""
+    reset_rate_limit_stats()
+    return {"message": "Rate limit metrics reset"}
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Query, HTTPException, Depends
 
 from app.api.models import Categories
 from app.services.firebase import get_user_selected_categories, save_user_selected_categories
+from app.services.workers import FIRESTORE_POOL, run_in_pool
 
 
 router = APIRouter()
@@ -40,7 +41,7 @@ async def get_selected_categories(user_id: str = Depends(validate_user_id)) -> C
     Raises:
         HTTPException: If no categories are found for the user
     """
-    categories_data = get_user_selected_categories(user_id)
+    categories_data = await run_in_pool(FIRESTORE_POOL, get_user_selected_categories, user_id)
     
     if not categories_data:
         raise HTTPException(status_code=404, detail=f"No selected categories found for user {user_id}")
@@ -76,7 +77,7 @@ async def create_selected_categories(
         HTTPException: If categories already exist for this user (overwrite protection)
     """
     # Check if user already has categories set to prevent accidental overwrite
-    existing_categories = get_user_selected_categories(user_id)
+    existing_categories = await run_in_pool(FIRESTORE_POOL, get_user_selected_categories, user_id)
     if existing_categories:
         raise HTTPException(
             status_code=409,
@@ -84,7 +85,9 @@ async def create_selected_categories(
         )
     
     try:
-        save_user_selected_categories(
+        await run_in_pool(
+            FIRESTORE_POOL,
+            save_user_selected_categories,
             user_id=user_id,
             expertise_level=categories.expertise_level,
             categories=categories.categories,
@@ -115,7 +118,7 @@ async def update_selected_categories(
         HTTPException: If no categories exist for this user
     """
     # Check if user has existing categories (to prevent creating via PUT)
-    existing_categories = get_user_selected_categories(user_id)
+    existing_categories = await run_in_pool(FIRESTORE_POOL, get_user_selected_categories, user_id)
     if not existing_categories:
         raise HTTPException(
             status_code=404,
@@ -123,7 +126,9 @@ async def update_selected_categories(
         )
     
     try:
-        save_user_selected_categories(
+        await run_in_pool(
+            FIRESTORE_POOL,
+            save_user_selected_categories,
             user_id=user_id,
             expertise_level=categories.expertise_level,
             categories=categories.categories,
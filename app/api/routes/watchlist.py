@@ -3,31 +3,117 @@
 This module provides endpoints for managing user watchlists.
 """
 import asyncio
+import base64
 from datetime import datetime
 import time
-from fastapi import APIRouter, Query, Depends, HTTPException
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Query, Depends, HTTPException, Request
+from typing import List, Dict, Any, Optional, Set
 import logging
 
-from app.services.firebase.cache import cache_research_article, get_asset_comparison_cache, get_asset_current_price, get_cached_research, store_asset_comparison_cache  # Add standard Python logging instead
+from app.services.firebase.cache import cache_research_article, get_asset_comparison_cache, get_asset_current_price, get_cached_research_payload, get_research_version, store_asset_comparison_cache  # Add standard Python logging instead
 
 # Create a logger instance for this module
 logger = logging.getLogger(__name__)
 
 
 from app.services.assets.data import fast_search_assets, get_asset_info, get_asset_info_async, get_similar_assets, get_similar_assets_async, get_similar_assets_with_retry
-from app.services.firebase import add_to_watchlist, remove_from_watchlist
+from app.services.firebase import (
+    add_to_watchlist,
+    add_many_to_watchlist,
+    remove_from_watchlist,
+    remove_many_from_watchlist,
+    update_watchlist_notes
+)
 from app.services.ai.perplexity import fetch_asset_news, generate_asset_comparison, get_interactive_asset_analysis
-from app.api.models import AssetType, AddAssetRequest, SearchRequest
-from app.services.firebase.watchlist import get_related_topics, get_user_expertise_level, get_user_interests, get_user_watchlists, log_asset_research
+from app.api.middleware.etag import etag_matches, make_etag, not_modified
+from app.api.responses import FastJSONResponse, NDJSONResponse, PrecompressedJSONResponse, json_fragment, ndjson_line
+from app.api.models import AssetType, AddAssetRequest, BulkAddAssetsRequest, BulkRemoveAssetsRequest, SearchRequest, UpdateNotesRequest
+from app.services.workers import FIRESTORE_POOL, LLM_POOL, MARKET_DATA_POOL, run_in_pool, submit_background
+from app.services.firebase.watchlist import get_popular_assets, get_related_topics, get_user_expertise_level, get_user_preferences_and_watchlist, get_user_research_history, get_user_watchlists, log_asset_research
 
 router = APIRouter()
 
+# Item fields stored in the watchlist itself, available without fetching asset data
+WATCHLIST_ITEM_FIELDS = {"symbol", "asset_type", "added_on", "notes"}
+
+# Fields every projected item keeps, so it can be expanded later
+WATCHLIST_KEY_FIELDS = ("symbol", "asset_type")
+
+MAX_WATCHLIST_PAGE_SIZE = 200
+
+
+def _watchlist_item_key(item: Dict[str, Any]) -> str:
+    """Build the stable key that orders watchlist items and identifies them in cursors."""
+    asset_type = item["asset_type"].value if hasattr(item["asset_type"], "value") else item["asset_type"]
+    return f"{item.get('added_on') or ''}|{item['symbol']}:{asset_type}"
+
+
+def _encode_cursor(item: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(_watchlist_item_key(item).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """Parse a comma separated ``fields`` projection, None meaning all fields."""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    return requested | set(WATCHLIST_KEY_FIELDS)
+
+
+def _project(item: Dict[str, Any], fields: Optional[Set[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return item
+    return {key: value for key, value in item.items() if key in fields}
+
+
+async def _enrich_watchlist_item(item: Dict[str, Any], include_similar: bool) -> Dict[str, Any]:
+    """Merge a watchlist item with its asset data and, optionally, similar assets."""
+    tasks = [get_asset_info_async(item["symbol"], item["asset_type"])]
+    if include_similar:
+        tasks.append(get_similar_assets_async(item["symbol"], item["asset_type"], 3))
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    asset_info = results[0]
+    if isinstance(asset_info, Exception):
+        logger.warning(f"Error fetching info for {item['symbol']}: {str(asset_info)}")
+        return {
+            "symbol": item["symbol"],
+            "asset_type": item["asset_type"],
+            "name": item["symbol"],
+            "error": str(asset_info),
+            "added_on": item.get("added_on"),
+            "notes": item.get("notes", "")
+        }
+    
+    # Merge watchlist metadata with asset info
+    asset_data = {
+        **item,
+        **asset_info,
+        "added_on": item.get("added_on"),
+        "notes": item.get("notes", "")
+    }
+    
+    if include_similar and not isinstance(results[1], Exception):
+        asset_data["similar_assets"] = results[1]
+    
+    return asset_data
+
+
 @router.get("")
 async def get_user_watchlist(
     user_id: str,
     asset_type: Optional[AssetType] = None,
-    include_similar: bool = False
+    include_similar: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_WATCHLIST_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
 ) -> Dict[str, Any]:
     """Get detailed information about assets in a user's watchlist.
     
@@ -35,119 +121,92 @@ async def get_user_watchlist(
         user_id: User identifier
         asset_type: Optional filter by asset type
         include_similar: Whether to include similar assets in response
+        limit: Optional page size
+        cursor: ``next_cursor`` of the previous page
+        fields: Optional comma separated fields to return per item, e.g.
+            ``symbol,current_price,price_change_percent``. Asset data and
+            similar assets are only fetched when a requested field needs them.
         
     Returns:
-        Detailed information about each asset in the watchlist
+        Detailed information about each asset in the page, and the cursor of the next page
     """
     start_time = time.time()
     
     # Get user's watchlist items from Firebase
-    watchlist_items = get_user_watchlists(user_id, asset_type)
+    watchlist_items = await run_in_pool(FIRESTORE_POOL, get_user_watchlists, user_id, asset_type)
     
     if not watchlist_items:
-        return {"watchlist": [], "message": "Watchlist is empty"}
+        return {"watchlist": [], "count": 0, "total": 0, "next_cursor": None}
     
     logger.info(f"Retrieved {len(watchlist_items)} watchlist items for user {user_id}")
     
-    # Group assets by type for batch processing
-    stocks = []
-    cryptos = []
-    other_assets = []
-    
-    for item in watchlist_items:
-        asset_type_value = item["asset_type"].value if hasattr(item["asset_type"], "value") else item["asset_type"]
-        if asset_type_value.lower() == "stock":
-            stocks.append(item)
-        elif asset_type_value.lower() == "crypto":
-            cryptos.append(item)
-        else:
-            other_assets.append(item)
-    
-    # Create tasks for parallel execution
-    tasks = []
-    
-    # Process all assets in parallel
-    for item in watchlist_items:
-        tasks.append(
-            asyncio.create_task(
-                get_asset_info_async(item["symbol"], item["asset_type"])
-            )
-        )
-    
-    # If including similar assets, add those tasks too
-    similar_asset_tasks = []
-    if include_similar:
-        for item in watchlist_items:
-            similar_asset_tasks.append(
-                asyncio.create_task(
-                    get_similar_assets_async(item["symbol"], item["asset_type"], 3)
-                )
-            )
-    
-    # Execute all asset info tasks in parallel
-    asset_info_results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Page through a stable order
+    watchlist_items.sort(key=_watchlist_item_key)
+    if cursor:
+        after = _decode_cursor(cursor)
+        watchlist_items_page = [item for item in watchlist_items if _watchlist_item_key(item) > after]
+    else:
+        watchlist_items_page = watchlist_items
+    next_cursor = None
+    if limit is not None and len(watchlist_items_page) > limit:
+        watchlist_items_page = watchlist_items_page[:limit]
+        next_cursor = _encode_cursor(watchlist_items_page[-1])
     
-    # Execute similar asset tasks if requested
-    similar_asset_results = []
-    if include_similar:
-        similar_asset_results = await asyncio.gather(*similar_asset_tasks, return_exceptions=True)
+    requested_fields = _parse_fields(fields)
+    needs_asset_info = requested_fields is None or not requested_fields <= WATCHLIST_ITEM_FIELDS | {"similar_assets"}
+    include_similar = include_similar and (requested_fields is None or "similar_assets" in requested_fields)
     
-    # Combine results with watchlist items
-    enriched_items = []
-    
-    for i, item in enumerate(watchlist_items):
-        try:
-            # Get the corresponding asset info result
-            asset_info = asset_info_results[i]
-            
-            # Skip if we got an exception instead of data
-            if isinstance(asset_info, Exception):
-                logger.warning(f"Error fetching info for {item['symbol']}: {str(asset_info)}")
-                enriched_items.append({
-                    "symbol": item["symbol"],
-                    "asset_type": item["asset_type"],
-                    "name": item["symbol"],
-                    "error": str(asset_info),
-                    "added_on": item.get("added_on"),
-                    "notes": item.get("notes", "")
-                })
-                continue
-            
-            # Merge watchlist metadata with asset info
-            asset_data = {
-                **item,
-                **asset_info,
-                "added_on": item.get("added_on"),
-                "notes": item.get("notes", "")
-            }
-            
-            # Add similar assets if requested
-            if include_similar and i < len(similar_asset_results):
-                similar_assets = similar_asset_results[i]
-                if not isinstance(similar_assets, Exception):
-                    asset_data["similar_assets"] = similar_assets
-            
-            enriched_items.append(asset_data)
-            
-        except Exception as e:
-            # If there's an error getting data for this asset, include basic info
-            logger.error(f"Error processing watchlist item {item['symbol']}: {str(e)}")
-            enriched_items.append({
-                "symbol": item["symbol"],
-                "asset_type": item["asset_type"],
-                "name": item["symbol"],
-                "error": str(e),
-                "added_on": item.get("added_on"),
-                "notes": item.get("notes", "")
-            })
+    if needs_asset_info or include_similar:
+        # Enrich all assets in the page in parallel
+        enriched_items = await asyncio.gather(*(
+            _enrich_watchlist_item(item, include_similar) for item in watchlist_items_page
+        ))
+    else:
+        enriched_items = [{**item, "notes": item.get("notes", "")} for item in watchlist_items_page]
     
     end_time = time.time()
     logger.info(f"Watchlist for user {user_id} generated in {end_time - start_time:.2f} seconds")
     
-    return {
-        "watchlist": enriched_items,
+    return FastJSONResponse({
+        "watchlist": [_project(item, requested_fields) for item in enriched_items],
         "count": len(enriched_items),
-    }
+        "total": len(watchlist_items),
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/items/{symbol}")
+async def get_watchlist_item(
+    symbol: str,
+    user_id: str = Query(...),
+    asset_type: AssetType = Query(...),
+    include_similar: bool = True,
+    fields: Optional[str] = None
+) -> Dict[str, Any]:
+    """Expand a single watchlist item with its asset data.
+    
+    Lets list views load a projected page first and fetch the details of an
+    item when it is opened.
+    
+    Args:
+        symbol: Asset symbol
+        user_id: User identifier
+        asset_type: Type of asset
+        include_similar: Whether to include similar assets
+        fields: Optional comma separated fields to return
+        
+    Returns:
+        The watchlist item merged with its asset data
+    """
+    watchlist_items = await run_in_pool(FIRESTORE_POOL, get_user_watchlists, user_id, asset_type)
+    item = next((item for item in watchlist_items if item["symbol"].upper() == symbol.upper()), None)
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"{symbol} is not in the watchlist")
+    
+    requested_fields = _parse_fields(fields)
+    include_similar = include_similar and (requested_fields is None or "similar_assets" in requested_fields)
+    asset_data = await _enrich_watchlist_item(item, include_similar)
+    return FastJSONResponse(_project(asset_data, requested_fields))
 
 @router.post("/search")
 async def search_for_assets(
@@ -173,7 +232,8 @@ async def search_for_assets(
     
     try:
         # Convert the search to async
-        results = await asyncio.to_thread(
+        results = await run_in_pool(
+            MARKET_DATA_POOL,
             fast_search_assets,
             query=query,
             asset_type=search_request.asset_type,
@@ -211,7 +271,8 @@ async def add_asset_to_watchlist(
     """
     try:
         # First search to get correct data
-        search_results = await asyncio.to_thread(
+        search_results = await run_in_pool(
+            MARKET_DATA_POOL,
             fast_search_assets,
             query=asset.symbol, 
             asset_type=asset.asset_type,
@@ -231,10 +292,12 @@ async def add_asset_to_watchlist(
                 asset_info = search_results[0]  # Use first result as fallback
             else:
                 # If search found nothing, try original method
-                asset_info = get_asset_info(asset.symbol, asset.asset_type)
+                asset_info = await run_in_pool(MARKET_DATA_POOL, get_asset_info, asset.symbol, asset.asset_type)
         
         # Add to Firebase with current timestamp
-        add_to_watchlist(
+        await run_in_pool(
+            FIRESTORE_POOL,
+            add_to_watchlist,
             user_id=user_id,
             symbol=asset.symbol,
             asset_type=asset.asset_type,
@@ -272,14 +335,132 @@ async def remove_from_user_watchlist(
     Returns:
         Confirmation message
     """
-    remove_from_watchlist(user_id, symbol, asset_type)
+    await run_in_pool(FIRESTORE_POOL, remove_from_watchlist, user_id, symbol, asset_type)
     return {"message": f"{symbol} removed from {user_id}'s watchlist"}
 
 
+@router.post("/add/bulk")
+async def add_assets_to_watchlist(
+    request: BulkAddAssetsRequest,
+    user_id: str = Query(...)
+) -> Dict[str, Any]:
+    """Add several assets to a user's watchlist in a single write.
+    
+    Args:
+        request: Assets to add
+        user_id: User identifier
+        
+    Returns:
+        Confirmation message and the added symbols
+    """
+    try:
+        await run_in_pool(FIRESTORE_POOL, add_many_to_watchlist, user_id, [asset.dict() for asset in request.assets])
+        
+        return {
+            "message": f"{len(request.assets)} assets added to watchlist",
+            "assets": [
+                {"symbol": asset.symbol, "asset_type": asset.asset_type}
+                for asset in request.assets
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error adding assets to watchlist: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Failed to add assets: {str(e)}")
+
+@router.post("/remove/bulk")
+async def remove_assets_from_watchlist(
+    request: BulkRemoveAssetsRequest,
+    user_id: str = Query(...)
+) -> Dict[str, Any]:
+    """Remove several assets from a user's watchlist in a single write.
+    
+    Args:
+        request: Assets to remove
+        user_id: User identifier
+        
+    Returns:
+        Confirmation message and the removed symbols
+    """
+    await run_in_pool(FIRESTORE_POOL, remove_many_from_watchlist, user_id, [asset.dict() for asset in request.assets])
+    
+    return {
+        "message": f"{len(request.assets)} assets removed from {user_id}'s watchlist",
+        "assets": [
+            {"symbol": asset.symbol, "asset_type": asset.asset_type}
+            for asset in request.assets
+        ]
+    }
+
+@router.put("/notes")
+async def update_asset_notes(
+    request: UpdateNotesRequest,
+    user_id: str = Query(...)
+) -> Dict[str, Any]:
+    """Update the notes of a watchlist item.
+    
+    Args:
+        request: Asset and its new notes
+        user_id: User identifier
+        
+    Returns:
+        Confirmation message and the updated notes
+    """
+    updated = await run_in_pool(FIRESTORE_POOL, update_watchlist_notes, user_id, request.symbol, request.asset_type, request.notes)
+    if not updated:
+        raise HTTPException(status_code=404, detail=f"{request.symbol} is not in the watchlist")
+    
+    return {
+        "message": f"Notes updated for {request.symbol}",
+        "symbol": request.symbol,
+        "asset_type": request.asset_type,
+        "notes": request.notes
+    }
+
+
+@router.get("/research-history")
+async def get_research_history(
+    user_id: str = Query(...)
+) -> Dict[str, Any]:
+    """Get the assets a user has researched, most researched first.
+    
+    Args:
+        user_id: User identifier
+        
+    Returns:
+        Researched assets with their research count and last research time
+    """
+    assets = await run_in_pool(FIRESTORE_POOL, get_user_research_history, user_id)
+    return {
+        "user_id": user_id,
+        "assets": assets,
+        "count": len(assets)
+    }
+
+@router.get("/popular")
+async def get_popular_researched_assets(
+    day: Optional[str] = Query(None, regex=r"^\d{4}-\d{2}-\d{2}$"),
+    limit: int = Query(10, ge=1, le=50)
+) -> Dict[str, Any]:
+    """Get the assets researched most across all users on a day.
+    
+    Args:
+        day: ISO date, defaults to today
+        limit: Maximum number of assets to return
+        
+    Returns:
+        Assets with their research count for the day
+    """
+    assets = await run_in_pool(FIRESTORE_POOL, get_popular_assets, day, limit)
+    return {
+        "day": day or datetime.now().date().isoformat(),
+        "assets": assets
+    }
+
 
 # Update the research endpoint
 @router.get("/research/{symbol}")
 async def get_deep_research_analysis(
+    request: Request,
     symbol: str,
     user_id: str = Query(...),
     asset_type: AssetType = Query(...),
@@ -295,62 +476,80 @@ async def get_deep_research_analysis(
         
         if not refresh:
             # Quick check for expertise level (needed for cache key)
-            expertise_level = get_user_expertise_level(user_id)
-            cached_research = get_cached_research(symbol, asset_type.value, expertise_level)
+            expertise_level = await run_in_pool(FIRESTORE_POOL, get_user_expertise_level, user_id)
+            version_key = f"research:{symbol}:{asset_type.value}:{expertise_level}"
             
-            if cached_research:
-                # Get basic asset info for price/name updates
-                asset_info = get_asset_info(symbol, asset_type)
+            # Get basic asset info for price/name updates with the stored research version
+            version, asset_info = await asyncio.gather(
+                run_in_pool(FIRESTORE_POOL, get_research_version, symbol, asset_type.value, expertise_level),
+                run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type)
+            )
+            
+            if version:
+                # The response carries the current price, so it is part of the version
+                etag = make_etag(
+                    version_key, user_id, version,
+                    asset_info.get("current_price"), asset_info.get("price_change_percent")
+                )
+                
+                # Answer a conditional GET without loading the research
+                if etag_matches(request.headers.get("if-none-match"), etag):
+                    return not_modified(etag)
                 
+                cached_research = await run_in_pool(
+                    FIRESTORE_POOL,
+                    get_cached_research_payload, symbol, asset_type.value, expertise_level
+                )
+            
+            if cached_research:
                 # Return cached research with updated price
-                return {
+                return PrecompressedJSONResponse({
                     "symbol": symbol,
                     "name": asset_info.get("name", symbol),
                     "asset_type": asset_type,
                     "current_price": asset_info.get("current_price"),
                     "price_change_percent": asset_info.get("price_change_percent"),
                     "expertise_level": expertise_level,
-                    "research_article": cached_research,
                     "from_cache": True,
                     "cache_age": "< 24 hours"
-                }
+                }, "research_article", cached_research, headers={"ETag": etag})
         
-        # If not cached or refresh requested, gather all required data in parallel
-        if not expertise_level:
-            expertise_level = get_user_expertise_level(user_id)
-        
-        # Create tasks for parallel execution
+        # If not cached or refresh requested, gather all required data in parallel.
+        # Preferences and watchlist are read together in one round trip.
         tasks = [
-            asyncio.to_thread(get_user_interests, user_id),
-            asyncio.to_thread(get_asset_info, symbol, asset_type),
-            asyncio.to_thread(get_user_watchlists, user_id),
-            asyncio.to_thread(get_related_topics, user_id, symbol, asset_type.value)
+            run_in_pool(FIRESTORE_POOL, get_user_preferences_and_watchlist, user_id),
+            run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type),
+            run_in_pool(FIRESTORE_POOL, get_related_topics, user_id, symbol, asset_type.value)
         ]
         
         # Add optional tasks
         if include_comparison:
-            tasks.append(asyncio.to_thread(get_similar_assets, symbol, asset_type, 3))
+            tasks.append(run_in_pool(LLM_POOL, get_similar_assets, symbol, asset_type, 3))
         if include_news:
-            tasks.append(asyncio.to_thread(fetch_asset_news, symbol, asset_type.value))
+            tasks.append(run_in_pool(LLM_POOL, fetch_asset_news, symbol, asset_type.value))
         
         # Execute all tasks in parallel
         results = await asyncio.gather(*tasks)
         
         # Extract results
-        interests = results[0]
+        preferences, watchlist_items = results[0]
         asset_info = results[1]
-        watchlist_items = results[2]
-        related_topics = results[3]
+        related_topics = results[2]
+        interests = preferences.get('categories', [])
+        if not expertise_level:
+            expertise_level = preferences.get('expertise_level', 'beginner')
         
         # Extract optional results
-        idx = 4
+        idx = 3
         similar_assets = results[idx] if include_comparison else []
         if include_comparison:
             idx += 1
         recent_news = results[idx] if include_news else []
         
         # Generate research (most time-consuming operation)
-        research = get_interactive_asset_analysis(
+        research = await run_in_pool(
+            LLM_POOL,
+            get_interactive_asset_analysis,
             symbol=symbol,
             asset_type=asset_type,
             expertise_level=expertise_level,
@@ -363,27 +562,23 @@ async def get_deep_research_analysis(
         )
         
         # Cache the research result
-        asyncio.create_task(
-            asyncio.to_thread(
-                cache_research_article,
-                symbol,
-                asset_type.value,
-                expertise_level,
-                research
-            )
+        submit_background(
+            cache_research_article,
+            symbol,
+            asset_type.value,
+            expertise_level,
+            research
         )
         
         # Log in background without blocking response
-        asyncio.create_task(
-            asyncio.to_thread(
-                log_asset_research,
-                user_id,
-                symbol,
-                asset_type.value
-            )
+        submit_background(
+            log_asset_research,
+            user_id,
+            symbol,
+            asset_type.value
         )
         
-        return {
+        return FastJSONResponse({
             "symbol": symbol,
             "name": asset_info.get("name", symbol),
             "asset_type": asset_type,
@@ -394,13 +589,122 @@ async def get_deep_research_analysis(
             "similar_assets": similar_assets if include_comparison else [],
             "recent_news": recent_news if include_news else [],
             "related_topics": related_topics
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error generating research analysis: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Research generation failed: {str(e)}")
 
 
+@router.get("/research/{symbol}/stream")
+async def stream_deep_research_analysis(
+    symbol: str,
+    user_id: str = Query(...),
+    asset_type: AssetType = Query(...),
+    include_comparison: bool = Query(True),
+    include_news: bool = Query(True),
+    refresh: bool = Query(False)
+):
+    """Streaming version of the research endpoint.
+    
+    Emits NDJSON messages as each section resolves: ``asset``, ``news``,
+    ``similar_assets`` and ``related_topics`` in completion order, then
+    ``analysis`` once the research article is generated, and ``complete``.
+    A section that fails is reported as an ``error`` message and the
+    analysis is generated without it.
+    """
+    async def generate_stream():
+        yield ndjson_line("metadata", user_id=user_id, symbol=symbol, asset_type=asset_type)
+        
+        expertise_level = None
+        if not refresh:
+            expertise_level = await run_in_pool(FIRESTORE_POOL, get_user_expertise_level, user_id)
+            cached_research = await run_in_pool(
+                FIRESTORE_POOL,
+                get_cached_research_payload, symbol, asset_type.value, expertise_level
+            )
+            if cached_research:
+                asset_info = await run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type)
+                yield ndjson_line("asset", content=asset_info)
+                yield ndjson_line(
+                    "analysis",
+                    content=json_fragment(cached_research.json),
+                    expertise_level=expertise_level,
+                    from_cache=True
+                )
+                yield ndjson_line("complete", timestamp=datetime.now().isoformat())
+                return
+        
+        # Section name -> (task, fallback when it fails)
+        sections = {
+            "preferences": (asyncio.create_task(run_in_pool(FIRESTORE_POOL, get_user_preferences_and_watchlist, user_id)), ({}, [])),
+            "asset": (asyncio.create_task(run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type)), {}),
+            "related_topics": (asyncio.create_task(run_in_pool(FIRESTORE_POOL, get_related_topics, user_id, symbol, asset_type.value)), []),
+        }
+        if include_comparison:
+            sections["similar_assets"] = (asyncio.create_task(run_in_pool(LLM_POOL, get_similar_assets, symbol, asset_type, 3)), [])
+        if include_news:
+            sections["news"] = (asyncio.create_task(run_in_pool(LLM_POOL, fetch_asset_news, symbol, asset_type.value)), [])
+        section_names = {task: name for name, (task, _) in sections.items()}
+        results = {}
+        
+        try:
+            pending = set(section_names)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = section_names[task]
+                    try:
+                        results[name] = task.result()
+                    except Exception as e:
+                        logger.error(f"Error loading research section {name} for {symbol}: {str(e)}")
+                        results[name] = sections[name][1]
+                        yield ndjson_line("error", section=name, message=str(e))
+                        continue
+                    # Preferences only feed the analysis
+                    if name != "preferences":
+                        yield ndjson_line(name, content=results[name])
+        finally:
+            # The client went away before every section resolved
+            for task in section_names:
+                task.cancel()
+        
+        preferences, watchlist_items = results["preferences"]
+        asset_info = results["asset"]
+        if not expertise_level:
+            expertise_level = preferences.get('expertise_level', 'beginner')
+        
+        yield ndjson_line("status", message="Generating analysis...")
+        
+        try:
+            research = await run_in_pool(
+                LLM_POOL,
+                get_interactive_asset_analysis,
+                symbol=symbol,
+                asset_type=asset_type,
+                expertise_level=expertise_level,
+                asset_info=asset_info,
+                similar_assets=results.get("similar_assets", []),
+                user_interests=preferences.get('categories', []),
+                recent_news=results.get("news", []),
+                watchlist_items=watchlist_items,
+                related_topics=results["related_topics"]
+            )
+        except Exception as e:
+            logger.error(f"Error generating research analysis: {str(e)}")
+            yield ndjson_line("error", section="analysis", message=str(e))
+            return
+        
+        # Cache the research result and log in background
+        submit_background(cache_research_article, symbol, asset_type.value, expertise_level, research)
+        submit_background(log_asset_research, user_id, symbol, asset_type.value)
+        
+        yield ndjson_line("analysis", content=research, expertise_level=expertise_level, from_cache=False)
+        yield ndjson_line("complete", timestamp=datetime.now().isoformat())
+    
+    return NDJSONResponse(generate_stream())
+
+
 @router.get("/asset/{symbol}")
 async def get_basic_asset_data(
     symbol: str,
@@ -411,8 +715,8 @@ async def get_basic_asset_data(
     try:
         # Fast data retrieval for immediate display
         tasks = [
-            asyncio.to_thread(get_asset_info, symbol, asset_type),
-            asyncio.to_thread(get_user_expertise_level, user_id),
+            run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type),
+            run_in_pool(FIRESTORE_POOL, get_user_expertise_level, user_id),
         ]
         results = await asyncio.gather(*tasks)
         
@@ -446,32 +750,35 @@ async def get_asset_analysis(
 ) -> Dict[str, Any]:
     """Get comprehensive research analysis for an asset."""
     try:
-        expertise_level = get_user_expertise_level(user_id)
+        expertise_level = await run_in_pool(FIRESTORE_POOL, get_user_expertise_level, user_id)
         
         # Check cache first
         if not refresh:
-            cached_research = get_cached_research(symbol, asset_type.value, expertise_level)
+            cached_research = await run_in_pool(
+                FIRESTORE_POOL,
+                get_cached_research_payload, symbol, asset_type.value, expertise_level
+            )
             if cached_research:
-                return {
-                    "research_article": cached_research,
+                return PrecompressedJSONResponse({
                     "from_cache": True,
                     "cache_age": "< 24 hours"
-                }
+                }, "research_article", cached_research)
         
         # Gather required data
         tasks = [
-            asyncio.to_thread(get_user_interests, user_id),
-            asyncio.to_thread(get_asset_info, symbol, asset_type),
-            asyncio.to_thread(get_user_watchlists, user_id),
+            run_in_pool(FIRESTORE_POOL, get_user_preferences_and_watchlist, user_id),
+            run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type),
         ]
         
         results = await asyncio.gather(*tasks)
-        interests = results[0]
+        preferences, watchlist_items = results[0]
         asset_info = results[1]
-        watchlist_items = results[2]
+        interests = preferences.get('categories', [])
         
         # Generate analysis (the time-consuming part)
-        research = get_interactive_asset_analysis(
+        research = await run_in_pool(
+            LLM_POOL,
+            get_interactive_asset_analysis,
             symbol=symbol,
             asset_type=asset_type,
             expertise_level=expertise_level,
@@ -485,17 +792,13 @@ async def get_asset_analysis(
         )
         
         # Cache and log in background
-        asyncio.create_task(
-            asyncio.to_thread(cache_research_article, symbol, asset_type.value, expertise_level, research)
-        )
-        asyncio.create_task(
-            asyncio.to_thread(log_asset_research, user_id, symbol, asset_type.value)
-        )
+        submit_background(cache_research_article, symbol, asset_type.value, expertise_level, research)
+        submit_background(log_asset_research, user_id, symbol, asset_type.value)
         
-        return {
+        return FastJSONResponse({
             "research_article": research,
             "from_cache": False
-        }
+        })
     except Exception as e:
         logger.error(f"Error generating analysis: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Analysis generation failed: {str(e)}")
@@ -512,16 +815,17 @@ async def get_related_content(
     """Get similar assets, news, and recommendations with expertise-based comparison."""
     try:
         # First get user expertise level for cache key
-        expertise_level = await asyncio.to_thread(get_user_expertise_level, user_id)
+        expertise_level = await run_in_pool(FIRESTORE_POOL, get_user_expertise_level, user_id)
         
         # Check cache first (unless refresh is requested)
         if not refresh:
             cache_key = f"related_{symbol}_{asset_type.value}_{expertise_level}"
-            cached_data = await asyncio.to_thread(get_asset_comparison_cache, cache_key)
+            cached_data = await run_in_pool(FIRESTORE_POOL, get_asset_comparison_cache, cache_key)
             
             if cached_data:
                 # Get just the current price for real-time data
-                current_price_info = await asyncio.to_thread(
+                current_price_info = await run_in_pool(
+                    MARKET_DATA_POOL,
                     get_asset_current_price, symbol, asset_type
                 )
                 
@@ -537,9 +841,9 @@ async def get_related_content(
         # If cache miss or refresh requested, get all data
         # Run all related content tasks in parallel
         tasks = [
-            asyncio.to_thread(get_asset_info, symbol, asset_type),
+            run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type),
             get_similar_assets_with_retry(symbol, asset_type, 3),
-            asyncio.to_thread(fetch_asset_news, symbol, asset_type.value),
+            run_in_pool(LLM_POOL, fetch_asset_news, symbol, asset_type.value),
         ]
         
         results = await asyncio.gather(*tasks)
@@ -574,13 +878,11 @@ async def get_related_content(
         
         # Store in cache (in background)
         cache_key = f"related_{symbol}_{asset_type.value}_{expertise_level}"
-        asyncio.create_task(
-            asyncio.to_thread(
-                store_asset_comparison_cache, 
-                cache_key, 
-                response_data,
-                60 * 60 * 24 * 7  # 7 days TTL
-            )
+        submit_background(
+            store_asset_comparison_cache, 
+            cache_key, 
+            response_data,
+            60 * 60 * 24 * 7  # 7 days TTL
         )
         
         return response_data
@@ -1,4 +1,5 @@
 
+import asyncio
 from fastapi import FastAPI
 import uvicorn
 import os
@@ -8,12 +9,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 
 from app.api import api_router
+from app.api.middleware import CompressionMiddleware, ETagMiddleware, FirestoreMetricsMiddleware, RateLimitMiddleware
+from app.api.responses import FastJSONResponse
+from app.services.firebase.client import warm_up_firebase_client
+from app.services.firebase.topic_mirror import start_topic_cache_listener, stop_topic_cache_listener
+from app.services.firebase.ttl_sweeper import TTL_SWEEP_INTERVAL_SECONDS, get_last_sweep_report, run_ttl_sweeper
+from app.services.monitoring import start_loop_watchdog, stop_loop_watchdog
+from app.services.workers import FIRESTORE_POOL, drain_background_tasks, run_in_pool
+
+# Set FIREBASE_WARMUP=0 to skip initializing Firebase and its listeners at startup
+FIREBASE_WARMUP = os.environ.get("FIREBASE_WARMUP", "1") != "0"
 
 # Create FastAPI app
 app = FastAPI(
     title="Finlearn",
     description="Financial Learning and Research Platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 def custom_openapi():
@@ -46,7 +58,19 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
-# Add CORS middleware
+# Answer conditional GETs for cacheable content
+app.add_middleware(ETagMiddleware)
+
+# Compress sizeable responses
+app.add_middleware(CompressionMiddleware)
+
+# Count Firestore operations per request and route
+app.add_middleware(FirestoreMetricsMiddleware)
+
+# Throttle requests and forced LLM refreshes per user before any other work
+app.add_middleware(RateLimitMiddleware)
+
+# Add CORS middleware last, so it wraps every response including rate limit rejections
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # For development - consider restricting this in production
@@ -57,6 +81,29 @@ app.add_middleware(
 
 app.include_router(api_router)
 
+async def warm_up_firestore():
+    """Initialize Firebase, then start the snapshot listeners that keep in-memory mirrors current."""
+    await warm_up_firebase_client()
+    await run_in_pool(FIRESTORE_POOL, start_topic_cache_listener)
+
+@app.on_event("startup")
+async def start_firestore_warmup():
+    """Warm up Firestore in the background so startup does not wait on it."""
+    start_loop_watchdog()
+    if FIREBASE_WARMUP:
+        app.state.firestore_warmup = asyncio.create_task(warm_up_firestore())
+    if TTL_SWEEP_INTERVAL_SECONDS > 0:
+        app.state.ttl_sweeper = asyncio.create_task(run_ttl_sweeper(TTL_SWEEP_INTERVAL_SECONDS))
+
+@app.on_event("shutdown")
+async def stop_firestore_listeners():
+    """Finish queued background work, then stop Firestore snapshot listeners."""
+    await drain_background_tasks()
+    stop_loop_watchdog()
+    stop_topic_cache_listener()
+    if getattr(app.state, "ttl_sweeper", None):
+        app.state.ttl_sweeper.cancel()
+
 @app.get("/")
 async def root():
     """Root endpoint returning basic API information"""
@@ -83,6 +130,11 @@ async def refresh_openapi():
     
     return {"status": "success", "message": "OpenAPI schema updated"}
 
+@app.get("/dev/ttl-sweep", include_in_schema=False)
+async def ttl_sweep_report():
+    """Report what the last TTL sweep of the cache collections reclaimed"""
+    return {"status": "success", "report": get_last_sweep_report()}
+
 if __name__ == "__main__":
     # Get port from environment or use default
     port = int(os.environ.get("PORT", 8000))
@@ -12,6 +12,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 from app.api.models import AssetType
 from app.services.ai.perplexity import get_similar_stocks, get_similar_crypto
+from app.services.workers import LLM_POOL, MARKET_DATA_POOL, run_in_pool
 
 
 logger = logging.getLogger(__name__)
@@ -671,7 +672,7 @@ async def get_asset_info_async(symbol: str, asset_type: Any) -> Dict[str, Any]:
     Returns:
         Asset information dictionary
     """
-    return await asyncio.to_thread(get_asset_info, symbol, asset_type)
+    return await run_in_pool(MARKET_DATA_POOL, get_asset_info, symbol, asset_type)
 
 async def get_similar_assets_async(symbol: str, asset_type: Any, limit: int = 3) -> List[Dict[str, Any]]:
     """Async wrapper for get_similar_assets to be used with asyncio.
@@ -684,7 +685,7 @@ async def get_similar_assets_async(symbol: str, asset_type: Any, limit: int = 3)
     Returns:
         List of similar assets
     """
-    return await asyncio.to_thread(get_similar_assets, symbol, asset_type, limit)
+    return await run_in_pool(LLM_POOL, get_similar_assets, symbol, asset_type, limit)
 
 def get_similar_assets(symbol: str, asset_type: AssetType, limit: int = 3) -> List[Dict[str, Any]]:
     """Get similar assets based on type, sector, or characteristics.
@@ -717,7 +718,7 @@ async def get_similar_assets_with_retry(symbol, asset_type, limit=3, max_retries
     """Get similar assets with retry mechanism."""
     for attempt in range(max_retries):
         try:
-            result = await asyncio.to_thread(get_similar_assets, symbol, asset_type, limit)
+            result = await run_in_pool(LLM_POOL, get_similar_assets, symbol, asset_type, limit)
             # If we got valid results, return immediately
             if result and len(result) > 0:
                 return result
@@ -1,7 +1,7 @@
 """Simple time-based cache for dashboard content."""
 from datetime import datetime, timedelta
 import random
-from typing import Dict, Any, Optional,List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import logging
 import uuid
 import asyncio
@@ -11,6 +11,9 @@ from functools import partial
 from app.api.models import GlossaryTerm, NewsItem, Quote
 from app.services.ai.perplexity import fetch_trending_finance_news, generate_news_article, get_finance_quote, get_financial_glossary_term
 
+from app.services.firebase.cache import set_content_version
+from app.services.workers import LLM_POOL, run_in_pool
+
 # Add these imports at the top
 from app.services.firebase.trending_news import (
     store_trending_news, 
@@ -94,6 +97,7 @@ def get_cached_glossary_term(expertise_level: str, cache_key: str = None, force_
             "data": terms,
             "timestamp": now
         }
+        set_content_version(f"glossary:{expertise_level}", now.isoformat(), now + timedelta(seconds=CACHE_TTL))
         return terms
     
     # Return cached data
@@ -130,6 +134,7 @@ def get_cached_finance_quote(cache_key: str = None, force_refresh: bool = False)
             "data": quote,
             "timestamp": now
         }
+        set_content_version("quote", now.isoformat(), now + timedelta(seconds=CACHE_TTL))
         return quote
     
     # Return cached data
@@ -139,25 +144,68 @@ def get_cached_finance_quote(cache_key: str = None, force_refresh: bool = False)
 # Add to your cache initialization
 _cache["news_articles"] = {}
 
+# Section loads in flight, shared by concurrent requests. They keep running
+# past a caller's deadline so their result is cached for the follow-up fetch.
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _forget_inflight(key: str, task: asyncio.Task) -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error loading dashboard section {key}: {task.exception()}")
+
+
+def load_shared(key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+    """Start a section load, or join the one already in flight for the same key.
+    
+    Args:
+        key: Identifies the content being loaded
+        loader: Coroutine function loading it
+        
+    Returns:
+        Task of the load
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(loader())
+        _inflight[key] = task
+        task.add_done_callback(partial(_forget_inflight, key))
+    return task
+
+
+async def load_with_deadline(key: str, loader: Callable[[], Awaitable[Any]], timeout: float) -> Tuple[bool, Any]:
+    """Wait for a shared section load for at most ``timeout`` seconds.
+    
+    The load is not cancelled when the deadline passes.
+    
+    Args:
+        key: Identifies the content being loaded
+        loader: Coroutine function loading it
+        timeout: Deadline in seconds
+        
+    Returns:
+        (True, result) if the load finished in time, (False, None) otherwise
+    """
+    task = load_shared(key, loader)
+    try:
+        return True, await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        logger.info(f"Dashboard section {key} missed its {timeout}s deadline")
+        return False, None
+
+
 async def get_cached_glossary_term_async(
     expertise_level: str, 
     cache_key: str = None, 
     force_refresh: bool = False
 ) -> List[Any]:
     """Async wrapper for glossary term caching."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(
-        None,
-        partial(get_cached_glossary_term, expertise_level, cache_key, force_refresh)
-    )
+    return await run_in_pool(LLM_POOL, get_cached_glossary_term, expertise_level, cache_key, force_refresh)
 
 async def get_cached_finance_quote_async(force_refresh: bool = False) -> Dict[str, Any]:
     """Async wrapper for finance quote caching."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(
-        None,
-        partial(get_cached_finance_quote, force_refresh)
-    )
+    return await run_in_pool(LLM_POOL, get_cached_finance_quote, force_refresh=force_refresh)
 
 async def get_cached_trending_news_async(
     expertise_level: str,
@@ -165,11 +213,7 @@ async def get_cached_trending_news_async(
     force_refresh: bool = False
 ) -> List[Any]:
     """Async wrapper for trending news caching."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(
-        None,
-        partial(get_cached_trending_news, expertise_level, interests, force_refresh)
-    )
+    return await run_in_pool(LLM_POOL, get_cached_trending_news, expertise_level, interests, force_refresh)
 
 def get_cached_trending_news(
     expertise_level: str,
@@ -10,7 +10,10 @@ from .client import db
 from .watchlist import (
     get_user_watchlists,
     add_to_watchlist,
-    remove_from_watchlist
+    add_many_to_watchlist,
+    remove_from_watchlist,
+    remove_many_from_watchlist,
+    update_watchlist_notes
 )
 
 # Import and expose reading log functionality
@@ -32,7 +35,10 @@ __all__ = [
     "db",
     "get_user_watchlists",
     "add_to_watchlist",
+    "add_many_to_watchlist",
     "remove_from_watchlist",
+    "remove_many_from_watchlist",
+    "update_watchlist_notes",
     "log_topic_read",
     "get_user_categories",
     "get_user_selected_categories",
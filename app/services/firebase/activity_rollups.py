@@ -0,0 +1,206 @@
+"""Firebase service for per-user daily activity rollups.
+
+Each activity event increments counters for its day in a monthly rollup
+document, ``user_activity_rollups/{user_id}_{YYYY-MM}``::
+
+    {"days": {"2025-06-01": {"articles": 2, "tooltips": 5, "news": 1,
+                             "total": 8, "categories": {"stocks": 2}}}}
+
+Charts covering a year then read at most 12 documents instead of every event.
+
+Users whose activity predates the rollups are backfilled from the raw events
+the first time their rollups are read. ``{user_id}_backfill`` in the same
+collection marks the users that are.
+"""
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+
+from .client import db
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = "user_activity_rollups"
+
+# Events are counted from this day when backfilling a user's rollups
+BACKFILL_START = date(2020, 1, 1)
+MAX_BACKFILL_ATTEMPTS = 4
+
+# Counter incremented for each activity type
+ACTIVITY_COUNTERS = {
+    "topic_view": "articles",
+    "tooltip_view": "tooltips",
+    "news_view": "news",
+}
+
+
+def _rollup_ref(user_id: str, month: str):
+    """Get the rollup document reference for a user and ``YYYY-MM`` month."""
+    return db.collection(ROLLUP_COLLECTION).document(f"{user_id}_{month}")
+
+
+def _backfill_ref(user_id: str):
+    """Get the reference of the document marking a user's rollups as backfilled."""
+    return db.collection(ROLLUP_COLLECTION).document(f"{user_id}_backfill")
+
+
+def _months_between(start_date: date, end_date: date) -> List[str]:
+    """List the ``YYYY-MM`` months overlapping a date range."""
+    months = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _day_increments(activity_type: str, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Build the counter increments for one activity event."""
+    counter = ACTIVITY_COUNTERS.get(activity_type)
+    if not counter:
+        return None
+
+    increments: Dict[str, Any] = {
+        counter: firestore.Increment(1),
+        "total": firestore.Increment(1)
+    }
+    if counter == "articles":
+        increments["categories"] = {category or "uncategorized": firestore.Increment(1)}
+    return increments
+
+
+def increment_activity_rollup(
+    user_id: str,
+    activity_type: str,
+    category: Optional[str] = None,
+    day: Optional[date] = None,
+    batch: Any = None
+) -> None:
+    """Count one activity event in the user's daily rollup.
+
+    Args:
+        user_id: User identifier
+        activity_type: Activity type ("topic_view", "tooltip_view" or "news_view")
+        category: Category of a viewed topic
+        day: Day of the event (defaults to today)
+        batch: Optional write batch to add the update to instead of writing directly
+    """
+    increments = _day_increments(activity_type, category)
+    if not increments:
+        return
+
+    day_str = (day or date.today()).isoformat()
+    data = {
+        "user_id": user_id,
+        "month": day_str[:7],
+        "days": {day_str: increments}
+    }
+
+    ref = _rollup_ref(user_id, day_str[:7])
+    if batch is not None:
+        batch.set(ref, data, merge=True)
+    else:
+        ref.set(data, merge=True)
+
+
+def get_activity_rollups(user_id: str, start_date: date, end_date: date) -> Dict[str, Dict[str, Any]]:
+    """Get daily activity counters for a date range.
+
+    Args:
+        user_id: User identifier
+        start_date: Start date (inclusive)
+        end_date: End date (inclusive)
+
+    Returns:
+        Counters keyed by ISO date, for days with any activity
+    """
+    refs = [_rollup_ref(user_id, month) for month in _months_between(start_date, end_date)]
+    start_str, end_str = start_date.isoformat(), end_date.isoformat()
+
+    docs = {doc.id: doc.to_dict() if doc.exists else None for doc in db.get_all(refs + [_backfill_ref(user_id)])}
+    if not docs.pop(_backfill_ref(user_id).id, None):
+        # First read since the rollups were introduced: count the user's earlier events
+        rebuild_activity_rollups(user_id)
+        docs = {doc.id: doc.to_dict() if doc.exists else None for doc in db.get_all(refs)}
+
+    days = {}
+    for data in docs.values():
+        if not data:
+            continue
+        for day_str, counters in (data.get("days") or {}).items():
+            if start_str <= day_str <= end_str:
+                days[day_str] = counters
+    return days
+
+
+def _count_events(user_id: str) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], int]:
+    """Count a user's events up to today into daily counters, by ``YYYY-MM`` month."""
+    from app.services.firebase.reading_log import get_user_activity_history
+
+    months: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    counted = 0
+    for activity in get_user_activity_history(user_id, BACKFILL_START, date.today()):
+        counter = ACTIVITY_COUNTERS.get(activity.get("activity_type"))
+        day_str = activity.get("date")
+        if not counter or not day_str:
+            continue
+
+        day = months.setdefault(day_str[:7], {}).setdefault(day_str, {"total": 0})
+        day[counter] = day.get(counter, 0) + 1
+        day["total"] += 1
+        if counter == "articles":
+            categories = day.setdefault("categories", {})
+            category = activity.get("category") or "uncategorized"
+            categories[category] = categories.get(category, 0) + 1
+        counted += 1
+    return months, counted
+
+
+def rebuild_activity_rollups(user_id: str) -> int:
+    """Recompute a user's rollups from the raw activity events.
+
+    Used by ``get_activity_rollups`` to backfill users whose activity predates
+    the rollups. Only months with events get a document. Each document is read
+    before the events are counted and only rewritten if it is unchanged since,
+    since an event recorded in the meantime increments it in the same commit;
+    the rebuild is then retried so that event is counted too.
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        Number of events counted, or 0 if the rollups kept changing
+    """
+    read_months: List[str] = []
+    for _ in range(MAX_BACKFILL_ATTEMPTS):
+        snapshots = {doc.id: doc for doc in db.get_all([_rollup_ref(user_id, month) for month in read_months])}
+        months, counted = _count_events(user_id)
+        if not set(months) <= set(read_months):
+            # Read the documents of months with events first, then count again
+            read_months = sorted(set(read_months) | set(months))
+            continue
+
+        batch = db.batch()
+        for month, days in months.items():
+            data = {"user_id": user_id, "month": month, "days": days}
+            snapshot = snapshots[_rollup_ref(user_id, month).id]
+            if snapshot.exists:
+                batch.update(_rollup_ref(user_id, month), data,
+                             option=db.write_option(last_update_time=snapshot.update_time))
+            else:
+                batch.create(_rollup_ref(user_id, month), data)
+        batch.set(_backfill_ref(user_id), {"user_id": user_id, "backfilled_at": firestore.SERVER_TIMESTAMP})
+        try:
+            batch.commit()
+        except (AlreadyExists, FailedPrecondition):
+            logger.info(f"Activity rollups of user {user_id} changed while rebuilding, retrying")
+            continue
+
+        logger.info(f"Rebuilt activity rollups for user {user_id} from {counted} events")
+        return counted
+
+    logger.warning(f"Could not rebuild activity rollups for user {user_id}, will retry on next read")
+    return 0
@@ -1,16 +1,48 @@
+from collections import OrderedDict
 from functools import lru_cache
-from typing import List, Dict, Any, Optional
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from firebase_admin import firestore
 import time
 from datetime import datetime, timedelta
 
 from app.api.models import AssetType
-from .client import db
+from app.api.responses import PrecompressedJSON, precompress
+from .client import db, get_documents
+from .topic_mirror import (
+    get_mirrored_topic_cache,
+    get_mirrored_topic_docs,
+    is_topic_mirror_ready,
+    update_mirrored_topic_cache
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _get_topic_cache_doc(
+    category: str,
+    level: str,
+    field_paths: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """Get a topic_cache document, served from the in-process mirror when it is live.
+    
+    Args:
+        category: Financial category
+        level: Expertise level
+        field_paths: Fields to read when falling back to Firestore
+        
+    Returns:
+        Document data, or None if no cache exists
+    """
+    if is_topic_mirror_ready():
+        return get_mirrored_topic_cache(category, level)
+    
+    doc = db.collection('topic_cache').document(f"{category}_{level}").get(field_paths=field_paths)
+    return doc.to_dict() if doc.exists else None
+
+
 def get_cached_topics(category: str, level: str) -> Optional[List[Dict[str, Any]]]:
     """Retrieve cached topics for a category and expertise level.
     
@@ -21,15 +53,11 @@ def get_cached_topics(category: str, level: str) -> Optional[List[Dict[str, Any]
     Returns:
         List of topics if found and not expired, None otherwise
     """
-    db = firestore.client()
-    doc_ref = db.collection('topic_cache').document(f"{category}_{level}")
-    doc = doc_ref.get()
+    data = _get_topic_cache_doc(category, level, ['topics', 'timestamp'])
     
-    if not doc.exists:
+    if not data:
         return None
     
-    data = doc.to_dict()
-    
     # Check if cache is fresh (less than 1 day old)
     cache_time = data.get('timestamp', 0)
     current_time = time.time()
@@ -47,15 +75,18 @@ def cache_topics(category: str, level: str, topics: List[Dict[str, Any]]) -> Non
         level: Expertise level
         topics: List of topics to cache
     """
-    db = firestore.client()
     doc_ref = db.collection('topic_cache').document(f"{category}_{level}")
-    
-    doc_ref.set({
+    data = {
         'category': category,
         'level': level,
         'topics': topics,
         'timestamp': time.time()
-    })
+    }
+    
+    doc_ref.set(data)
+    
+    # Make the new topics visible before the listener delivers the change
+    update_mirrored_topic_cache(category, level, data)
 
 
 def get_cache_timestamp(category: str, level: str) -> Optional[datetime]:
@@ -68,14 +99,11 @@ def get_cache_timestamp(category: str, level: str) -> Optional[datetime]:
     Returns:
         Datetime when topics were last cached, or None if no cache exists
     """
-    db = firestore.client()
-    doc_ref = db.collection('topic_cache').document(f"{category}_{level}")
-    doc = doc_ref.get()
+    data = _get_topic_cache_doc(category, level, ['timestamp'])
     
-    if not doc.exists:
+    if not data:
         return None
     
-    data = doc.to_dict()
     timestamp = data.get('timestamp')
     
     if not timestamp:
@@ -126,14 +154,13 @@ def find_topic_by_id(topic_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         The topic dictionary if found, None otherwise
     """
-    db = firestore.client()
-    topics_collection = db.collection('topic_cache')
+    # Get all cached topic documents, from the mirror when it is live
+    if is_topic_mirror_ready():
+        docs = get_mirrored_topic_docs()
+    else:
+        docs = [doc.to_dict() for doc in db.collection('topic_cache').get()]
     
-    # Get all cached topic documents
-    docs = topics_collection.get()
-    
-    for doc in docs:
-        data = doc.to_dict()
+    for data in docs:
         topics = data.get('topics', [])
         
         # Search for topic with matching ID
@@ -150,6 +177,174 @@ def find_topic_by_id(topic_id: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def find_topics_by_ids(topic_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Find several topics by ID with a single pass over the topic caches.
+    
+    Args:
+        topic_ids: Topic IDs to find
+        
+    Returns:
+        Topics keyed by ID; IDs that were not found are omitted
+    """
+    wanted = set(topic_ids)
+    if not wanted:
+        return {}
+    
+    if is_topic_mirror_ready():
+        docs = get_mirrored_topic_docs()
+    else:
+        docs = [
+            doc.to_dict()
+            for doc in db.collection('topic_cache').select(['topics', 'category', 'level']).stream()
+        ]
+    
+    found = {}
+    for data in docs:
+        for topic in data.get('topics', []):
+            topic_id = topic.get('topic_id')
+            if topic_id in wanted and topic_id not in found:
+                if 'category' not in topic and 'category' in data:
+                    topic['category'] = data['category']
+                if 'expertise_level' not in topic and 'level' in data:
+                    topic['expertise_level'] = data['level']
+                found[topic_id] = topic
+    
+    return found
+
+
+# Versions of cached content, so conditional GETs can be answered without loading it
+MAX_CONTENT_VERSIONS = 10000
+_content_versions: Dict[str, Tuple[str, Optional[datetime], float]] = {}
+_content_versions_lock = threading.Lock()
+
+# How long a version of content stored in Firestore is trusted before it is read
+# again; another instance may have regenerated the content in the meantime
+CONTENT_VERSION_CHECK_SECONDS = float(os.environ.get("CONTENT_VERSION_CHECK_SECONDS", "5"))
+
+def set_content_version(key: str, version: str, expires_at: Optional[datetime] = None) -> None:
+    """Record the version of a piece of cached content.
+    
+    Args:
+        key: Content key, e.g. ``article:{topic_id}:{expertise_level}``
+        version: Opaque version, typically the time the content was cached
+        expires_at: When the cached content expires and the version stops being valid
+    """
+    with _content_versions_lock:
+        if key not in _content_versions and len(_content_versions) >= MAX_CONTENT_VERSIONS:
+            # Evict the oldest entry
+            _content_versions.pop(next(iter(_content_versions)), None)
+        _content_versions[key] = (version, expires_at, time.monotonic())
+
+def get_content_version(key: str) -> Optional[str]:
+    """Get the version of a piece of cached content as last seen by this instance.
+    
+    Args:
+        key: Content key
+        
+    Returns:
+        The version, or None if unknown or expired
+    """
+    with _content_versions_lock:
+        entry = _content_versions.get(key)
+        if entry is None:
+            return None
+        version, expires_at, _ = entry
+        if expires_at is not None and datetime.now() >= expires_at:
+            _content_versions.pop(key, None)
+            return None
+        return version
+
+def _forget_content_version(key: str) -> None:
+    """Drop the recorded version of content that is no longer cached."""
+    with _content_versions_lock:
+        _content_versions.pop(key, None)
+
+def get_stored_content_version(
+    key: str,
+    doc_ref,
+    version_field: str,
+    ttl: Optional[timedelta] = None
+) -> Optional[str]:
+    """Get the current version of cached content stored in a Firestore document.
+    
+    The version recorded by this instance is used while it was confirmed within
+    ``CONTENT_VERSION_CHECK_SECONDS``; after that only the version and expiry
+    fields of the document are read again, so content regenerated by another
+    instance is noticed.
+    
+    Args:
+        key: Content key
+        doc_ref: Document holding the cached content
+        version_field: Field holding the version, e.g. ``cached_at``
+        ttl: Lifetime of the content after its version, for documents
+            without an ``expires_at`` field
+        
+    Returns:
+        The version, or None if the content is not cached or expired
+    """
+    with _content_versions_lock:
+        entry = _content_versions.get(key)
+    if entry is not None and time.monotonic() - entry[2] < CONTENT_VERSION_CHECK_SECONDS:
+        return get_content_version(key)
+    
+    try:
+        doc = doc_ref.get(field_paths=[version_field, "expires_at"])
+    except Exception as e:
+        logger.error(f"Error checking version of {key}: {e}")
+        return None
+    data = doc.to_dict() if doc.exists else None
+    version = data.get(version_field) if data else None
+    if not version:
+        _forget_content_version(key)
+        return None
+    
+    if data.get("expires_at"):
+        expires_at = datetime.fromisoformat(data["expires_at"])
+    elif ttl is not None:
+        expires_at = datetime.fromisoformat(version) + ttl
+    else:
+        expires_at = None
+    if expires_at is not None and datetime.now() >= expires_at:
+        _forget_content_version(key)
+        return None
+    
+    set_content_version(key, version, expires_at)
+    return version
+
+def get_article_version(topic_id: str, expertise_level: str) -> Optional[str]:
+    """Get the current version of a cached article.
+    
+    Args:
+        topic_id: Topic ID
+        expertise_level: Expertise level
+        
+    Returns:
+        The version, or None if the article is not cached
+    """
+    return get_stored_content_version(
+        f"article:{topic_id}:{expertise_level}",
+        db.collection("article_cache").document(f"{topic_id}_{expertise_level}"),
+        "cached_at",
+        ttl=timedelta(days=7)
+    )
+
+def get_research_version(symbol: str, asset_type: str, expertise_level: str) -> Optional[str]:
+    """Get the current version of a cached research article.
+    
+    Args:
+        symbol: Asset symbol
+        asset_type: Type of asset
+        expertise_level: Expertise level
+        
+    Returns:
+        The version, or None if the research is not cached
+    """
+    return get_stored_content_version(
+        f"research:{symbol}:{asset_type}:{expertise_level}",
+        db.collection("research_cache").document(f"research_{symbol}_{asset_type}_{expertise_level}"),
+        "cached_at"
+    )
+
 def get_cached_article(topic_id: str, expertise_level: str) -> Optional[Dict[str, Any]]:
     """Retrieve a cached article from Firebase."""
     try:
@@ -163,6 +358,7 @@ def get_cached_article(topic_id: str, expertise_level: str) -> Optional[Dict[str
             if cached_time:
                 cache_date = datetime.fromisoformat(cached_time)
                 if datetime.now() - cache_date < timedelta(days=7):
+                    set_content_version(f"article:{topic_id}:{expertise_level}", cached_time, cache_date + timedelta(days=7))
                     return data.get("article")
         
         return None
@@ -170,16 +366,99 @@ def get_cached_article(topic_id: str, expertise_level: str) -> Optional[Dict[str
         logger.error(f"Error getting cached article: {e}")
         return None
 
-def cache_article(topic_id: str, expertise_level: str, article: Dict[str, Any]) -> None:
-    """Save an article to the Firebase cache."""
+# Serialized and pre-compressed cached content, so cache hits are returned
+# without re-encoding or recompressing
+MAX_CACHED_PAYLOADS = 500
+_payloads: "OrderedDict[str, Tuple[str, PrecompressedJSON]]" = OrderedDict()
+_payloads_lock = threading.Lock()
+
+def store_payload(key: str, version: str, content: Any) -> PrecompressedJSON:
+    """Serialize and compress cached content once and keep it for its cache version.
+    
+    Args:
+        key: Content key, as used for the content version
+        version: Cache version of the content
+        content: Content to serialize
+        
+    Returns:
+        The stored payload
+    """
+    payload = precompress(content)
+    with _payloads_lock:
+        _payloads[key] = (version, payload)
+        _payloads.move_to_end(key)
+        while len(_payloads) > MAX_CACHED_PAYLOADS:
+            _payloads.popitem(last=False)
+    return payload
+
+def get_payload(key: str, version: Optional[str]) -> Optional[PrecompressedJSON]:
+    """Get the stored payload of cached content if it matches the current version.
+    
+    Args:
+        key: Content key
+        version: Current version of the content, as stored in Firestore
+        
+    Returns:
+        The payload, or None if none is stored for the current version
+    """
+    if not version:
+        return None
+    with _payloads_lock:
+        entry = _payloads.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        _payloads.move_to_end(key)
+        return entry[1]
+
+def get_cached_article_payload(topic_id: str, expertise_level: str) -> Optional[PrecompressedJSON]:
+    """Get a cached article as a serialized, pre-compressed payload.
+    
+    Args:
+        topic_id: Topic ID
+        expertise_level: Expertise level
+        
+    Returns:
+        The article payload, or None if it is not cached
+    """
+    key = f"article:{topic_id}:{expertise_level}"
+    version = get_article_version(topic_id, expertise_level)
+    if not version:
+        return None
+    payload = get_payload(key, version)
+    if payload is not None:
+        return payload
+    
+    article = get_cached_article(topic_id, expertise_level)
+    version = get_content_version(key)
+    if article is None or not version:
+        return None
+    return store_payload(key, version, article)
+
+def cache_article(
+    topic_id: str,
+    expertise_level: str,
+    article: Dict[str, Any],
+    cached_at: Optional[datetime] = None
+) -> None:
+    """Save an article to the Firebase cache.
+    
+    Args:
+        topic_id: Topic ID
+        expertise_level: Expertise level
+        article: Generated article
+        cached_at: Cache time, which is the article's version (defaults to now)
+    """
     try:
         doc_ref = db.collection("article_cache").document(f"{topic_id}_{expertise_level}")
+        now = cached_at or datetime.now()
         doc_ref.set({
             "article": article,
             "topic_id": topic_id,
             "expertise_level": expertise_level,
-            "cached_at": datetime.now().isoformat()
+            "cached_at": now.isoformat()
         })
+        set_content_version(f"article:{topic_id}:{expertise_level}", now.isoformat(), now + timedelta(days=7))
+        store_payload(f"article:{topic_id}:{expertise_level}", now.isoformat(), article)
     except Exception as e:
         logger.error(f"Error caching article: {e}")
 
@@ -246,14 +525,19 @@ def cache_research_article(symbol: str, asset_type: str, expertise_level: str, r
     try:
         cache_key = f"research_{symbol}_{asset_type}_{expertise_level}"
         doc_ref = db.collection("research_cache").document(cache_key)
+        now = datetime.now()
         doc_ref.set({
             "research": research,
             "symbol": symbol,
             "asset_type": asset_type,
             "expertise_level": expertise_level,
-            "cached_at": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(days=1)).isoformat()
+            "cached_at": now.isoformat(),
+            "expires_at": (now + timedelta(days=1)).isoformat()
         })
+        
+        version_key = f"research:{symbol}:{asset_type}:{expertise_level}"
+        set_content_version(version_key, now.isoformat(), now + timedelta(days=1))
+        store_payload(version_key, now.isoformat(), research)
     except Exception as e:
         logger.error(f"Error caching research article: {e}")
 
@@ -270,6 +554,8 @@ def get_cached_research(symbol: str, asset_type: str, expertise_level: str) -> O
             if data.get("expires_at"):
                 expires_at = datetime.fromisoformat(data["expires_at"])
                 if datetime.now() < expires_at:
+                    if data.get("cached_at"):
+                        set_content_version(f"research:{symbol}:{asset_type}:{expertise_level}", data["cached_at"], expires_at)
                     return data.get("research")
         
         return None
@@ -279,6 +565,32 @@ def get_cached_research(symbol: str, asset_type: str, expertise_level: str) -> O
     
 
 
+def get_cached_research_payload(symbol: str, asset_type: str, expertise_level: str) -> Optional[PrecompressedJSON]:
+    """Get a cached research article as a serialized, pre-compressed payload.
+    
+    Args:
+        symbol: Asset symbol
+        asset_type: Type of asset
+        expertise_level: Expertise level
+        
+    Returns:
+        The research payload, or None if it is not cached
+    """
+    key = f"research:{symbol}:{asset_type}:{expertise_level}"
+    version = get_research_version(symbol, asset_type, expertise_level)
+    if not version:
+        return None
+    payload = get_payload(key, version)
+    if payload is not None:
+        return payload
+    
+    research = get_cached_research(symbol, asset_type, expertise_level)
+    version = get_content_version(key)
+    if research is None or not version:
+        return None
+    return store_payload(key, version, research)
+
+
 def get_cached_user_summary(
     user_id: str, 
     period: str,
@@ -288,18 +600,20 @@ def get_cached_user_summary(
     """Get cached summary if available and valid."""
     try:
         cache_key = f"user_summary:{user_id}:{period}:{start_date_str}:{end_date_str}"
-        doc = db.collection("user_summary_cache").document(cache_key).get()
         
-        if not doc.exists:
-            return None
-            
-        cache_data = doc.to_dict()
+        # Read the summary and the user's last activity timestamps in one round trip
+        cache_data, last_activity = get_documents(
+            [
+                db.collection("user_summary_cache").document(cache_key),
+                db.collection("user_activity_timestamps").document(user_id)
+            ],
+            field_paths=["data", "cached_at", "last_read_at", "last_tooltip_at"]
+        )
         
-        # Get user's last activity timestamp
-        last_activity_doc = db.collection("user_activity_timestamps").document(user_id).get()
+        if cache_data is None:
+            return None
         
-        if last_activity_doc.exists:
-            last_activity = last_activity_doc.to_dict()
+        if last_activity is not None:
             last_read_at = last_activity.get("last_read_at")
             last_tooltip_at = last_activity.get("last_tooltip_at")
             
@@ -354,8 +668,14 @@ def cache_user_summary(
     except Exception as e:
         logger.error(f"Error caching user summary: {e}")
 
-def update_user_activity_timestamp(user_id: str, activity_type: str) -> None:
-    """Update user's last activity timestamp when they read articles or view tooltips."""
+def update_user_activity_timestamp(user_id: str, activity_type: str, batch: Any = None) -> None:
+    """Update user's last activity timestamp when they read articles or view tooltips.
+    
+    Args:
+        user_id: User identifier
+        activity_type: Type of activity
+        batch: Optional write batch to add the update to instead of writing directly
+    """
     try:
         now = datetime.now().isoformat()
         
@@ -367,10 +687,15 @@ def update_user_activity_timestamp(user_id: str, activity_type: str) -> None:
         else:
             field = f"last_{activity_type}_at"
         
-        db.collection("user_activity_timestamps").document(user_id).set({
+        timestamps_ref = db.collection("user_activity_timestamps").document(user_id)
+        timestamps = {
             field: now,
             "updated_at": now
-        }, merge=True)
+        }
+        if batch is not None:
+            batch.set(timestamps_ref, timestamps, merge=True)
+        else:
+            timestamps_ref.set(timestamps, merge=True)
         
     except Exception as e:
         logger.error(f"Error updating activity timestamp: {e}")
@@ -397,10 +722,8 @@ def get_asset_comparison_cache(cache_key: str) -> Optional[Dict[str, Any]]:
         cache_data = cache_doc.to_dict()
         expiry_time = cache_data.get('expiry_time', 0)
         
-        # Check if cache has expired
+        # Check if cache has expired (the TTL sweeper deletes it later)
         if expiry_time < time.time():
-            # Expired cache, delete it in background
-            cache_ref.delete()
             return None
             
         return cache_data.get('data')
@@ -1,5 +1,5 @@
 from typing import List
-from firebase_admin import firestore
+from .client import db
 
 def get_user_categories(user_id: str) -> List[str]:
     """Get the financial categories a user has selected.
@@ -11,7 +11,6 @@ def get_user_categories(user_id: str) -> List[str]:
         List of category names
     """
     # Firebase implementation to fetch user categories
-    db = firestore.client()
     user_doc = db.collection('users').document(user_id).get()
     
     if not user_doc.exists:
@@ -1,31 +1,111 @@
+import logging
+import os
+import threading
+
 import firebase_admin
 from firebase_admin import credentials, firestore
-from google.cloud import storage
-import os
+
+from app.services.workers import FIRESTORE_POOL, run_in_pool
+from .instrumentation import instrument_client
+from .memory_client import InMemoryFirestore, parse_latency_spec
+
+logger = logging.getLogger(__name__)
+
+# Set FIRESTORE_BACKEND=memory to use the in-memory stand-in instead of Firestore
+FIRESTORE_BACKEND = os.environ.get("FIRESTORE_BACKEND", "firestore")
+
+CREDENTIALS_BUCKET = os.environ.get("FIREBASE_CREDENTIALS_BUCKET", "run-sources-stunning-vertex-460610-b7-asia-south1")
+CREDENTIALS_BLOB = os.environ.get("FIREBASE_CREDENTIALS_BLOB", "secret/service_acount.json")
+
+_client_lock = threading.Lock()
 
 def download_service_account_file(bucket_name: str, blob_name: str, destination_path: str):
     """Download the service account file from GCS."""
+    # Imported here so processes that never download don't pay for the import
+    from google.cloud import storage
+
     client = storage.Client()
     bucket = client.bucket(bucket_name)
     blob = bucket.blob(blob_name)
     blob.download_to_filename(destination_path)
     print(f"Downloaded {blob_name} from bucket {bucket_name} to {destination_path}")
 
+def _get_credentials():
+    """Resolve Firebase credentials.
+    
+    Uses the service account file at FIREBASE_CREDENTIALS_PATH, downloading it
+    from GCS if it is missing. Falls back to application default credentials
+    (e.g. the Cloud Run service account) when no path is configured or the
+    download fails.
+    """
+    cred_path = os.environ.get("FIREBASE_CREDENTIALS_PATH")
+    if not cred_path:
+        return credentials.ApplicationDefault()
+    
+    if not os.path.exists(cred_path):
+        try:
+            download_service_account_file(CREDENTIALS_BUCKET, CREDENTIALS_BLOB, cred_path)
+        except Exception as e:
+            logger.warning(f"Could not download service account file, using application default credentials: {e}")
+            return credentials.ApplicationDefault()
+    
+    return credentials.Certificate(cred_path)
+
 def get_firebase_client():
-    """Get or initialize the Firebase client."""
+    """Get or initialize the Firebase client.
+    
+    The client is created on first use rather than at import time, so the app
+    can start serving before credentials are resolved.
+    """
     if not hasattr(get_firebase_client, "db"):
-        # Ensure the service account file is downloaded
-        cred_path = os.environ.get("FIREBASE_CREDENTIALS_PATH")
-        if not os.path.exists(cred_path):
-            bucket_name = "run-sources-stunning-vertex-460610-b7-asia-south1"  # Replace with your GCS bucket name
-            blob_name = "secret/service_acount.json"  # Replace with the file name in the bucket
-            download_service_account_file(bucket_name, blob_name, cred_path)
-
-        # Initialize Firebase
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
-        get_firebase_client.db = firestore.client()
+        with _client_lock:
+            if hasattr(get_firebase_client, "db"):
+                return get_firebase_client.db
+            
+            if FIRESTORE_BACKEND == "memory":
+                # Offline stand-in, optionally slowed down by FAKE_FIRESTORE_LATENCY_MS
+                latency = parse_latency_spec(os.environ.get("FAKE_FIRESTORE_LATENCY_MS", ""))
+                get_firebase_client.db = instrument_client(InMemoryFirestore(latency=latency))
+                return get_firebase_client.db
+            
+            # Initialize Firebase
+            firebase_admin.initialize_app(_get_credentials())
+            get_firebase_client.db = instrument_client(firestore.client())
+            logger.info("Initialized Firebase client")
     return get_firebase_client.db
 
-# Singleton pattern
-db = get_firebase_client()
\ No newline at end of file
+async def warm_up_firebase_client() -> None:
+    """Initialize the Firebase client in a worker thread."""
+    try:
+        await run_in_pool(FIRESTORE_POOL, get_firebase_client)
+    except Exception as e:
+        logger.error(f"Firebase client warm-up failed: {e}")
+
+def get_documents(refs, field_paths=None):
+    """Read several documents in a single round trip.
+    
+    Args:
+        refs: Document references to read
+        field_paths: Optional field mask applied to every document
+        
+    Returns:
+        Document data (or None for missing documents) in the order of ``refs``
+    """
+    refs = list(refs)
+    if not refs:
+        return []
+    
+    found = {
+        snapshot.reference.path: snapshot.to_dict() if snapshot.exists else None
+        for snapshot in get_firebase_client().get_all(refs, field_paths=field_paths)
+    }
+    return [found.get(ref.path) for ref in refs]
+
+class _LazyFirebaseClient:
+    """Stand-in for the Firestore client that initializes it on first use."""
+    
+    def __getattr__(self, name):
+        return getattr(get_firebase_client(), name)
+
+# Shared client, initialized lazily
+db = _LazyFirebaseClient()
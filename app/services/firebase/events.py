@@ -0,0 +1,132 @@
+"""Unified pipeline for user activity events.
+
+Every user action is appended once, as a typed event, to the
+``user_learning_activity`` collection. The views derived from events (daily
+rollups, streaks, the reading index, activity timestamps and asset research
+counters) are all updated by one consumer, ``apply_event``, in the same
+batch as the event itself, so recording an action is a single commit.
+
+Event types:
+    topic_view: A learning article was opened (topic_id, topic_title, category, expertise_level)
+    tooltip_view: A tooltip was opened (word, tooltip, topic_id, topic_title)
+    news_view: A news article was opened (news_id, topics)
+    topic_read: A topic was read outside the learning articles (topic, subtopic, category)
+    asset_research: An asset was researched (symbol, asset_type)
+"""
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from google.api_core.exceptions import AlreadyExists
+
+from .activity_rollups import increment_activity_rollup
+from .client import db
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "user_learning_activity"
+
+# Events that keep the daily streak going, and whether they count as an article read
+STREAK_EVENTS = {
+    "topic_view": True,
+    "news_view": True,
+    "tooltip_view": False,
+    "topic_read": False,
+}
+
+# Events that invalidate cached summaries through the activity timestamps
+TIMESTAMP_EVENTS = {"topic_view", "tooltip_view"}
+
+
+def event_doc_id(*parts: str) -> str:
+    """Build a deterministic event document id from its parts."""
+    return "_".join(str(part).replace("/", "_") for part in parts)
+
+
+def apply_event(batch: Any, event: Dict[str, Any], is_new: bool = True) -> None:
+    """Add the updates of every view derived from an event to a batch.
+
+    Args:
+        batch: Write batch the event itself is written in
+        event: Event data as stored in the events collection
+        is_new: False when the event repeats one already recorded (same
+            event id), in which case only recency fields are refreshed
+    """
+    # Imported here because these modules record events through this one
+    from .cache import update_user_activity_timestamp
+    from .reading_log import update_reading_index, update_user_streak
+    from .watchlist import increment_asset_research_counters
+
+    user_id = event["user_id"]
+    event_type = event["activity_type"]
+
+    if is_new:
+        increment_activity_rollup(
+            user_id,
+            event_type,
+            category=event.get("category"),
+            day=date.fromisoformat(event["date"]),
+            batch=batch
+        )
+
+        if event_type in STREAK_EVENTS:
+            update_user_streak(user_id, is_article_view=STREAK_EVENTS[event_type], batch=batch)
+
+        if event_type == "asset_research":
+            increment_asset_research_counters(user_id, event["symbol"], event["asset_type"], batch=batch)
+
+    if event_type == "topic_view":
+        update_reading_index(
+            user_id,
+            event["topic_id"],
+            event.get("category"),
+            event.get("topic_title"),
+            event.get("expertise_level"),
+            event["timestamp"],
+            batch=batch
+        )
+
+    if event_type in TIMESTAMP_EVENTS:
+        update_user_activity_timestamp(user_id, event_type, batch=batch)
+
+
+def record_event(user_id: str, event_type: str, event_id: Optional[str] = None, **fields: Any) -> bool:
+    """Append an activity event and update its derived views in one commit.
+
+    Args:
+        user_id: User identifier
+        event_type: Type of event (see module docstring)
+        event_id: Optional deterministic document id. A second event with the
+            same id is not appended again; it only refreshes recency fields.
+        **fields: Event-specific fields
+
+    Returns:
+        True if a new event was recorded, False if it repeated an existing one
+    """
+    now = datetime.now()
+    event = {
+        "user_id": user_id,
+        "activity_type": event_type,
+        "timestamp": now,
+        "date": now.date().isoformat(),
+        **fields
+    }
+
+    collection = db.collection(EVENTS_COLLECTION)
+    batch = db.batch()
+    if event_id is None:
+        batch.set(collection.document(), event)
+    else:
+        # Fails on commit if the event was already recorded
+        batch.create(collection.document(event_id), event)
+    apply_event(batch, event)
+
+    try:
+        batch.commit()
+        return True
+    except AlreadyExists:
+        batch = db.batch()
+        batch.set(collection.document(event_id), {"timestamp": now}, merge=True)
+        apply_event(batch, event, is_new=False)
+        batch.commit()
+        return False
@@ -0,0 +1,369 @@
+"""Firestore operation accounting.
+
+The shared client is wrapped in thin proxies that count reads, writes,
+deletes, queries, returned documents and estimated document bytes, and time
+every call that goes over the wire. Counts go to process-wide per-operation
+totals and, when a request is being served, to that request's
+``FirestoreRequestStats`` (carried in a context variable, so work offloaded
+to a worker pool is attributed to the request that started it).
+
+Set FIRESTORE_INSTRUMENTATION=0 to use the bare client.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FIRESTORE_INSTRUMENTATION_ENABLED = os.environ.get("FIRESTORE_INSTRUMENTATION", "1") != "0"
+
+# Builder methods of queries and collections that return another query
+_QUERY_BUILDERS = {
+    "where", "order_by", "limit", "limit_to_last", "offset", "select",
+    "start_at", "start_after", "end_at", "end_before",
+}
+
+
+class FirestoreRequestStats:
+    """Firestore operations performed while serving one request."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+        self.queries = 0
+        self.documents = 0
+        self.bytes = 0
+        self.calls = 0
+        self.duration_ms = 0.0
+
+    def add(self, reads: int = 0, writes: int = 0, deletes: int = 0, queries: int = 0,
+            documents: int = 0, size: int = 0, duration_ms: float = 0.0) -> None:
+        with self._lock:
+            self.reads += reads
+            self.writes += writes
+            self.deletes += deletes
+            self.queries += queries
+            self.documents += documents
+            self.bytes += size
+            self.calls += 1
+            self.duration_ms += duration_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "reads": self.reads,
+                "writes": self.writes,
+                "deletes": self.deletes,
+                "queries": self.queries,
+                "documents": self.documents,
+                "bytes": self.bytes,
+                "calls": self.calls,
+                "duration_ms": round(self.duration_ms, 2)
+            }
+
+
+_current_stats: contextvars.ContextVar[Optional[FirestoreRequestStats]] = contextvars.ContextVar(
+    "firestore_request_stats", default=None
+)
+
+_totals_lock = threading.Lock()
+_operation_totals: Dict[str, Dict[str, float]] = {}
+_route_totals: Dict[str, Dict[str, float]] = {}
+
+
+def start_request_stats() -> contextvars.Token:
+    """Start counting Firestore operations for the current request.
+
+    Returns:
+        Token to pass to ``finish_request_stats``
+    """
+    return _current_stats.set(FirestoreRequestStats())
+
+
+def get_request_stats() -> Optional[FirestoreRequestStats]:
+    """Get the stats of the request being served, if any."""
+    return _current_stats.get()
+
+
+def finish_request_stats(token: contextvars.Token) -> None:
+    """Stop attributing Firestore operations to the current request."""
+    _current_stats.reset(token)
+
+
+def record_route_stats(route: str, stats: FirestoreRequestStats) -> None:
+    """Add one finished request's Firestore operations to its route's totals.
+
+    Args:
+        route: Route identifier, e.g. ``GET learning.get_yearly_heatmap``
+        stats: Stats of the finished request
+    """
+    request_totals = stats.to_dict()
+    with _totals_lock:
+        totals = _route_totals.setdefault(route, {"requests": 0, "max_reads": 0})
+        totals["requests"] += 1
+        totals["max_reads"] = max(totals["max_reads"], request_totals["reads"])
+        for key, value in request_totals.items():
+            totals[key] = totals.get(key, 0) + value
+
+
+def get_route_totals() -> Dict[str, Dict[str, float]]:
+    """Get Firestore operation totals and per-request averages for each route."""
+    with _totals_lock:
+        totals = {route: dict(values) for route, values in _route_totals.items()}
+    for values in totals.values():
+        requests = values["requests"]
+        values["avg_reads"] = round(values.get("reads", 0) / requests, 2)
+        values["avg_writes"] = round(values.get("writes", 0) / requests, 2)
+        values["avg_duration_ms"] = round(values.get("duration_ms", 0) / requests, 2)
+        values["duration_ms"] = round(values.get("duration_ms", 0), 2)
+    return totals
+
+
+def get_operation_totals() -> Dict[str, Dict[str, float]]:
+    """Get process-wide call counts, documents, bytes and latency per operation."""
+    with _totals_lock:
+        totals = {op: dict(values) for op, values in _operation_totals.items()}
+    for values in totals.values():
+        values["avg_ms"] = round(values["total_ms"] / values["calls"], 2) if values["calls"] else 0.0
+        values["total_ms"] = round(values["total_ms"], 2)
+        values["max_ms"] = round(values["max_ms"], 2)
+    return totals
+
+
+def reset_operation_totals() -> None:
+    """Clear the process-wide operation and route totals."""
+    with _totals_lock:
+        _operation_totals.clear()
+        _route_totals.clear()
+
+
+def estimate_document_size(value: Any) -> int:
+    """Estimate the stored size of a Firestore value in bytes.
+
+    Follows Firestore's storage size rules: strings are their UTF-8 length
+    plus one, numbers and timestamps 8 bytes, booleans and nulls 1 byte, and
+    maps the sum of their keys and values.
+    """
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, datetime, date)):
+        return 8
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, bytes):
+        return len(value) + 1
+    if isinstance(value, dict):
+        return sum(len(str(key).encode("utf-8")) + 1 + estimate_document_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_document_size(item) for item in value)
+    # Sentinels, references and geo points
+    return 16
+
+
+def _snapshot_size(snapshot: Any) -> int:
+    if not getattr(snapshot, "exists", False):
+        return 0
+    return estimate_document_size(snapshot.to_dict())
+
+
+def _record(op: str, started: float, reads: int = 0, writes: int = 0, deletes: int = 0,
+            queries: int = 0, documents: int = 0, size: int = 0) -> None:
+    """Record one Firestore call in the totals and the current request's stats."""
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    with _totals_lock:
+        totals = _operation_totals.setdefault(
+            op, {"calls": 0, "documents": 0, "bytes": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        totals["calls"] += 1
+        totals["documents"] += documents
+        totals["bytes"] += size
+        totals["total_ms"] += duration_ms
+        totals["max_ms"] = max(totals["max_ms"], duration_ms)
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(reads=reads, writes=writes, deletes=deletes, queries=queries,
+                  documents=documents, size=size, duration_ms=duration_ms)
+
+
+def _unwrap(value: Any) -> Any:
+    """Get the underlying Firestore object of an instrumented proxy."""
+    return value._wrapped if isinstance(value, _InstrumentedProxy) else value
+
+
+class _InstrumentedProxy:
+    """Base proxy that forwards everything it does not instrument."""
+
+    def __init__(self, wrapped: Any) -> None:
+        self._wrapped = wrapped
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+    def __eq__(self, other: Any) -> bool:
+        return self._wrapped == _unwrap(other)
+
+    def __hash__(self) -> int:
+        return hash(self._wrapped)
+
+    def __repr__(self) -> str:
+        return f"<instrumented {self._wrapped!r}>"
+
+
+class InstrumentedDocumentReference(_InstrumentedProxy):
+    """Document reference that accounts for its reads and writes."""
+
+    def collection(self, collection_id: str) -> "InstrumentedQuery":
+        return InstrumentedQuery(self._wrapped.collection(collection_id))
+
+    def get(self, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        snapshot = self._wrapped.get(*args, **kwargs)
+        _record("get", started, reads=1, documents=int(snapshot.exists), size=_snapshot_size(snapshot))
+        return snapshot
+
+    def _write(self, op: str, method: str, data: Any, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        result = getattr(self._wrapped, method)(data, *args, **kwargs)
+        _record(op, started, writes=1, size=estimate_document_size(data))
+        return result
+
+    def set(self, document_data: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        return self._write("set", "set", document_data, *args, **kwargs)
+
+    def create(self, document_data: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        return self._write("create", "create", document_data, *args, **kwargs)
+
+    def update(self, field_updates: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        return self._write("update", "update", field_updates, *args, **kwargs)
+
+    def delete(self, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        result = self._wrapped.delete(*args, **kwargs)
+        _record("delete", started, deletes=1)
+        return result
+
+
+class InstrumentedQuery(_InstrumentedProxy):
+    """Query or collection reference that accounts for the documents it returns."""
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._wrapped, name)
+        if name in _QUERY_BUILDERS:
+            def build(*args: Any, **kwargs: Any) -> "InstrumentedQuery":
+                return InstrumentedQuery(attr(*args, **kwargs))
+            return build
+        return attr
+
+    def document(self, *args: Any, **kwargs: Any) -> InstrumentedDocumentReference:
+        return InstrumentedDocumentReference(self._wrapped.document(*args, **kwargs))
+
+    def add(self, document_data: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        result = self._wrapped.add(document_data, *args, **kwargs)
+        _record("add", started, writes=1, size=estimate_document_size(document_data))
+        return result
+
+    def list_documents(self, *args: Any, **kwargs: Any) -> List[InstrumentedDocumentReference]:
+        started = time.perf_counter()
+        refs = list(self._wrapped.list_documents(*args, **kwargs))
+        _record("list_documents", started, queries=1, documents=len(refs))
+        return [InstrumentedDocumentReference(ref) for ref in refs]
+
+    def stream(self, *args: Any, **kwargs: Any) -> Iterable[Any]:
+        started = time.perf_counter()
+        count = 0
+        size = 0
+        try:
+            for snapshot in self._wrapped.stream(*args, **kwargs):
+                count += 1
+                size += _snapshot_size(snapshot)
+                yield snapshot
+        finally:
+            # A query costs at least one read even when it matches nothing
+            _record("query", started, reads=max(count, 1), queries=1, documents=count, size=size)
+
+    def get(self, *args: Any, **kwargs: Any) -> List[Any]:
+        return list(self.stream(*args, **kwargs))
+
+
+class InstrumentedWriteBatch(_InstrumentedProxy):
+    """Write batch that accounts for its writes when committed."""
+
+    def __init__(self, wrapped: Any) -> None:
+        super().__init__(wrapped)
+        self._writes = 0
+        self._deletes = 0
+        self._size = 0
+
+    def _add(self, method: str, reference: Any, data: Any = None, *args: Any, **kwargs: Any) -> "InstrumentedWriteBatch":
+        call_args = (_unwrap(reference),) if data is None else (_unwrap(reference), data)
+        getattr(self._wrapped, method)(*call_args, *args, **kwargs)
+        if method == "delete":
+            self._deletes += 1
+        else:
+            self._writes += 1
+            self._size += estimate_document_size(data)
+        return self
+
+    def set(self, reference: Any, document_data: Dict[str, Any], *args: Any, **kwargs: Any) -> "InstrumentedWriteBatch":
+        return self._add("set", reference, document_data, *args, **kwargs)
+
+    def create(self, reference: Any, document_data: Dict[str, Any], *args: Any, **kwargs: Any) -> "InstrumentedWriteBatch":
+        return self._add("create", reference, document_data, *args, **kwargs)
+
+    def update(self, reference: Any, field_updates: Dict[str, Any], *args: Any, **kwargs: Any) -> "InstrumentedWriteBatch":
+        return self._add("update", reference, field_updates, *args, **kwargs)
+
+    def delete(self, reference: Any, *args: Any, **kwargs: Any) -> "InstrumentedWriteBatch":
+        return self._add("delete", reference, None, *args, **kwargs)
+
+    def commit(self, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        result = self._wrapped.commit(*args, **kwargs)
+        _record("commit", started, writes=self._writes, deletes=self._deletes, size=self._size)
+        return result
+
+
+class InstrumentedClient(_InstrumentedProxy):
+    """Firestore client whose references, queries and batches are instrumented."""
+
+    def collection(self, *args: Any, **kwargs: Any) -> InstrumentedQuery:
+        return InstrumentedQuery(self._wrapped.collection(*args, **kwargs))
+
+    def collection_group(self, *args: Any, **kwargs: Any) -> InstrumentedQuery:
+        return InstrumentedQuery(self._wrapped.collection_group(*args, **kwargs))
+
+    def document(self, *args: Any, **kwargs: Any) -> InstrumentedDocumentReference:
+        return InstrumentedDocumentReference(self._wrapped.document(*args, **kwargs))
+
+    def batch(self, *args: Any, **kwargs: Any) -> InstrumentedWriteBatch:
+        return InstrumentedWriteBatch(self._wrapped.batch(*args, **kwargs))
+
+    def get_all(self, references: Iterable[Any], *args: Any, **kwargs: Any) -> Iterable[Any]:
+        references = [_unwrap(ref) for ref in references]
+        started = time.perf_counter()
+        count = 0
+        size = 0
+        try:
+            for snapshot in self._wrapped.get_all(references, *args, **kwargs):
+                if snapshot.exists:
+                    count += 1
+                    size += _snapshot_size(snapshot)
+                yield snapshot
+        finally:
+            _record("get_all", started, reads=len(references), documents=count, size=size)
+
+
+def instrument_client(client: Any) -> Any:
+    """Wrap a Firestore client for operation accounting, if enabled."""
+    if not FIRESTORE_INSTRUMENTATION_ENABLED:
+        return client
+    return InstrumentedClient(client)
@@ -0,0 +1,582 @@
+"""In-memory stand-in for the Firestore client.
+
+This module implements the subset of the Firestore client API used by the app
+(collections, documents, queries, batches, update time preconditions and
+snapshot listeners) on top of
+plain dictionaries. It is selected with ``FIRESTORE_BACKEND=memory`` and lets
+the app be benchmarked or load-tested without cloud access.
+
+Every operation is counted and can be slowed down by a configurable latency, so
+changes in Firestore usage can be measured offline.
+"""
+import copy
+import random
+import string
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1 import transforms
+
+_MISSING = object()
+
+
+def parse_latency_spec(spec: str) -> Dict[str, float]:
+    """Parse a latency spec such as ``"10"`` or ``"get=5,query=20,default=2"``.
+
+    Args:
+        spec: Milliseconds for every operation, or comma-separated op=ms pairs
+
+    Returns:
+        Mapping of operation name to latency in seconds
+    """
+    latency = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        op, _, ms = part.rpartition("=")
+        latency[op or "default"] = float(ms) / 1000
+    return latency
+
+
+def _random_id() -> str:
+    """Generate a 20-character document id like Firestore does."""
+    alphabet = string.ascii_letters + string.digits
+    return "".join(random.choices(alphabet, k=20))
+
+
+def _split_field_path(field_path: str) -> List[str]:
+    """Split a dotted field path, honouring backtick-quoted segments."""
+    parts, current, quoted = [], "", False
+    for char in field_path:
+        if char == "`":
+            quoted = not quoted
+        elif char == "." and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+
+def _get_path(data: Dict[str, Any], parts: List[str]) -> Any:
+    """Read a nested value, returning ``_MISSING`` if any segment is absent."""
+    value = data
+    for part in parts:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _resolve(current: Any, value: Any) -> Any:
+    """Resolve transform sentinels against the current field value."""
+    if value is transforms.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, transforms.Increment):
+        base = current if isinstance(current, (int, float)) else 0
+        return base + value.value
+    if isinstance(value, transforms.Maximum):
+        return value.value if not isinstance(current, (int, float)) else max(current, value.value)
+    if isinstance(value, transforms.Minimum):
+        return value.value if not isinstance(current, (int, float)) else min(current, value.value)
+    if isinstance(value, transforms.ArrayUnion):
+        result = list(current) if isinstance(current, list) else []
+        result.extend(v for v in value.values if v not in result)
+        return result
+    if isinstance(value, transforms.ArrayRemove):
+        result = list(current) if isinstance(current, list) else []
+        return [v for v in result if v not in value.values]
+    if isinstance(value, dict):
+        return {
+            key: _resolve(_MISSING, item)
+            for key, item in value.items()
+            if item is not transforms.DELETE_FIELD
+        }
+    return copy.deepcopy(value)
+
+
+def _set_path(data: Dict[str, Any], parts: List[str], value: Any) -> None:
+    """Write (or delete) a nested value, creating intermediate maps."""
+    target = data
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    if value is transforms.DELETE_FIELD:
+        target.pop(parts[-1], None)
+    else:
+        target[parts[-1]] = _resolve(target.get(parts[-1], _MISSING), value)
+
+
+def _merge(target: Dict[str, Any], data: Dict[str, Any]) -> None:
+    """Merge nested maps the way ``set(..., merge=True)`` does."""
+    for key, value in data.items():
+        # An empty map is a leaf: it replaces the field like any other value
+        if isinstance(value, dict) and value and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            _set_path(target, [key], value)
+
+
+def _project(data: Dict[str, Any], field_paths: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested field paths of a document."""
+    if field_paths is None:
+        return data
+    projected: Dict[str, Any] = {}
+    for field_path in field_paths:
+        parts = _split_field_path(field_path)
+        value = _get_path(data, parts)
+        if value is not _MISSING:
+            _set_path(projected, parts, value)
+    return projected
+
+
+def _compare(value: Any, op: str, expected: Any) -> bool:
+    """Evaluate a query filter against a field value."""
+    if value is _MISSING:
+        # Documents without the field never match, not even != filters
+        return False
+    try:
+        if op == "==":
+            return value == expected
+        if op == "!=":
+            return value != expected
+        if op == "<":
+            return value < expected
+        if op == "<=":
+            return value <= expected
+        if op == ">":
+            return value > expected
+        if op == ">=":
+            return value >= expected
+        if op == "in":
+            return value in expected
+        if op == "not-in":
+            return value not in expected
+        if op == "array_contains":
+            return isinstance(value, list) and expected in value
+        if op == "array_contains_any":
+            return isinstance(value, list) and any(v in value for v in expected)
+    except TypeError:
+        # Firestore never matches range filters across value types
+        return False
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+class DocumentSnapshot:
+    """Snapshot of a document at the time it was read."""
+
+    def __init__(self, reference: "DocumentReference", data: Optional[Dict[str, Any]],
+                 update_time: Optional[datetime] = None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self.update_time = update_time
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str) -> Any:
+        value = _get_path(self._data or {}, _split_field_path(field_path))
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class LastUpdateOption:
+    """Write precondition returned by ``write_option``: the document is unchanged since a read."""
+
+    def __init__(self, last_update_time: datetime):
+        self.last_update_time = last_update_time
+
+
+class _ChangeType:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _DocumentChange:
+    def __init__(self, change_type: str, document: DocumentSnapshot):
+        self.type = _ChangeType(change_type)
+        self.document = document
+
+
+class _Watch:
+    """Handle returned by ``on_snapshot``."""
+
+    def __init__(self, client: "InMemoryFirestore", collection_path: str, callback: Callable):
+        self._client = client
+        self.collection_path = collection_path
+        self.callback = callback
+        self.is_active = True
+
+    def unsubscribe(self) -> None:
+        self.is_active = False
+        self._client._remove_watch(self)
+
+    close = unsubscribe
+
+
+class DocumentReference:
+    """Reference to a document path."""
+
+    def __init__(self, client: "InMemoryFirestore", path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> "CollectionReference":
+        return CollectionReference(self._client, self.path.rsplit("/", 1)[0])
+
+    def collection(self, collection_id: str) -> "CollectionReference":
+        return CollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def get(self, field_paths: Optional[List[str]] = None, **kwargs) -> DocumentSnapshot:
+        self._client._record("get", docs=1)
+        data, update_time = self._client._read_with_time(self.path)
+        if data is not None:
+            data = _project(data, field_paths)
+        return DocumentSnapshot(self, data, update_time)
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> datetime:
+        self._client._record("set")
+        return self._client._apply([("set", self, document_data, merge)])
+
+    def create(self, document_data: Dict[str, Any]) -> datetime:
+        self._client._record("create")
+        return self._client._apply([("create", self, document_data, False)])
+
+    def update(self, field_updates: Dict[str, Any], option: Optional[LastUpdateOption] = None, **kwargs) -> datetime:
+        self._client._record("update")
+        preconditions = {self.path: option.last_update_time} if option is not None else None
+        return self._client._apply([("update", self, field_updates, False)], preconditions)
+
+    def delete(self, **kwargs) -> datetime:
+        self._client._record("delete")
+        return self._client._apply([("delete", self, None, False)])
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, DocumentReference) and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+
+class Query:
+    """Filtered, ordered and limited view over a collection."""
+
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+
+    def __init__(
+        self,
+        client: "InMemoryFirestore",
+        path: str,
+        filters: Tuple = (),
+        orders: Tuple = (),
+        limit_count: Optional[int] = None,
+        offset_count: int = 0,
+        projection: Optional[List[str]] = None
+    ):
+        self._client = client
+        self._path = path
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit_count
+        self._offset = offset_count
+        self._projection = projection
+
+    def _copy(self, **changes) -> "Query":
+        params = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "limit_count": self._limit,
+            "offset_count": self._offset,
+            "projection": self._projection,
+        }
+        params.update(changes)
+        return Query(self._client, self._path, **params)
+
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None,
+              value: Any = None, *, filter: Any = None) -> "Query":
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "Query":
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit_count=count)
+
+    def offset(self, num_to_skip: int) -> "Query":
+        return self._copy(offset_count=num_to_skip)
+
+    def select(self, field_paths: List[str]) -> "Query":
+        return self._copy(projection=list(field_paths))
+
+    def _run(self) -> List[DocumentSnapshot]:
+        docs = self._client._list(self._path)
+        for field_path, op, expected in self._filters:
+            parts = _split_field_path(field_path)
+            docs = [(ref, data) for ref, data in docs if _compare(_get_path(data, parts), op, expected)]
+        for field_path, direction in reversed(self._orders):
+            parts = _split_field_path(field_path)
+            docs = [(ref, data) for ref, data in docs if _get_path(data, parts) is not _MISSING]
+            docs.sort(key=lambda entry: _get_path(entry[1], parts), reverse=direction == self.DESCENDING)
+        docs = docs[self._offset:]
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        self._client._record("query", docs=len(docs))
+        return [DocumentSnapshot(ref, _project(data, self._projection)) for ref, data in docs]
+
+    def stream(self, **kwargs) -> Iterator[DocumentSnapshot]:
+        return iter(self._run())
+
+    def get(self, **kwargs) -> List[DocumentSnapshot]:
+        return self._run()
+
+
+class CollectionReference(Query):
+    """Reference to a collection path."""
+
+    def __init__(self, client: "InMemoryFirestore", path: str):
+        super().__init__(client, path)
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, document_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(self._client, f"{self._path}/{document_id or _random_id()}")
+
+    def add(self, document_data: Dict[str, Any], document_id: Optional[str] = None) -> Tuple[datetime, DocumentReference]:
+        doc_ref = self.document(document_id)
+        self._client._record("add")
+        update_time = self._client._apply([("create", doc_ref, document_data, False)])
+        return update_time, doc_ref
+
+    def list_documents(self, **kwargs) -> List[DocumentReference]:
+        return [ref for ref, _ in self._client._list(self._path)]
+
+    def on_snapshot(self, callback: Callable) -> _Watch:
+        return self._client._add_watch(self._path, callback)
+
+
+class WriteBatch:
+    """Group of writes applied atomically on commit."""
+
+    def __init__(self, client: "InMemoryFirestore"):
+        self._client = client
+        self._writes: List[Tuple] = []
+        self._preconditions: Dict[str, datetime] = {}
+
+    def set(self, reference: DocumentReference, document_data: Dict[str, Any], merge: bool = False) -> None:
+        self._writes.append(("set", reference, document_data, merge))
+
+    def create(self, reference: DocumentReference, document_data: Dict[str, Any]) -> None:
+        self._writes.append(("create", reference, document_data, False))
+
+    def update(self, reference: DocumentReference, field_updates: Dict[str, Any],
+               option: Optional[LastUpdateOption] = None, **kwargs) -> None:
+        self._writes.append(("update", reference, field_updates, False))
+        if option is not None:
+            self._preconditions[reference.path] = option.last_update_time
+
+    def delete(self, reference: DocumentReference, **kwargs) -> None:
+        self._writes.append(("delete", reference, None, False))
+
+    def commit(self, **kwargs) -> List[datetime]:
+        self._client._record("commit", writes=len(self._writes))
+        update_time = self._client._apply(self._writes, self._preconditions)
+        writes, self._writes, self._preconditions = len(self._writes), [], {}
+        return [update_time] * writes
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+
+class InMemoryFirestore:
+    """Dictionary-backed stand-in for ``google.cloud.firestore.Client``.
+
+    Args:
+        latency: Seconds to sleep per operation, keyed by operation name
+            (``get``, ``set``, ``query``, ``commit``...) with ``default`` as fallback
+    """
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None):
+        self.latency = dict(latency or {})
+        self._collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._update_times: Dict[str, datetime] = {}
+        self._last_update_time = datetime.min.replace(tzinfo=timezone.utc)
+        self._watches: List[_Watch] = []
+        self._lock = threading.RLock()
+        self._stats: Counter = Counter()
+
+    # Client API
+
+    def collection(self, collection_path: str) -> CollectionReference:
+        return CollectionReference(self, collection_path)
+
+    def document(self, document_path: str) -> DocumentReference:
+        return DocumentReference(self, document_path)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    @staticmethod
+    def write_option(last_update_time: datetime, **kwargs) -> LastUpdateOption:
+        return LastUpdateOption(last_update_time)
+
+    def get_all(self, references: List[DocumentReference],
+                field_paths: Optional[List[str]] = None, **kwargs) -> Iterator[DocumentSnapshot]:
+        references = list(references)
+        self._record("get_all", docs=len(references))
+        snapshots = []
+        for reference in references:
+            data, update_time = self._read_with_time(reference.path)
+            snapshots.append(DocumentSnapshot(reference, _project(data, field_paths) if data is not None else None, update_time))
+        return iter(snapshots)
+
+    def collections(self) -> List[CollectionReference]:
+        with self._lock:
+            paths = [path for path in self._collections if "/" not in path]
+        return [CollectionReference(self, path) for path in paths]
+
+    # Accounting
+
+    def stats(self) -> Dict[str, int]:
+        """Get operation counters (operations, documents read, writes)."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """Reset all operation counters."""
+        with self._lock:
+            self._stats.clear()
+
+    def reset(self) -> None:
+        """Drop all stored documents, listeners and counters."""
+        with self._lock:
+            self._collections.clear()
+            self._update_times.clear()
+            self._watches.clear()
+            self._stats.clear()
+
+    def _record(self, op: str, docs: int = 0, writes: int = 0) -> None:
+        with self._lock:
+            self._stats[op] += 1
+            self._stats["documents_read"] += docs
+            if op in ("set", "create", "update", "delete", "add"):
+                writes = 1
+            self._stats["documents_written"] += writes
+        delay = self.latency.get(op, self.latency.get("default", 0))
+        if delay:
+            time.sleep(delay)
+
+    # Storage
+
+    @staticmethod
+    def _split_document_path(path: str) -> Tuple[str, str]:
+        collection_path, _, document_id = path.rpartition("/")
+        return collection_path, document_id
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        collection_path, document_id = self._split_document_path(path)
+        with self._lock:
+            data = self._collections.get(collection_path, {}).get(document_id)
+            return copy.deepcopy(data) if data is not None else None
+
+    def _read_with_time(self, path: str) -> Tuple[Optional[Dict[str, Any]], Optional[datetime]]:
+        with self._lock:
+            return self._read(path), self._update_times.get(path)
+
+    def _list(self, collection_path: str) -> List[Tuple[DocumentReference, Dict[str, Any]]]:
+        with self._lock:
+            documents = list(self._collections.get(collection_path, {}).items())
+            return [
+                (DocumentReference(self, f"{collection_path}/{document_id}"), copy.deepcopy(data))
+                for document_id, data in documents
+            ]
+
+    def _apply(self, writes: List[Tuple], preconditions: Optional[Dict[str, datetime]] = None) -> datetime:
+        """Apply writes atomically, then notify snapshot listeners.
+
+        Args:
+            writes: ``(op, reference, data, merge)`` tuples
+            preconditions: Update time each document must still have, by path
+        """
+        changes = []
+        with self._lock:
+            # Validate preconditions before touching anything
+            for op, reference, _, _ in writes:
+                exists = self._read(reference.path) is not None
+                if op == "create" and exists:
+                    raise AlreadyExists(f"Document already exists: {reference.path}")
+                if op == "update" and not exists:
+                    raise NotFound(f"No document to update: {reference.path}")
+            for path, last_update_time in (preconditions or {}).items():
+                if self._update_times.get(path) != last_update_time:
+                    raise FailedPrecondition(f"Document changed since it was read: {path}")
+
+            # Every write gets a distinct, increasing update time
+            update_time = max(datetime.now(timezone.utc), self._last_update_time + timedelta(microseconds=1))
+            self._last_update_time = update_time
+
+            for op, reference, data, merge in writes:
+                collection_path, document_id = self._split_document_path(reference.path)
+                documents = self._collections.setdefault(collection_path, {})
+                existed = document_id in documents
+
+                if op == "delete":
+                    self._update_times.pop(reference.path, None)
+                    if documents.pop(document_id, None) is not None:
+                        changes.append((collection_path, "REMOVED", reference, None))
+                    continue
+
+                if op in ("set", "create") and not merge:
+                    current: Dict[str, Any] = {}
+                    for key, value in data.items():
+                        _set_path(current, [key], value)
+                elif op == "set":
+                    current = documents.get(document_id, {})
+                    _merge(current, data)
+                else:
+                    current = documents[document_id]
+                    for field_path, value in data.items():
+                        _set_path(current, _split_field_path(field_path), value)
+
+                documents[document_id] = current
+                self._update_times[reference.path] = update_time
+                changes.append((collection_path, "MODIFIED" if existed else "ADDED", reference, copy.deepcopy(current)))
+
+            watches = list(self._watches)
+
+        for collection_path, change_type, reference, data in changes:
+            for watch in watches:
+                if watch.is_active and watch.collection_path == collection_path:
+                    snapshot = DocumentSnapshot(reference, data)
+                    watch.callback([snapshot], [_DocumentChange(change_type, snapshot)], datetime.now(timezone.utc))
+        return update_time
+
+    # Listeners
+
+    def _add_watch(self, collection_path: str, callback: Callable) -> _Watch:
+        watch = _Watch(self, collection_path, callback)
+        self._record("listen")
+        with self._lock:
+            self._watches.append(watch)
+            documents = self._list(collection_path)
+        snapshots = [DocumentSnapshot(ref, data) for ref, data in documents]
+        callback(snapshots, [_DocumentChange("ADDED", snapshot) for snapshot in snapshots], datetime.now(timezone.utc))
+        return watch
+
+    def _remove_watch(self, watch: _Watch) -> None:
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
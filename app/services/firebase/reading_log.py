@@ -1,7 +1,17 @@
+import logging
+
+from firebase_admin import firestore
+
 from .client import db
+from .activity_rollups import get_activity_rollups
+from .events import EVENTS_COLLECTION, event_doc_id, record_event
 from datetime import datetime, date,timedelta
 from typing import List, Dict, Any, Optional
 
+logger = logging.getLogger(__name__)
+
+READING_INDEX_COLLECTION = "user_reading_index"
+
 def log_topic_read(user_id: str, topic: str, subtopic: Optional[str] = None, category: Optional[str] = None) -> None:
     """Log when a user reads a topic.
     
@@ -11,33 +21,22 @@ def log_topic_read(user_id: str, topic: str, subtopic: Optional[str] = None, cat
         subtopic: Optional subtopic name
         category: Optional financial category
     """
-    
-    # Create reading log entry
-    log_entry = {
-        "user_id": user_id,
-        "topic": topic,
-        "timestamp": datetime.now(),
-        "date": datetime.now().date().isoformat()
-    }
-    
+    fields = {"topic": topic}
     if subtopic:
-        log_entry["subtopic"] = subtopic
-        
+        fields["subtopic"] = subtopic
     if category:
-        log_entry["category"] = category
+        fields["category"] = category
     
-    # Add to reading log collection
-    db.collection("reading_logs").add(log_entry)
-    
-    # Update user's daily streak
-    update_user_streak(user_id)
+    # Append the event; the streak is updated by the event consumer
+    record_event(user_id, "topic_read", **fields)
 
-def update_user_streak(user_id: str, is_article_view: bool = False) -> None:
+def update_user_streak(user_id: str, is_article_view: bool = False, batch: Any = None) -> None:
     """Update user's daily learning streak.
     
     Args:
         user_id: User identifier
         is_article_view: Whether this update is from an article view
+        batch: Optional write batch to add the update to instead of writing directly
     """
     today = datetime.now().date()
     yesterday = today - timedelta(days=1)
@@ -51,7 +50,6 @@ def update_user_streak(user_id: str, is_article_view: bool = False) -> None:
         last_active = datetime.fromisoformat(streak_data.get("last_active")).date()
         current_streak = streak_data.get("current_streak", 0)
         longest_streak = streak_data.get("longest_streak", 0)
-        total_articles = streak_data.get("total_articles", 0)
         
         # Check if streak should continue or reset
         if last_active == today:
@@ -66,25 +64,24 @@ def update_user_streak(user_id: str, is_article_view: bool = False) -> None:
         
         # Update longest streak if needed
         longest_streak = max(longest_streak, current_streak)
-        
-        # Increment total articles if this is an article view
-        if is_article_view:
-            total_articles += 1
     else:
         # First time user activity
         current_streak = 1
         longest_streak = 1
-        total_articles = 1 if is_article_view else 0
     
-    # Update streak data
-    streak_ref.set({
+    # Update streak data, incrementing total articles if this is an article view
+    streak_data = {
         "user_id": user_id,
         "current_streak": current_streak,
         "longest_streak": longest_streak,
-        "total_articles": total_articles,
+        "total_articles": firestore.Increment(1 if is_article_view else 0),
         "last_active": today.isoformat(),
         "updated_at": datetime.now()
-    }, merge=True)
+    }
+    if batch is not None:
+        batch.set(streak_ref, streak_data, merge=True)
+    else:
+        streak_ref.set(streak_data, merge=True)
 
 def get_daily_reading_stats(user_id: str, start_date: date, end_date: date) -> Dict[str, Dict[str, Any]]:
     """Get daily statistics for user's reading activity.
@@ -97,11 +94,8 @@ def get_daily_reading_stats(user_id: str, start_date: date, end_date: date) -> D
     Returns:
         Dictionary with daily statistics
     """
-    # Get reading history
-    read_history = get_user_read_history(user_id, start_date, end_date)
-    
-    # Get tooltip history
-    tooltip_history = get_user_tooltip_history(user_id, start_date, end_date)
+    # Daily counters from the activity rollups
+    rollups = get_activity_rollups(user_id, start_date, end_date)
     
     # Initialize result dictionary
     result = {}
@@ -110,31 +104,14 @@ def get_daily_reading_stats(user_id: str, start_date: date, end_date: date) -> D
     current_date = start_date
     while current_date <= end_date:
         date_str = current_date.isoformat()
+        day = rollups.get(date_str, {})
         result[date_str] = {
-            "articles": 0,
-            "tooltips": 0,
-            "categories": {}
+            "articles": day.get("articles", 0),
+            "tooltips": day.get("tooltips", 0),
+            "categories": dict(day.get("categories", {}))
         }
         current_date += timedelta(days=1)
     
-    # Count articles by date
-    for article in read_history:
-        article_date = article.get("date")
-        if article_date in result:
-            result[article_date]["articles"] += 1
-            
-            # Count by category
-            category = article.get("category", "uncategorized")
-            if category not in result[article_date]["categories"]:
-                result[article_date]["categories"][category] = 0
-            result[article_date]["categories"][category] += 1
-    
-    # Count tooltips by date
-    for tooltip in tooltip_history:
-        tooltip_date = tooltip.get("date")
-        if tooltip_date in result:
-            result[tooltip_date]["tooltips"] += 1
-    
     return result
 
 def get_user_streak_data(user_id: str) -> Dict[str, Any]:
@@ -169,10 +146,15 @@ def get_user_topic_history(user_id):
         user_id: User identifier
         
     Returns:
-        List of topics the user has viewed
+        List of topics the user has viewed, most recent first
     """
-    doc = db.collection("topic_reading_log").document(user_id).get()
-    return doc.to_dict().get("viewed_topics", []) if doc.exists else []
+    return reading_index_history(get_reading_index(user_id))
+
+def reading_index_history(topics: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn reading index entries into a topic history list, most recent first."""
+    history = [{**entry, "viewed_at": entry.get("timestamp")} for entry in topics.values()]
+    history.sort(key=lambda entry: entry["timestamp"], reverse=True)
+    return history
 
 def log_user_activity(
     user_id: str,
@@ -186,39 +168,162 @@ def log_user_activity(
 ) -> None:
     """Log user activity in a unified collection."""
     
-    # Create common activity entry fields
-    activity = {
-        "user_id": user_id,
-        "activity_type": activity_type,
-        "timestamp": datetime.now(),
-        "date": datetime.now().date().isoformat()
-    }
-    
     # Add specific fields based on activity type
+    fields = {}
     if activity_type == "topic_view":
-        activity.update({
+        fields = {
             "topic_id": topic_id,
             "topic_title": topic_title,  # Store title, not just ID
             "category": category,
             "expertise_level": expertise_level
-        })
+        }
     elif activity_type == "tooltip_view":
-        activity.update({
+        fields = {
             "topic_id": topic_id,  # Associate tooltip with its topic
             "topic_title": topic_title,
             "word": word,
             "tooltip": tooltip
-        })
+        }
     
-    # Add to unified activity collection
-    db.collection("user_learning_activity").add(activity)
+    # Append the event; rollup, streak and timestamps are updated by the event consumer
+    record_event(user_id, activity_type, **fields)
+
+
+def reading_index_ref(user_id: str):
+    """Get the reference of a user's reading index document."""
+    return db.collection(READING_INDEX_COLLECTION).document(user_id)
+
+
+def update_reading_index(
+    user_id: str,
+    topic_id: str,
+    category: Optional[str],
+    topic_title: Optional[str],
+    expertise_level: Optional[str],
+    viewed_at: datetime,
+    batch: Any = None
+) -> None:
+    """Record the latest view of a topic in the user's reading index.
+    
+    The index document ``user_reading_index/{user_id}`` maps each viewed
+    topic_id to its last view, so viewed flags and reading history need one
+    document read instead of a scan of the activity events.
     
-    # Update user's streak
-    update_user_streak(user_id)
+    Args:
+        user_id: User identifier
+        topic_id: Viewed topic
+        category: Category of the topic
+        topic_title: Title of the topic
+        expertise_level: Expertise level of the topic
+        viewed_at: Time of the view
+        batch: Optional write batch to add the update to instead of writing directly
+    """
+    data = {
+        "user_id": user_id,
+        "topics": {
+            topic_id: {
+                "topic_id": topic_id,
+                "topic_title": topic_title,
+                "category": category,
+                "expertise_level": expertise_level,
+                "timestamp": viewed_at,
+                "date": viewed_at.date().isoformat()
+            }
+        }
+    }
+    ref = reading_index_ref(user_id)
+    if batch is not None:
+        batch.set(ref, data, merge=True)
+    else:
+        ref.set(data, merge=True)
+
+
+def _backfill_reading_index(user_id: str, indexed: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Build a user's reading index from their topic_view events.
+    
+    Args:
+        user_id: User identifier
+        indexed: Entries already in the index, kept when newer than the events
+        
+    Returns:
+        Index entries keyed by topic_id
+    """
+    topics = {}
+    events = db.collection(EVENTS_COLLECTION) \
+        .where("user_id", "==", user_id) \
+        .where("activity_type", "==", "topic_view") \
+        .stream()
+    
+    for doc in events:
+        event = doc.to_dict()
+        topic_id = event.get("topic_id")
+        if not topic_id or not event.get("timestamp"):
+            continue
+        if topic_id not in topics or event["timestamp"] > topics[topic_id]["timestamp"]:
+            topics[topic_id] = {
+                "topic_id": topic_id,
+                "topic_title": event.get("topic_title"),
+                "category": event.get("category"),
+                "expertise_level": event.get("expertise_level"),
+                "timestamp": event["timestamp"],
+                "date": event.get("date")
+            }
+    
+    # Views indexed while the scan ran are at least as recent
+    for topic_id, entry in indexed.items():
+        if topic_id not in topics or entry.get("timestamp") and entry["timestamp"] >= topics[topic_id]["timestamp"]:
+            topics[topic_id] = entry
+    
+    reading_index_ref(user_id).set({
+        "user_id": user_id,
+        "topics": topics,
+        "backfilled": True
+    }, merge=True)
+    logger.info(f"Backfilled reading index for user {user_id} with {len(topics)} topics")
+    return topics
+
+
+def get_reading_index(user_id: str) -> Dict[str, Dict[str, Any]]:
+    """Get the last view of every topic a user has read.
+    
+    Users whose index predates this document are backfilled from their
+    activity events on first read.
+    
+    Args:
+        user_id: User identifier
+        
+    Returns:
+        Index entries (topic_id, topic_title, category, expertise_level,
+        timestamp, date) keyed by topic_id
+    """
+    doc = reading_index_ref(user_id).get()
+    return reading_index_topics(user_id, doc.to_dict() if doc.exists else None)
+
+
+def reading_index_topics(user_id: str, data: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Get the entries of reading index document data, backfilling it if needed.
+    
+    Args:
+        user_id: User identifier
+        data: Reading index document data, or None if it does not exist
+        
+    Returns:
+        Index entries keyed by topic_id
+    """
+    data = data or {}
+    topics = data.get("topics") or {}
+    
+    if not data.get("backfilled"):
+        topics = _backfill_reading_index(user_id, topics)
+    return topics
 
 
 def track_viewed_topic(user_id: str, category: str, topic_id: str, topic_title: str = None, expertise_level: str = None) -> None:
-    """Track that a user viewed a specific topic, avoiding duplicate entries within 24 hours."""
+    """Track that a user viewed a specific topic, recording at most one view per topic per day.
+    
+    The view is stored under ``{user_id}_{topic_id}_{date}``, so detecting a
+    repeat view needs no query and retried requests are idempotent.
+    """
     # Get title if not provided
     if topic_title is None:
         from app.services.firebase.cache import find_topic_by_id
@@ -226,52 +331,18 @@ def track_viewed_topic(user_id: str, category: str, topic_id: str, topic_title:
         if topic_details:
             topic_title = topic_details.get("title", "Unknown Topic")
     
-    # Check if this topic was viewed in the last 24 hours
-    now = datetime.now()
-    yesterday = now - timedelta(hours=24)
-    yesterday_str = yesterday.isoformat()
-    
-    # Query for recent views of this topic by this user
-    recent_views = db.collection("user_learning_activity") \
-        .where("user_id", "==", user_id) \
-        .where("topic_id", "==", topic_id) \
-        .where("activity_type", "==", "topic_view") \
-        .where("timestamp", ">=", yesterday_str) \
-        .limit(1) \
-        .stream()
-    
-    # Convert to list to check if any results exist
-    recent_views_list = list(recent_views)
-    
-    is_new_view = False
-    
-    if not recent_views_list:
-        # No recent views found, log a new one
-        is_new_view = True
-        log_user_activity(
-            user_id=user_id,
-            activity_type="topic_view",
-            topic_id=topic_id,
-            topic_title=topic_title,
-            category=category,
-            expertise_level=expertise_level
-        )
-    else:
-        # Already viewed recently, just update the timestamp
-        # Get the document reference
-        doc_ref = recent_views_list[0].reference
-        # Update only the timestamp
-        doc_ref.update({
-            "timestamp": now,
-            "date": now.date().isoformat()
-        })
-    
-    # Only update streak for new views or first view of the day
-    if is_new_view or recent_views_list[0].to_dict().get("date") != now.date().isoformat():
-        # Pass True to indicate this is an article view
-        update_user_streak(user_id, is_article_view=True)
-    from app.services.firebase.cache import update_user_activity_timestamp
-    update_user_activity_timestamp(user_id, "article_read")
+    # Only the first view of the day is a new event; the consumer counts it in
+    # the rollup and streak and refreshes the reading index on every view
+    today = date.today().isoformat()
+    record_event(
+        user_id,
+        "topic_view",
+        event_id=event_doc_id(user_id, topic_id, today),
+        topic_id=topic_id,
+        topic_title=topic_title,
+        category=category,
+        expertise_level=expertise_level
+    )
 
 def log_tooltip_viewed(user_id: str, word: str, tooltip: str, from_topic: str = None, topic_id: str = None) -> None:
     """Log when a user views a tooltip."""
@@ -314,25 +385,22 @@ def get_user_activity_history(
     return history
 
 def get_user_read_history(user_id: str, start_date: date, end_date: date) -> List[Dict[str, Any]]:
-    """Get user's topic reading history."""
-    raw_history = get_user_activity_history(user_id, start_date, end_date, "topic_view")
-    
-    # Deduplicate entries by topic_id (keeping only the most recent view)
-    deduplicated = {}
-    for entry in raw_history:
-        topic_id = entry.get("topic_id")
-        if topic_id:
-            # If this topic isn't in our results yet or has a more recent timestamp, keep it
-            if topic_id not in deduplicated or entry.get("timestamp", "") > deduplicated[topic_id].get("timestamp", ""):
-                deduplicated[topic_id] = entry
-    
-    # Convert back to list, sorted by most recent first
-    result = list(deduplicated.values())
-    result.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    
-    for entry in result:
-        if "user_id" in entry:
-            del entry["user_id"]
+    """Get user's topic reading history.
+    
+    Reads the user's reading index, so each topic appears once with its most
+    recent view, and keeps the topics last viewed within the date range.
+    """
+    start_str = start_date.isoformat()
+    end_str = end_date.isoformat()
+    
+    result = [
+        {"activity_type": "topic_view", **entry}
+        for entry in get_reading_index(user_id).values()
+        if start_str <= (entry.get("date") or "") <= end_str
+    ]
+    
+    # Most recent first
+    result.sort(key=lambda x: x["timestamp"], reverse=True)
     return result
 
 def get_user_tooltip_history(user_id: str, start_date: date, end_date: date) -> List[Dict[str, Any]]:
@@ -0,0 +1,123 @@
+"""In-process mirror of the topic_cache collection.
+
+A Firestore snapshot listener keeps every ``topic_cache`` document in memory, so
+topic and timestamp lookups on the request path need no Firestore reads. Each
+instance runs its own listener, which keeps instances coherent without polling.
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from .client import db
+
+logger = logging.getLogger(__name__)
+
+# Set TOPIC_CACHE_LISTENER=0 to disable the listener and read Firestore directly
+TOPIC_CACHE_LISTENER_ENABLED = os.environ.get("TOPIC_CACHE_LISTENER", "1") != "0"
+
+_mirror: Dict[str, Dict[str, Any]] = {}
+_mirror_lock = threading.Lock()
+_mirror_ready = threading.Event()
+_watch = None
+
+
+def _on_topic_cache_snapshot(col_snapshot, changes, read_time) -> None:
+    """Apply document changes from the snapshot listener to the mirror."""
+    with _mirror_lock:
+        for change in changes:
+            doc_id = change.document.id
+            if change.type.name == "REMOVED":
+                _mirror.pop(doc_id, None)
+            else:
+                _mirror[doc_id] = change.document.to_dict()
+    if not _mirror_ready.is_set():
+        logger.info(f"Topic cache mirror synced with {len(_mirror)} documents")
+        _mirror_ready.set()
+
+
+def start_topic_cache_listener() -> None:
+    """Start the snapshot listener for the topic_cache collection.
+
+    Safe to call more than once; an active listener is left untouched.
+    """
+    global _watch
+
+    if not TOPIC_CACHE_LISTENER_ENABLED:
+        return
+    if _watch is not None and _watch.is_active:
+        return
+
+    try:
+        _mirror_ready.clear()
+        _watch = db.collection("topic_cache").on_snapshot(_on_topic_cache_snapshot)
+        logger.info("Started topic cache snapshot listener")
+    except Exception as e:
+        _watch = None
+        logger.error(f"Could not start topic cache listener: {e}")
+
+
+def stop_topic_cache_listener() -> None:
+    """Stop the snapshot listener and stop serving lookups from the mirror."""
+    global _watch
+
+    _mirror_ready.clear()
+    if _watch is not None:
+        try:
+            _watch.unsubscribe()
+        except Exception as e:
+            logger.warning(f"Error stopping topic cache listener: {e}")
+        _watch = None
+
+
+def is_topic_mirror_ready() -> bool:
+    """Whether the mirror holds a complete, live copy of topic_cache.
+
+    Returns:
+        True once the first snapshot has arrived and the listener is still streaming
+    """
+    return _mirror_ready.is_set() and _watch is not None and _watch.is_active
+
+
+def _copy_topic_doc(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a mirrored document so callers can annotate topics safely."""
+    copied = dict(data)
+    if isinstance(copied.get("topics"), list):
+        copied["topics"] = [dict(topic) for topic in copied["topics"]]
+    return copied
+
+
+def get_mirrored_topic_cache(category: str, level: str) -> Optional[Dict[str, Any]]:
+    """Get a topic_cache document from the mirror.
+
+    Args:
+        category: Financial category
+        level: Expertise level
+
+    Returns:
+        Copy of the document data, or None if it does not exist
+    """
+    with _mirror_lock:
+        data = _mirror.get(f"{category}_{level}")
+    return _copy_topic_doc(data) if data is not None else None
+
+
+def get_mirrored_topic_docs() -> List[Dict[str, Any]]:
+    """Get copies of every mirrored topic_cache document."""
+    with _mirror_lock:
+        docs = list(_mirror.values())
+    return [_copy_topic_doc(data) for data in docs]
+
+
+def update_mirrored_topic_cache(category: str, level: str, data: Dict[str, Any]) -> None:
+    """Write a document through to the mirror ahead of the listener echo.
+
+    Args:
+        category: Financial category
+        level: Expertise level
+        data: Document data that was just written to Firestore
+    """
+    if not is_topic_mirror_ready():
+        return
+    with _mirror_lock:
+        _mirror[f"{category}_{level}"] = dict(data)
@@ -2,18 +2,72 @@
 
 This module provides functions to store and retrieve news items and generated articles.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+import copy
 import logging
 import json
+import threading
 import uuid
 from firebase_admin import firestore
+from app.api.responses import PrecompressedJSON
+from .cache import get_content_version, get_payload, get_stored_content_version, set_content_version, store_payload
 from .client import db
+from .events import record_event
 
 logger = logging.getLogger(__name__)
 
+# In-memory index of trending news items by their 'id' field, with the time
+# their trending news list expires. Filled from request and worker threads.
+_news_items_by_id: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+_news_index_lock = threading.Lock()
+MAX_INDEXED_NEWS_ITEMS = 1000
+
+EXPERTISE_LEVELS = ["beginner", "intermediate", "advanced"]
+
+
+def _news_doc_id(news_id: str) -> str:
+    """Convert a news item id into a valid Firestore document id."""
+    return str(news_id).replace("/", "_")
+
+
+def _index_news_items(news_items: List[Dict[str, Any]], expires_at: str) -> None:
+    """Add news items to the in-memory id index until their list expires.
+    
+    Args:
+        news_items: News items with an 'id' field
+        expires_at: ISO time the trending news list expires
+    """
+    with _news_index_lock:
+        for item in news_items:
+            if item.get("id"):
+                _news_items_by_id.pop(str(item["id"]), None)
+                _news_items_by_id[str(item["id"])] = (expires_at, copy.deepcopy(item))
+        
+        # Drop the oldest entries once the index grows past its bound
+        while len(_news_items_by_id) > MAX_INDEXED_NEWS_ITEMS:
+            del _news_items_by_id[next(iter(_news_items_by_id))]
+
+
+def _indexed_news_item(news_id: str) -> Optional[Dict[str, Any]]:
+    """Get a copy of an indexed news item, or None if it is missing or expired."""
+    with _news_index_lock:
+        entry = _news_items_by_id.get(news_id)
+        if entry is None:
+            return None
+        expires_at, item = entry
+        if expires_at < datetime.now().isoformat():
+            del _news_items_by_id[news_id]
+            return None
+        return copy.deepcopy(item)
+
+
 def store_trending_news(news_items: List[Dict[str, Any]], expertise_level: str) -> None:
-    """Store trending news items in Firebase using consistent IDs."""
+    """Store trending news items in Firebase using consistent IDs.
+    
+    Each item is also written to ``trending_news/{id}`` so it can be fetched by
+    document id, and added to the in-memory id index.
+    """
     try:
         # Generate a consistent document ID for this expertise level
         doc_id = f"trending_news_{expertise_level}"
@@ -21,15 +75,28 @@ def store_trending_news(news_items: List[Dict[str, Any]], expertise_level: str)
         
         # Prepare the data
         now = datetime.now()
+        expires_at = (now + timedelta(days=1)).isoformat()
         data = {
             "expertise_level": expertise_level,
             "news_items": news_items,
             "stored_at": now.isoformat(),
-            "expires_at": (now + timedelta(days=1)).isoformat()
+            "expires_at": expires_at
         }
         
-        # Store in Firebase (overwrites existing document)
-        doc_ref.set(data)
+        # Write the level document and the per-item documents together
+        batch = db.batch()
+        batch.set(doc_ref, data)
+        for item in news_items:
+            if item.get("id"):
+                batch.set(db.collection("trending_news").document(_news_doc_id(item["id"])), {
+                    **item,
+                    "expertise_level": expertise_level,
+                    "expires_at": expires_at
+                })
+        batch.commit()
+        
+        _index_news_items(news_items, expires_at)
+        set_content_version(f"trending_news:{expertise_level}", data["stored_at"], now + timedelta(days=1))
         
         logger.info(f"Stored trending news for {expertise_level} level")
     except Exception as e:
@@ -61,6 +128,13 @@ def get_trending_news(expertise_level: str) -> List[Dict[str, Any]]:
         
         # Return the news items
         news_items = data.get("news_items", [])
+        _index_news_items(news_items, data.get("expires_at", now))
+        if data.get("stored_at"):
+            set_content_version(
+                f"trending_news:{expertise_level}",
+                data["stored_at"],
+                datetime.fromisoformat(data["expires_at"])
+            )
         logger.info(f"Retrieved {len(news_items)} trending news items for {expertise_level} level")
         return news_items
     except Exception as e:
@@ -68,7 +142,11 @@ def get_trending_news(expertise_level: str) -> List[Dict[str, Any]]:
         return []
 
 def get_news_item_by_id(news_id: str) -> Optional[Dict[str, Any]]:
-    """Get a specific news item by ID from Firebase.
+    """Get a specific news item by ID.
+    
+    Looks in the in-memory index first, then reads ``trending_news/{id}``
+    directly. Items stored before per-item documents existed are found by
+    loading the per-level documents into the index.
     
     Args:
         news_id: Value of the 'id' field to find
@@ -76,23 +154,44 @@ def get_news_item_by_id(news_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         News item document or None if not found
     """
+    news_id = str(news_id)
+    news_item = _indexed_news_item(news_id)
+    if news_item:
+        return news_item
+    
     try:
-        # Query for documents where the 'id' FIELD equals news_id
-        # NOT looking for a document with this ID
-        query = db.collection("trending_news").where("id", "==", news_id).limit(1)
-        docs = query.get()
-        
-        for doc in docs:
-            logger.info(f"Found news item with ID field {news_id}")
-            return doc.to_dict()
+        now = datetime.now().isoformat()
+        doc = db.collection("trending_news").document(_news_doc_id(news_id)).get()
+        if doc.exists:
+            news_item = doc.to_dict()
+            if news_item.get("expires_at", "") < now:
+                logger.info(f"News item {news_id} has expired")
+                return None
+            _index_news_items([news_item], news_item["expires_at"])
+            return news_item
+        
+        # Fall back to the per-level documents
+        level_refs = [
+            db.collection("trending_news_by_level").document(f"trending_news_{level}")
+            for level in EXPERTISE_LEVELS
+        ]
+        for level_doc in db.get_all(level_refs):
+            level_data = level_doc.to_dict() if level_doc.exists else None
+            if level_data and level_data.get("expires_at", "") >= now:
+                _index_news_items(level_data.get("news_items", []), level_data["expires_at"])
+        
+        news_item = _indexed_news_item(news_id)
+        if news_item:
+            return news_item
             
         # If not found, log detailed info
         logger.warning(f"News item with ID field {news_id} not found in Firebase")
         
         # Diagnostic: Show what IDs actually exist
-        all_docs = db.collection("trending_news").limit(5).get()
-        found_ids = [d.to_dict().get('id') for d in all_docs if 'id' in d.to_dict()]
-        logger.debug(f"Sample of available ID fields in trending_news: {found_ids}")
+        if logger.isEnabledFor(logging.DEBUG):
+            all_docs = db.collection("trending_news").limit(5).get()
+            found_ids = [d.to_dict().get('id') for d in all_docs if 'id' in d.to_dict()]
+            logger.debug(f"Sample of available ID fields in trending_news: {found_ids}")
         
         return None
     except Exception as e:
@@ -127,6 +226,9 @@ def store_news_article(
             "generated_at": now.isoformat(),
             "expires_at": (now + timedelta(days=3)).isoformat()
         })
+        version_key = f"news_article:{news_id}:{expertise_level}"
+        set_content_version(version_key, now.isoformat(), now + timedelta(days=3))
+        store_payload(version_key, now.isoformat(), article)
         
         logger.info(f"Stored article for news ID {news_id} at {expertise_level} level")
     except Exception as e:
@@ -158,12 +260,73 @@ def get_news_article(news_id: str, expertise_level: str) -> Optional[Dict[str, A
         if expires_at and expires_at < datetime.now().isoformat():
             logger.debug(f"Cached article for news ID {news_id} is expired")
             return None
-            
+        
+        if data.get("generated_at"):
+            set_content_version(
+                f"news_article:{news_id}:{expertise_level}",
+                data["generated_at"],
+                datetime.fromisoformat(expires_at) if expires_at else None
+            )
         return data.get("article")
     except Exception as e:
         logger.error(f"Error retrieving news article for {news_id}: {e}")
         return None
 
+def get_trending_news_version(expertise_level: str) -> Optional[str]:
+    """Get the current version of the trending news of an expertise level.
+    
+    Args:
+        expertise_level: Expertise level
+        
+    Returns:
+        The version, or None if no unexpired trending news is stored
+    """
+    return get_stored_content_version(
+        f"trending_news:{expertise_level}",
+        db.collection("trending_news_by_level").document(f"trending_news_{expertise_level}"),
+        "stored_at"
+    )
+
+def get_news_article_version(news_id: str, expertise_level: str) -> Optional[str]:
+    """Get the current version of a generated news article.
+    
+    Args:
+        news_id: ID of the news item
+        expertise_level: User's expertise level
+        
+    Returns:
+        The version, or None if not found or expired
+    """
+    return get_stored_content_version(
+        f"news_article:{news_id}:{expertise_level}",
+        db.collection("news_articles").document(f"{news_id}_{expertise_level}"),
+        "generated_at"
+    )
+
+def get_news_article_payload(news_id: str, expertise_level: str) -> Optional[PrecompressedJSON]:
+    """Get a generated news article as a serialized, pre-compressed payload.
+    
+    Args:
+        news_id: ID of the news item
+        expertise_level: User's expertise level
+        
+    Returns:
+        The article payload, or None if not found or expired
+    """
+    version_key = f"news_article:{news_id}:{expertise_level}"
+    version = get_news_article_version(news_id, expertise_level)
+    if not version:
+        return None
+    payload = get_payload(version_key, version)
+    if payload is not None:
+        return payload
+    
+    article = get_news_article(news_id, expertise_level)
+    version = get_content_version(version_key)
+    if article is None or not version:
+        return None
+    return store_payload(version_key, version, article)
+
 def track_article_view(user_id: str, news_id: str) -> None:
     """Track that a user viewed a specific news article.
     
@@ -172,51 +335,26 @@ def track_article_view(user_id: str, news_id: str) -> None:
         news_id: ID of the news item
     """
     try:
-        # Get current timestamp
-        now = datetime.now()
-        
-        # Create activity entry
-        activity = {
-            "user_id": user_id,
-            "news_id": news_id,
-            "viewed_at": now.isoformat(),
-            "date": now.date().isoformat(),
-            "activity_type": "news_view"
-        }
-        
-        # Add to user activity collection
-        db.collection("user_learning_activity").add(activity)
-
-        from app.services.firebase.reading_log import update_user_streak
-        update_user_streak(user_id, is_article_view=True)
-        
-        # Get the news item details for additional tracking
+        # Record the news topics on the view event itself rather than as
+        # separate reads of each topic
         news_item = get_news_item_by_id(news_id)
-        if news_item and news_item.get("topics"):
-            # Track each topic in the news as read
-            from app.services.firebase.reading_log import log_topic_read
-            for topic in news_item.get("topics", []):
-                log_topic_read(user_id, topic)
+        topics = news_item.get("topics", []) if news_item else []
+        record_event(user_id, "news_view", news_id=news_id, topics=topics)
     except Exception as e:
         logger.error(f"Error tracking article view: {e}")
 
 
 def cleanup_old_trending_news(expertise_level: str) -> None:
-    """Remove old news items for a given expertise level before adding new ones."""
+    """Remove expired news items before adding new ones for an expertise level.
+    
+    Per-item ``trending_news/{id}`` documents are shared by every level that
+    lists the item, so only expired ones are deleted, whichever level last
+    stored them. The level's own list is replaced by ``store_trending_news``.
+    """
+    from .ttl_sweeper import sweep_collection
+    
     try:
-        # Find all documents for this expertise level
-        docs = (db.collection("trending_news")
-                .where("expertise_level", "==", expertise_level)
-                .limit(100)  # Safety limit
-                .get())
-        
-        # Create batch for efficient deletion
-        batch = db.batch()
-        for doc in docs:
-            batch.delete(doc.reference)
-            
-        # Execute deletion
-        batch.commit()
-        logger.info(f"Cleaned up old news items for {expertise_level} level")
+        deleted = sweep_collection("trending_news", "expires_at", datetime.now().isoformat())
+        logger.info(f"Cleaned up {deleted} expired news items before storing {expertise_level} level")
     except Exception as e:
-        logger.error(f"Error cleaning up old news: {e}")
\ No newline at end of file
+        logger.error(f"Error cleaning up old news: {e}")
@@ -0,0 +1,130 @@
+"""Background garbage collector for Firestore cache collections.
+
+Cache documents carry an expiry (or creation) timestamp but are only ever
+overwritten, never removed. This module periodically deletes expired documents
+in paged, batched deletes and keeps a report of what was reclaimed.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.services.workers import FIRESTORE_POOL, run_in_pool
+from .client import db
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps; set TTL_SWEEP_INTERVAL_SECONDS=0 to disable the sweeper
+TTL_SWEEP_INTERVAL_SECONDS = int(os.environ.get("TTL_SWEEP_INTERVAL_SECONDS", 3600))
+TTL_SWEEP_PAGE_SIZE = 200
+TTL_SWEEP_MAX_PAGES = 50  # Per collection and sweep, to bound the work of one run
+
+# Expiry field of each cache collection. "iso" fields hold an ISO timestamp,
+# "epoch" fields hold Unix seconds. max_age is used for collections that only
+# record their creation time.
+CACHE_COLLECTIONS = [
+    {"collection": "article_cache", "field": "cached_at", "format": "iso", "max_age": timedelta(days=7)},
+    {"collection": "research_cache", "field": "expires_at", "format": "iso"},
+    {"collection": "user_summary_cache", "field": "expires_at", "format": "iso"},
+    {"collection": "news_articles", "field": "expires_at", "format": "iso"},
+    {"collection": "trending_news_by_level", "field": "expires_at", "format": "iso"},
+    {"collection": "trending_news", "field": "expires_at", "format": "iso"},
+    {"collection": "asset_comparison_cache", "field": "expiry_time", "format": "epoch"},
+]
+
+_last_report: Optional[Dict[str, Any]] = None
+
+
+def _expiry_cutoff(config: Dict[str, Any], now: datetime) -> Any:
+    """Get the value below which a document in the collection is expired."""
+    cutoff = now - config.get("max_age", timedelta(0))
+    if config["format"] == "epoch":
+        return cutoff.timestamp()
+    return cutoff.isoformat()
+
+
+def sweep_collection(collection: str, field: str, cutoff: Any) -> int:
+    """Delete documents whose expiry field is below the cutoff.
+
+    Args:
+        collection: Collection name
+        field: Expiry field to compare
+        cutoff: Documents with field values below this are deleted
+
+    Returns:
+        Number of deleted documents
+    """
+    deleted = 0
+    for _ in range(TTL_SWEEP_MAX_PAGES):
+        # Only document names are needed, so project away every field
+        docs = list(
+            db.collection(collection)
+            .where(field, "<", cutoff)
+            .select([])
+            .limit(TTL_SWEEP_PAGE_SIZE)
+            .stream()
+        )
+        if not docs:
+            break
+
+        batch = db.batch()
+        for doc in docs:
+            batch.delete(doc.reference)
+        batch.commit()
+        deleted += len(docs)
+
+        if len(docs) < TTL_SWEEP_PAGE_SIZE:
+            break
+
+    return deleted
+
+
+def sweep_expired_cache_documents() -> Dict[str, Any]:
+    """Delete expired documents from every cache collection.
+
+    Returns:
+        Report with the number of deleted documents per collection
+    """
+    global _last_report
+
+    started = time.time()
+    now = datetime.now()
+    deleted = {}
+    errors = {}
+
+    for config in CACHE_COLLECTIONS:
+        collection = config["collection"]
+        try:
+            deleted[collection] = sweep_collection(collection, config["field"], _expiry_cutoff(config, now))
+        except Exception as e:
+            logger.error(f"Error sweeping expired documents from {collection}: {e}")
+            errors[collection] = str(e)
+
+    report = {
+        "swept_at": now.isoformat(),
+        "duration_seconds": round(time.time() - started, 3),
+        "deleted": deleted,
+        "total_deleted": sum(deleted.values()),
+        "errors": errors
+    }
+    _last_report = report
+
+    logger.info(f"TTL sweep reclaimed {report['total_deleted']} expired cache documents: {deleted}")
+    return report
+
+
+def get_last_sweep_report() -> Optional[Dict[str, Any]]:
+    """Get the report of the most recent sweep, or None if none has run."""
+    return _last_report
+
+
+async def run_ttl_sweeper(interval_seconds: int = TTL_SWEEP_INTERVAL_SECONDS) -> None:
+    """Sweep expired cache documents every ``interval_seconds`` until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_pool(FIRESTORE_POOL, sweep_expired_cache_documents)
+        except Exception as e:
+            logger.error(f"TTL sweep failed: {e}")
@@ -4,82 +4,226 @@ This module provides functions to interact with user watchlists stored in Fireba
 """
 from datetime import datetime
 import logging
-from typing import Any, Dict, List, Optional
-from app.services.firebase.reading_log import get_user_topic_history
-from app.services.firebase.cache import find_topic_by_id
+from typing import Any, Dict, List, Optional, Tuple
+from app.services.firebase.cache import find_topics_by_ids
+
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud.firestore_v1.field_path import FieldPath
 
 from app.api.models import AssetType
-from .client import db
+from .client import db, get_documents
+from .events import record_event
+from .reading_log import READING_INDEX_COLLECTION, reading_index_history, reading_index_topics
 
 logger = logging.getLogger(__name__)
 
+# Fields read from the watchlist and preferences documents
+WATCHLIST_FIELDS = ['items', 'assets']
+PREFERENCE_FIELDS = ['expertise_level', 'categories']
+
+DEFAULT_PREFERENCES = {
+    'expertise_level': 'beginner',
+    'categories': ['stocks', 'investing_basics']
+}
+
+
+def _asset_type_value(asset_type: Any) -> str:
+    """Get the plain string value of an asset type."""
+    return asset_type.value if hasattr(asset_type, 'value') else str(asset_type)
+
+
+def _watchlist_key(symbol: str, asset_type: Any) -> str:
+    """Build the map key of a watchlist item, e.g. ``AAPL:stock``."""
+    return f"{symbol}:{_asset_type_value(asset_type)}"
+
+
+def _item_field_path(key: str, *fields: str) -> str:
+    """Build the quoted field path of a watchlist item (or one of its fields)."""
+    return FieldPath('items', key, *fields).to_api_repr()
+
+
+def _migrate_legacy_watchlist(
+    watchlist_ref: Any,
+    items: Dict[str, Dict[str, Any]],
+    legacy_assets: List[Dict[str, Any]]
+) -> None:
+    """Move items from the legacy ``assets`` array into the keyed ``items`` map."""
+    migrated = {}
+    for asset in legacy_assets:
+        key = _watchlist_key(asset.get('symbol'), asset.get('asset_type'))
+        if key not in items:
+            migrated[key] = {
+                **asset,
+                'asset_type': _asset_type_value(asset.get('asset_type'))
+            }
+    
+    # Write each migrated item by field path; merging an empty ``items`` map
+    # would replace the whole map
+    updates = {_item_field_path(key): item for key, item in migrated.items()}
+    updates['assets'] = firestore.DELETE_FIELD
+    
+    try:
+        watchlist_ref.update(updates)
+        items.update(migrated)
+    except Exception as e:
+        logger.warning(f"Could not migrate legacy watchlist: {e}")
+        items.update(migrated)
+
+
+def _migrate_legacy_watchlist_doc(watchlist_ref: Any) -> Dict[str, Dict[str, Any]]:
+    """Read a whole watchlist document and migrate its legacy ``assets`` array.
+    
+    Returns:
+        The watchlist items after the migration
+    """
+    watchlist_doc = watchlist_ref.get(field_paths=WATCHLIST_FIELDS)
+    watchlist_data = watchlist_doc.to_dict() if watchlist_doc.exists else {}
+    items = dict(watchlist_data.get('items') or {})
+    if watchlist_data.get('assets') is not None:
+        _migrate_legacy_watchlist(watchlist_ref, items, watchlist_data['assets'])
+    return items
+
 
 def get_user_watchlists(
     user_id: str, 
     asset_type: Optional[AssetType] = None
 ) -> List[Dict[str, Any]]:
-    """Get a user's watchlist items from Firestore."""
+    """Get a user's watchlist items from Firestore.
+    
+    Items are stored in an ``items`` map keyed by ``symbol:asset_type``. Documents
+    still using the legacy ``assets`` array are migrated on first read.
+    """
     watchlist_ref = db.collection('watchlists').document(user_id)
-    watchlist_doc = watchlist_ref.get()
+    watchlist_doc = watchlist_ref.get(field_paths=WATCHLIST_FIELDS)
     
     if not watchlist_doc.exists:
         return []
     
-    watchlist_data = watchlist_doc.to_dict()
-    assets = watchlist_data.get('assets', [])
+    return _watchlist_assets(watchlist_ref, watchlist_doc.to_dict(), asset_type)
+
+
+def _watchlist_assets(
+    watchlist_ref: Any,
+    watchlist_data: Dict[str, Any],
+    asset_type: Optional[AssetType] = None
+) -> List[Dict[str, Any]]:
+    """Turn watchlist document data into a sorted, optionally filtered item list."""
+    items = dict(watchlist_data.get('items') or {})
+    
+    legacy_assets = watchlist_data.get('assets')
+    if legacy_assets is not None:
+        _migrate_legacy_watchlist(watchlist_ref, items, legacy_assets)
+    
+    # Oldest first, matching the order of the legacy array
+    assets = sorted(items.values(), key=lambda asset: asset.get('added_on') or '')
     
     # Filter by asset type if specified
     if asset_type:
-        assets = [asset for asset in assets if asset.get('asset_type') == asset_type]
+        asset_type_value = _asset_type_value(asset_type)
+        assets = [asset for asset in assets if asset.get('asset_type') == asset_type_value]
         
     return assets
 
 
+def _watchlist_item(
+    symbol: str,
+    asset_type: AssetType,
+    notes: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the fields written for an added watchlist item."""
+    item = {
+        'symbol': symbol,
+        'asset_type': _asset_type_value(asset_type),
+        'added_on': datetime.now().isoformat()
+    }
+    
+    # Leave existing notes untouched when re-adding without notes
+    if notes is not None:
+        item['notes'] = notes
+    
+    return item
+
+
 def add_to_watchlist(
     user_id: str,
     symbol: str,
     asset_type: AssetType,
     notes: Optional[str] = None
 ) -> None:
-    """Add an asset to a user's watchlist."""
-    watchlist_ref = db.collection('watchlists').document(user_id)
+    """Add an asset to a user's watchlist.
     
-    # Get current watchlist
-    watchlist_doc = watchlist_ref.get()
+    This is a single merge write with no prior read. Adding an asset that is
+    already in the watchlist updates its notes (if given) and ``added_on``.
+    """
+    add_many_to_watchlist(user_id, [{
+        'symbol': symbol,
+        'asset_type': asset_type,
+        'notes': notes
+    }])
+
+
+def add_many_to_watchlist(
+    user_id: str,
+    assets: List[Dict[str, Any]]
+) -> None:
+    """Add several assets to a user's watchlist in one write.
     
-    if watchlist_doc.exists:
-        watchlist_data = watchlist_doc.to_dict()
-        assets = watchlist_data.get('assets', [])
-        
-        # Check if asset already exists
-        for asset in assets:
-            if asset.get('symbol') == symbol and asset.get('asset_type') == asset_type:
-                # Asset already in watchlist, update notes if provided
-                if notes is not None:
-                    asset['notes'] = notes
-                watchlist_ref.update({'assets': assets})
-                return
-        
-        # Asset not in watchlist, add it
-        assets.append({
-            'symbol': symbol,
-            'asset_type': asset_type,
-            'notes': notes,
-            'added_on': datetime.now().isoformat()
-        })
+    Args:
+        user_id: User identifier
+        assets: Dicts with ``symbol``, ``asset_type`` and optional ``notes``
+    """
+    if not assets:
+        return
+    
+    items = {
+        _watchlist_key(asset['symbol'], asset['asset_type']): _watchlist_item(
+            asset['symbol'], asset['asset_type'], asset.get('notes')
+        )
+        for asset in assets
+    }
+    
+    db.collection('watchlists').document(user_id).set({
+        'user_id': user_id,
+        'items': items
+    }, merge=True)
+
+
+def update_watchlist_notes(
+    user_id: str,
+    symbol: str,
+    asset_type: AssetType,
+    notes: Optional[str]
+) -> bool:
+    """Update the notes of a watchlist item with a field-level write.
+    
+    Args:
+        user_id: User identifier
+        symbol: Asset symbol
+        asset_type: Type of asset
+        notes: New notes, or None to clear them
         
-        watchlist_ref.update({'assets': assets})
+    Returns:
+        False if the asset is not in the watchlist
+    """
+    key = _watchlist_key(symbol, asset_type)
+    watchlist_ref = db.collection('watchlists').document(user_id)
+    
+    # An update of a missing item would create a half-formed one
+    watchlist_doc = watchlist_ref.get(field_paths=[_item_field_path(key, 'symbol'), 'assets'])
+    if not watchlist_doc.exists:
+        return False
+    watchlist_data = watchlist_doc.to_dict()
+    if watchlist_data.get('assets') is not None:
+        # Items of a legacy watchlist are only in its ``assets`` array until migrated
+        items = _migrate_legacy_watchlist_doc(watchlist_ref)
     else:
-        # Create new watchlist
-        watchlist_ref.set({
-            'user_id': user_id,
-            'assets': [{
-                'symbol': symbol,
-                'asset_type': asset_type,
-                'notes': notes,
-                'added_on': datetime.now().isoformat()
-            }]
-        })
+        items = watchlist_data.get('items') or {}
+    if not items.get(key):
+        return False
+    
+    watchlist_ref.update({_item_field_path(key, 'notes'): notes})
+    return True
 
 
 def remove_from_watchlist(
@@ -88,25 +232,39 @@ def remove_from_watchlist(
     asset_type: AssetType
 ) -> None:
     """Remove an asset from a user's watchlist."""
-    watchlist_ref = db.collection('watchlists').document(user_id)
-    
-    # Get current watchlist
-    watchlist_doc = watchlist_ref.get()
+    remove_many_from_watchlist(user_id, [{
+        'symbol': symbol,
+        'asset_type': asset_type
+    }])
+
+
+def remove_many_from_watchlist(
+    user_id: str,
+    assets: List[Dict[str, Any]]
+) -> None:
+    """Remove several assets from a user's watchlist in one write.
     
-    if not watchlist_doc.exists:
+    Args:
+        user_id: User identifier
+        assets: Dicts with ``symbol`` and ``asset_type``
+    """
+    if not assets:
         return
     
-    watchlist_data = watchlist_doc.to_dict()
-    assets = watchlist_data.get('assets', [])
+    items = {
+        _watchlist_key(asset['symbol'], asset['asset_type']): firestore.DELETE_FIELD
+        for asset in assets
+    }
     
-    # Remove asset
-    updated_assets = [
-        asset for asset in assets 
-        if not (asset.get('symbol') == symbol and asset.get('asset_type') == asset_type)
-    ]
+    watchlist_ref = db.collection('watchlists').document(user_id)
+    
+    # Migrate a legacy watchlist first, or its ``assets`` array would bring the
+    # removed items back on the next read
+    legacy_doc = watchlist_ref.get(field_paths=['assets'])
+    if legacy_doc.exists and legacy_doc.to_dict().get('assets') is not None:
+        _migrate_legacy_watchlist_doc(watchlist_ref)
     
-    # Update watchlist
-    watchlist_ref.update({'assets': updated_assets})
+    watchlist_ref.set({'items': items}, merge=True)
 
 
 
@@ -121,7 +279,7 @@ def get_user_preferences(user_id: str) -> Dict[str, Any]:
     """
     try:
         categories_ref = db.collection('selected_categories').document(user_id)
-        categories_doc = categories_ref.get()
+        categories_doc = categories_ref.get(field_paths=PREFERENCE_FIELDS)
         
         if categories_doc.exists:
             preferences = categories_doc.to_dict()
@@ -129,19 +287,36 @@ def get_user_preferences(user_id: str) -> Dict[str, Any]:
         else:
             # Return default preferences if not found
             logger.info(f"No preferences found for user {user_id}, using defaults")
-            return {
-                'expertise_level': 'beginner',
-                'categories': ['stocks', 'investing_basics']
-            }
+            return dict(DEFAULT_PREFERENCES)
             
     except Exception as e:
         logger.error(f"Error retrieving user preferences: {e}")
         # Return a default profile in case of error
-        return {
-            'expertise_level': 'beginner',
-            'categories': ['stocks', 'investing_basics'],
-            'error': str(e)
-        }
+        return {**DEFAULT_PREFERENCES, 'error': str(e)}
+
+def get_user_preferences_and_watchlist(user_id: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Get a user's preferences and watchlist items in a single round trip.
+    
+    Args:
+        user_id: User identifier
+        
+    Returns:
+        Tuple of (preferences, watchlist items)
+    """
+    watchlist_ref = db.collection('watchlists').document(user_id)
+    try:
+        preferences, watchlist_data = get_documents(
+            [db.collection('selected_categories').document(user_id), watchlist_ref],
+            field_paths=PREFERENCE_FIELDS + WATCHLIST_FIELDS
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving user preferences and watchlist: {e}")
+        return {**DEFAULT_PREFERENCES, 'error': str(e)}, []
+    
+    if preferences is None:
+        preferences = dict(DEFAULT_PREFERENCES)
+    assets = _watchlist_assets(watchlist_ref, watchlist_data) if watchlist_data is not None else []
+    return preferences, assets
 
 def get_user_expertise_level(user_id: str) -> str:
     """Get user's expertise level.
@@ -181,25 +356,19 @@ def get_related_topics(user_id: str, asset_symbol: str, asset_type: str) -> List
         List of relevant topics with correlation explanation
     """
     try:
-        # Get user's reading history
-        topic_history = get_user_topic_history(user_id)
+        if asset_type == "stock":
+            details_ref = db.collection('stock_details').document(asset_symbol)
+        else:
+            details_ref = db.collection('crypto_details').document(asset_symbol)
+        
+        # Read the user's reading index and the asset details in one round trip
+        index_doc, asset_details = get_documents(
+            [db.collection(READING_INDEX_COLLECTION).document(user_id), details_ref],
+            field_paths=['topics', 'backfilled', 'name', 'sector', 'industry']
+        )
+        topic_history = reading_index_history(reading_index_topics(user_id, index_doc))
         if not topic_history:
             return []
-            
-        
-        # Try to get asset details from our database if we have any
-        asset_details = None
-        try:
-            if asset_type == "stock":
-                details_ref = db.collection('stock_details').document(asset_symbol)
-            else:
-                details_ref = db.collection('crypto_details').document(asset_symbol)
-                
-            details_doc = details_ref.get()
-            if details_doc.exists:
-                asset_details = details_doc.to_dict()
-        except Exception as e:
-            logger.warning(f"Could not retrieve asset details: {e}")
         
         # Keywords to match for correlations
         keywords = set()
@@ -225,13 +394,16 @@ def get_related_topics(user_id: str, asset_symbol: str, asset_type: str) -> List
         # Find correlations with topic history
         related_topics = []
         
+        # Look up all viewed topics in one pass over the topic caches
+        topics_by_id = find_topics_by_ids([item.get('topic_id') for item in topic_history if item.get('topic_id')])
+        
         for item in topic_history:
             topic_id = item.get('topic_id')
             if not topic_id:
                 continue
                 
             # Get full topic details
-            topic_details = find_topic_by_id(topic_id)
+            topic_details = topics_by_id.get(topic_id)
             if not topic_details:
                 continue
             
@@ -291,76 +463,149 @@ def log_asset_research(
 ) -> None:
     """Log that a user has researched an asset.
     
+    Appends an asset_research event; the event consumer bumps the user's
+    per-symbol counter and the global daily per-symbol counter in the same
+    commit, without reading any existing history.
+    
     Args:
         user_id: User identifier
         symbol: Asset symbol
         asset_type: Type of asset (stock/crypto)
     """
     try:
-        # Get current timestamp
-        now = datetime.now().isoformat()
-        
-        # Create research entry
-        research_entry = {
-            "user_id": user_id,
-            "symbol": symbol,
-            "asset_type": asset_type,
-            "timestamp": now,
-            "date": datetime.now().date().isoformat()
-        }
-        
-        # Add to unified activity collection
-        db.collection("user_asset_research").add(research_entry)
-        
-        # Update user's asset research history
-        history_ref = db.collection('asset_research_history').document(user_id)
-        history_doc = history_ref.get()
-        
-        if history_doc.exists:
-            history_data = history_doc.to_dict()
-            research_items = history_data.get('items', [])
-            
-            # Check if this asset exists in the history
-            existing_idx = next((i for i, item in enumerate(research_items) 
-                               if item.get('symbol') == symbol and 
-                                  item.get('asset_type') == asset_type), None)
-            
-            if existing_idx is not None:
-                # Update existing entry
-                research_items[existing_idx] = {
-                    "symbol": symbol,
-                    "asset_type": asset_type,
-                    "last_researched": now,
-                    "count": research_items[existing_idx].get('count', 0) + 1
-                }
-            else:
-                # Add new entry
-                research_items.append({
-                    "symbol": symbol,
-                    "asset_type": asset_type,
-                    "first_researched": now,
-                    "last_researched": now,
-                    "count": 1
-                })
-            
-            # Update document
-            history_ref.update({
-                'items': research_items,
-                'last_updated': now
-            })
-        else:
-            # Create new document
-            history_ref.set({
-                'user_id': user_id,
-                'items': [{
-                    "symbol": symbol,
-                    "asset_type": asset_type,
-                    "first_researched": now,
-                    "last_researched": now,
-                    "count": 1
-                }],
-                'last_updated': now
+        record_event(user_id, "asset_research", symbol=symbol, asset_type=_asset_type_value(asset_type))
+    except Exception as e:
+        logger.error(f"Error logging asset research: {e}")
+
+
+def increment_asset_research_counters(user_id: str, symbol: str, asset_type: str, batch: Any) -> None:
+    """Add the research counter updates for one researched asset to a batch.
+    
+    Args:
+        user_id: User identifier
+        symbol: Asset symbol
+        asset_type: Type of asset (stock/crypto)
+        batch: Write batch to add the updates to
+    """
+    today = datetime.now().date().isoformat()
+    key = _watchlist_key(symbol, asset_type)
+    asset_type = _asset_type_value(asset_type)
+    
+    # Bump the user's counter for this asset
+    batch.set(db.collection('asset_research_history').document(user_id), {
+        'user_id': user_id,
+        'assets': {
+            key: {
+                "symbol": symbol,
+                "asset_type": asset_type,
+                "last_researched": firestore.SERVER_TIMESTAMP,
+                "count": firestore.Increment(1)
+            }
+        },
+        'last_updated': firestore.SERVER_TIMESTAMP
+    }, merge=True)
+    
+    # Bump the asset's counter for the day; one document per asset and day
+    # keeps each under Firestore's sustained write rate per document
+    batch.set(db.collection('asset_research_daily').document(f"{today}_{key}".replace('/', '_')), {
+        'date': today,
+        'symbol': symbol,
+        'asset_type': asset_type,
+        'count': firestore.Increment(1)
+    }, merge=True)
+
+
+def _research_field_path(key: str, field: str) -> str:
+    """Build the quoted field path of a field of a researched asset's counter."""
+    return FieldPath('assets', key, field).to_api_repr()
+
+
+def _migrate_legacy_research_history(
+    history_ref: Any,
+    assets: Dict[str, Dict[str, Any]],
+    legacy_items: List[Dict[str, Any]],
+    update_time: Any
+) -> None:
+    """Fold the legacy ``items`` array into the ``assets`` counter map.
+    
+    Legacy counts are added to any counts recorded since the map was introduced.
+    The write only applies if the document is unchanged since it was read at
+    ``update_time``, so concurrent migrations cannot add the legacy counts twice;
+    otherwise the next read migrates from the current data.
+    """
+    updates = {}
+    for item in legacy_items:
+        key = _watchlist_key(item.get('symbol'), item.get('asset_type'))
+        count = item.get('count', 0)
+        updates[_research_field_path(key, 'count')] = firestore.Increment(count)
+        migrated = {'first_researched': item.get('first_researched')}
+        if key not in assets:
+            # Counters created since the map was introduced are more recent
+            migrated.update({
+                'symbol': item.get('symbol'),
+                'asset_type': _asset_type_value(item.get('asset_type')),
+                'last_researched': item.get('last_researched')
             })
-        
+        migrated = {field: value for field, value in migrated.items() if value is not None}
+        updates.update({_research_field_path(key, field): value for field, value in migrated.items()})
+        current = assets.setdefault(key, {})
+        current.update(migrated)
+        current['count'] = current.get('count', 0) + count
+    updates['items'] = firestore.DELETE_FIELD
+    
+    try:
+        history_ref.update(updates, option=db.write_option(last_update_time=update_time))
+    except FailedPrecondition:
+        logger.info(f"Research history {history_ref.id} changed while migrating, will migrate on next read")
     except Exception as e:
-        logger.error(f"Error logging asset research: {e}")
\ No newline at end of file
+        logger.warning(f"Could not migrate legacy research history: {e}")
+
+
+def get_user_research_history(user_id: str) -> List[Dict[str, Any]]:
+    """Get a user's researched assets, most researched first.
+    
+    Args:
+        user_id: User identifier
+        
+    Returns:
+        List of assets with research count and last research time
+    """
+    history_ref = db.collection('asset_research_history').document(user_id)
+    doc = history_ref.get(field_paths=['assets', 'items'])
+    if not doc.exists:
+        return []
+    
+    data = doc.to_dict()
+    assets = dict(data.get('assets') or {})
+    if data.get('items') is not None:
+        _migrate_legacy_research_history(history_ref, assets, data['items'], doc.update_time)
+    
+    items = list(assets.values())
+    items.sort(key=lambda item: item.get('count', 0), reverse=True)
+    return items
+
+
+def get_popular_assets(day: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+    """Get the most researched assets across all users for a day.
+    
+    Args:
+        day: ISO date (defaults to today)
+        limit: Maximum number of assets to return
+        
+    Returns:
+        List of assets with symbol, asset_type and research count
+    """
+    day = day or datetime.now().date().isoformat()
+    docs = db.collection('asset_research_daily').where('date', '==', day).get()
+    
+    counts = [doc.to_dict() for doc in docs]
+    counts.sort(key=lambda entry: entry.get('count', 0), reverse=True)
+    
+    return [
+        {
+            "symbol": entry.get('symbol'),
+            "asset_type": entry.get('asset_type'),
+            "count": entry.get('count', 0)
+        }
+        for entry in counts[:limit]
+    ]
@@ -0,0 +1,18 @@
+"""Runtime monitoring package.
+
+This package provides in-process health metrics of the running service.
+"""
+
+from .event_loop import (
+    get_loop_stats,
+    reset_loop_stats,
+    start_loop_watchdog,
+    stop_loop_watchdog
+)
+
+__all__ = [
+    "get_loop_stats",
+    "reset_loop_stats",
+    "start_loop_watchdog",
+    "stop_loop_watchdog"
+]
@@ -0,0 +1,163 @@
+"""Event loop stall watchdog.
+
+A heartbeat coroutine wakes up every ``LOOP_WATCHDOG_INTERVAL_MS`` and
+measures how late it woke up: that lag is the time the loop spent running
+something else without yielding. A monitor thread watches the heartbeat, and
+when it has not beaten for longer than ``LOOP_STALL_THRESHOLD_MS`` it samples
+the loop thread's stack, which shows the blocking call while it is still
+running. Every stall is logged with that stack and counted in the metrics.
+
+Set LOOP_WATCHDOG=0 to disable the watchdog.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LOOP_WATCHDOG_ENABLED = os.environ.get("LOOP_WATCHDOG", "1") != "0"
+LOOP_WATCHDOG_INTERVAL_MS = float(os.environ.get("LOOP_WATCHDOG_INTERVAL_MS", 50))
+LOOP_STALL_THRESHOLD_MS = float(os.environ.get("LOOP_STALL_THRESHOLD_MS", 100))
+
+# Upper bounds of the lag histogram buckets, in milliseconds
+LAG_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 5000)
+MAX_RECENT_STALLS = 20
+STACK_FRAMES = 12
+
+
+class _Watchdog:
+    """Heartbeat on the loop and monitor thread watching it."""
+
+    def __init__(self, interval_ms: float, threshold_ms: float) -> None:
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._stall_stack: Optional[List[str]] = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = 0
+            self.total_lag = 0.0
+            self.max_lag = 0.0
+            self.buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+            self.stalls = 0
+            self.stall_seconds = 0.0
+            self.recent_stalls: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_STALLS)
+            self.started_at = time.monotonic()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._record(max(0.0, now - expected))
+            self._last_beat = now
+
+    def _record(self, lag: float) -> None:
+        lag_ms = lag * 1000
+        bucket = next((i for i, bound in enumerate(LAG_BUCKETS_MS) if lag_ms <= bound), len(LAG_BUCKETS_MS))
+        with self._lock:
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            self.buckets[bucket] += 1
+            if lag < self.threshold:
+                return
+            stack, self._stall_stack = self._stall_stack, None
+            self.stalls += 1
+            self.stall_seconds += lag
+            self.recent_stalls.append({
+                "at": datetime.now().isoformat(),
+                "duration_ms": round(lag_ms, 1),
+                "stack": stack or [],
+            })
+        logger.warning(
+            f"Event loop blocked for {lag_ms:.0f}ms"
+            + (":\n" + "".join(stack) if stack else " (stack not sampled)")
+        )
+
+    def _monitor(self) -> None:
+        sampled_beat = None
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            if last_beat == sampled_beat or time.monotonic() - last_beat < self.threshold:
+                continue
+            # The loop has been stuck past the threshold: sample what it is running, once per stall
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)[-STACK_FRAMES:]
+            with self._lock:
+                self._stall_stack = stack
+            sampled_beat = last_beat
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            bounds = [f"<={bound}ms" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]}ms"]
+            return {
+                "running": self._heartbeat is not None,
+                "interval_ms": self.interval * 1000,
+                "stall_threshold_ms": self.threshold * 1000,
+                "window_seconds": round(time.monotonic() - self.started_at, 1),
+                "samples": self.samples,
+                "avg_lag_ms": round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+                "max_lag_ms": round(self.max_lag * 1000, 2),
+                "lag_histogram": dict(zip(bounds, self.buckets)),
+                "stalls": self.stalls,
+                "stall_ms": round(self.stall_seconds * 1000, 1),
+                "recent_stalls": list(self.recent_stalls),
+            }
+
+
+_watchdog = _Watchdog(LOOP_WATCHDOG_INTERVAL_MS, LOOP_STALL_THRESHOLD_MS)
+
+
+def start_loop_watchdog() -> None:
+    """Start watching the running event loop; call from the loop's thread."""
+    if not LOOP_WATCHDOG_ENABLED:
+        logger.info("Event loop watchdog disabled")
+        return
+    _watchdog.start()
+    logger.info(f"Event loop watchdog started (stall threshold {LOOP_STALL_THRESHOLD_MS:.0f}ms)")
+
+
+def stop_loop_watchdog() -> None:
+    """Stop the heartbeat and the monitor thread."""
+    _watchdog.stop()
+
+
+def get_loop_stats() -> Dict[str, Any]:
+    """Get loop lag statistics and the recent stalls with their sampled stacks."""
+    return _watchdog.stats()
+
+
+def reset_loop_stats() -> None:
+    """Clear the loop lag statistics."""
+    _watchdog.reset()
@@ -0,0 +1,35 @@
+"""Background work package.
+
+This package runs blocking work on named thread pools and work that
+requests do not wait for on a background runner.
+"""
+
+from .pools import (
+    BACKGROUND_POOL,
+    FIRESTORE_POOL,
+    LLM_POOL,
+    MARKET_DATA_POOL,
+    get_pool_stats,
+    reset_pool_stats,
+    run_in_pool
+)
+from .tasks import (
+    drain_background_tasks,
+    get_background_stats,
+    reset_background_stats,
+    submit_background
+)
+
+__all__ = [
+    "BACKGROUND_POOL",
+    "FIRESTORE_POOL",
+    "LLM_POOL",
+    "MARKET_DATA_POOL",
+    "get_pool_stats",
+    "reset_pool_stats",
+    "run_in_pool",
+    "drain_background_tasks",
+    "get_background_stats",
+    "reset_background_stats",
+    "submit_background"
+]
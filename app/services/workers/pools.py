@@ -0,0 +1,181 @@
+"""Named thread pools per class of blocking work.
+
+Blocking calls are offloaded to the pool of their workload class instead of
+the shared default executor, so multi-second LLM calls cannot occupy every
+thread while quick Firestore reads queue behind them:
+
+    llm: Perplexity calls (articles, analyses, news, similar assets)
+    market-data: yfinance and CoinGecko lookups
+    firestore: Firestore reads and writes
+    background: jobs of the background task runner
+
+Pool sizes are configured with WORKER_POOL_<NAME>_SIZE (e.g.
+WORKER_POOL_MARKET_DATA_SIZE). Each pool records how long jobs waited for a
+thread and ran, and logs a saturation warning when jobs wait longer than
+WORKER_POOL_SATURATION_MS. Jobs run in a copy of the caller's context
+variables, like ``asyncio.to_thread``.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+LLM_POOL = "llm"
+MARKET_DATA_POOL = "market-data"
+FIRESTORE_POOL = "firestore"
+BACKGROUND_POOL = "background"
+
+DEFAULT_POOL_SIZES = {
+    LLM_POOL: 16,
+    MARKET_DATA_POOL: 8,
+    FIRESTORE_POOL: 16,
+    BACKGROUND_POOL: 4,
+}
+
+# Jobs waiting longer than this for a thread mean the pool is saturated
+WORKER_POOL_SATURATION_MS = float(os.environ.get("WORKER_POOL_SATURATION_MS", 250))
+SATURATION_WARNING_INTERVAL_SECONDS = 30
+
+
+def _pool_size(name: str) -> int:
+    env_name = f"WORKER_POOL_{name.upper().replace('-', '_')}_SIZE"
+    return int(os.environ.get(env_name, DEFAULT_POOL_SIZES[name]))
+
+
+class WorkerPool:
+    """Thread pool for one workload class, with queue-time and run-time accounting."""
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"pool-{name}")
+        self._lock = threading.Lock()
+        self._last_warning = 0.0
+        self.active = 0
+        self.queued = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.completed = 0
+            self.failed = 0
+            self.saturated = 0
+            self.total_queue_ms = 0.0
+            self.max_queue_ms = 0.0
+            self.total_run_ms = 0.0
+            self.max_run_ms = 0.0
+            self.peak_active = 0
+            self.peak_queued = 0
+
+    def _started(self, enqueued: float) -> None:
+        queue_ms = (time.perf_counter() - enqueued) * 1000
+        warn = False
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            self.total_queue_ms += queue_ms
+            self.max_queue_ms = max(self.max_queue_ms, queue_ms)
+            if queue_ms >= WORKER_POOL_SATURATION_MS:
+                self.saturated += 1
+                now = time.monotonic()
+                if now - self._last_warning >= SATURATION_WARNING_INTERVAL_SECONDS:
+                    self._last_warning = now
+                    warn = True
+            queued = self.queued
+        if warn:
+            logger.warning(
+                f"Worker pool {self.name} saturated: job waited {queue_ms:.0f}ms for one of "
+                f"{self.size} threads, {queued} still queued"
+            )
+
+    def _finished(self, started: float, failed: bool) -> None:
+        run_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.active -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self.total_run_ms += run_ms
+            self.max_run_ms = max(self.max_run_ms, run_ms)
+
+    def _job(self, enqueued: float, context: contextvars.Context, func: Callable[[], Any]) -> Any:
+        self._started(enqueued)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = context.run(func)
+            failed = False
+            return result
+        finally:
+            self._finished(started, failed)
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking function on this pool and wait for its result."""
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        job = partial(self._job, time.perf_counter(), contextvars.copy_context(), partial(func, *args, **kwargs))
+        return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            started = finished + self.active
+            return {
+                "size": self.size,
+                "active": self.active,
+                "queued": self.queued,
+                "peak_active": self.peak_active,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "saturated": self.saturated,
+                "avg_queue_ms": round(self.total_queue_ms / started, 2) if started else 0.0,
+                "max_queue_ms": round(self.max_queue_ms, 2),
+                "avg_run_ms": round(self.total_run_ms / finished, 2) if finished else 0.0,
+                "max_run_ms": round(self.max_run_ms, 2),
+            }
+
+
+_pools: Dict[str, WorkerPool] = {name: WorkerPool(name, _pool_size(name)) for name in DEFAULT_POOL_SIZES}
+
+
+def get_pool(name: str) -> WorkerPool:
+    """Get a named worker pool."""
+    return _pools[name]
+
+
+async def run_in_pool(name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking function on a named worker pool.
+
+    Args:
+        name: Pool of the workload class, e.g. ``FIRESTORE_POOL``
+        func: Function to run
+        *args: Positional arguments of the function
+        **kwargs: Keyword arguments of the function
+
+    Returns:
+        The function's result
+    """
+    return await _pools[name].run(func, *args, **kwargs)
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get utilization, queue times and saturation counts of every pool."""
+    return {name: pool.stats() for name, pool in _pools.items()}
+
+
+def reset_pool_stats() -> None:
+    """Clear the pool counters, except the jobs currently queued or running."""
+    for pool in _pools.values():
+        pool.reset_stats()
+
@@ -0,0 +1,187 @@
+"""Managed runner for fire-and-forget background work.
+
+Work that a request does not wait for (caching generated content, logging
+views and research) is submitted to one process-wide runner instead of
+bare ``asyncio.create_task(asyncio.to_thread(...))`` calls. The runner keeps
+a bounded queue served by one worker per thread of the ``background`` worker
+pool, so bursts cannot pile up unbounded tasks or take threads from the
+pools that requests offload to. When the queue is full new work is
+rejected and counted rather than buffered. Failures are logged with their
+traceback, and queued work is drained when the app shuts down.
+
+Work runs in a copy of the submitting request's context variables.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .pools import BACKGROUND_POOL, get_pool
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_QUEUE_SIZE = int(os.environ.get("BACKGROUND_QUEUE_SIZE", 1000))
+BACKGROUND_DRAIN_TIMEOUT_SECONDS = float(os.environ.get("BACKGROUND_DRAIN_TIMEOUT_SECONDS", 10))
+
+MAX_RECENT_ERRORS = 20
+
+
+class BackgroundTaskRunner:
+    """Bounded queue of blocking background jobs served by one worker per pool thread."""
+
+    def __init__(self, pool: str = BACKGROUND_POOL, queue_size: int = BACKGROUND_QUEUE_SIZE):
+        self._pool = get_pool(pool)
+        self.worker_count = self._pool.size
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._accepting = True
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self.recent_errors: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_ERRORS)
+        self.max_depth = 0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._accepting = True
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            loop.create_task(self._work(), name=f"background-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    def _count(self, name: str, key: str, duration_ms: Optional[float] = None) -> Dict[str, float]:
+        totals = self.totals.setdefault(name, {
+            "submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "total_ms": 0.0, "max_ms": 0.0,
+        })
+        totals[key] += 1
+        if duration_ms is not None:
+            totals["total_ms"] += duration_ms
+            totals["max_ms"] = max(totals["max_ms"], duration_ms)
+        return totals
+
+    def submit(self, func: Callable[..., Any], *args: Any, name: Optional[str] = None, **kwargs: Any) -> bool:
+        """Queue a blocking function to run in the background.
+
+        Must be called from the event loop.
+
+        Args:
+            func: Function to run
+            *args: Positional arguments of the function
+            name: Name the job is reported under, defaults to the function name
+            **kwargs: Keyword arguments of the function
+
+        Returns:
+            True if the job was queued, False if it was rejected
+        """
+        name = name or getattr(func, "__name__", "background")
+        self._ensure_started()
+        if not self._accepting:
+            self._count(name, "rejected")
+            logger.warning(f"Background job {name} rejected, the runner is draining")
+            return False
+        try:
+            self._queue.put_nowait((name, partial(func, *args, **kwargs), contextvars.copy_context(), time.perf_counter()))
+        except asyncio.QueueFull:
+            self._count(name, "rejected")
+            logger.warning(f"Background queue full ({self.queue_size}), rejected {name}")
+            return False
+        self._count(name, "submitted")
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            name, job, context, _ = await self._queue.get()
+            started = time.perf_counter()
+            try:
+                await self._pool.run(context.run, job)
+                self._count(name, "completed", (time.perf_counter() - started) * 1000)
+            except Exception as e:
+                self._count(name, "failed", (time.perf_counter() - started) * 1000)
+                self.recent_errors.append({"job": name, "error": repr(e), "at": datetime.now().isoformat()})
+                logger.error(f"Background job {name} failed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def drain(self, timeout: float = BACKGROUND_DRAIN_TIMEOUT_SECONDS) -> None:
+        """Stop accepting work and wait for queued jobs to finish.
+
+        Args:
+            timeout: Seconds to wait before abandoning the remaining jobs
+        """
+        if self._queue is None:
+            return
+        self._accepting = False
+        pending = self._queue.qsize()
+        if pending:
+            logger.info(f"Draining {pending} queued background jobs")
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Background drain timed out after {timeout}s, {self._queue.qsize()} jobs lost")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> Dict[str, Any]:
+        jobs = {name: dict(values) for name, values in self.totals.items()}
+        for values in jobs.values():
+            finished = values["completed"] + values["failed"]
+            values["avg_ms"] = round(values["total_ms"] / finished, 2) if finished else 0.0
+            values["total_ms"] = round(values["total_ms"], 2)
+            values["max_ms"] = round(values["max_ms"], 2)
+        return {
+            "workers": self.worker_count,
+            "queue_size": self.queue_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_depth,
+            "accepting": self._accepting,
+            "jobs": jobs,
+            "recent_errors": list(self.recent_errors),
+        }
+
+
+_runner = BackgroundTaskRunner()
+
+
+def submit_background(func: Callable[..., Any], *args: Any, name: Optional[str] = None, **kwargs: Any) -> bool:
+    """Queue a blocking function on the shared background runner.
+
+    Args:
+        func: Function to run
+        *args: Positional arguments of the function
+        name: Name the job is reported under, defaults to the function name
+        **kwargs: Keyword arguments of the function
+
+    Returns:
+        True if the job was queued, False if the queue was full
+    """
+    return _runner.submit(func, *args, name=name, **kwargs)
+
+
+async def drain_background_tasks(timeout: float = BACKGROUND_DRAIN_TIMEOUT_SECONDS) -> None:
+    """Wait for queued background jobs to finish; call on shutdown."""
+    await _runner.drain(timeout)
+
+
+def get_background_stats() -> Dict[str, Any]:
+    """Get queue depth and per-job counts, durations and recent failures."""
+    return _runner.stats()
+
+
+def reset_background_stats() -> None:
+    """Clear the background job counters."""
+    _runner.reset_stats()
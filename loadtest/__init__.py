@@ -0,0 +1,14 @@
+"""Offline load test of the API.
+
+Runs the app in-process on the in-memory Firestore with local stand-ins for
+Perplexity, yfinance and CoinGecko, drives a weighted mix of watchlist,
+search, research, article, summary and dashboard traffic, and reports
+throughput and p50/p95/p99 latency per endpoint, upstream call counts, and
+the app's event loop and worker pool metrics. Nothing leaves the machine, so
+runs are repeatable and can be compared before and after a change:
+
+    python -m loadtest --duration 30 --concurrency 20
+    python -m loadtest --llm-latency 800:3000 --json before.json
+
+See ``python -m loadtest --help`` for all options.
+"""
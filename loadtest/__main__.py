@@ -0,0 +1,86 @@
+"""Command line entry point: ``python -m loadtest``."""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest",
+        description="Load test the API in-process against stand-ins for Firestore, Perplexity, yfinance and CoinGecko.",
+    )
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of measured load (default: 30)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients (default: 20)")
+    parser.add_argument("--users", type=int, default=50, help="Virtual users to seed (default: 50)")
+    parser.add_argument("--refresh-rate", type=float, default=0.02,
+                        help="Share of content requests sending refresh=true (default: 0.02)")
+    parser.add_argument("--think-time-ms", type=float, default=0,
+                        help="Mean pause of a client between requests (default: 0)")
+    parser.add_argument("--no-warmup", action="store_true", help="Start measuring with cold content caches")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of users, mix and upstream latencies")
+    parser.add_argument("--llm-latency", default="1500:6000",
+                        help="Perplexity latency as median_ms:p99_ms (default: 1500:6000)")
+    parser.add_argument("--market-latency", default="150:800",
+                        help="yfinance, Yahoo search and CoinGecko latency as median_ms:p99_ms (default: 150:800)")
+    parser.add_argument("--firestore-latency", default="8",
+                        help="In-memory Firestore latency, ms or op=ms pairs (default: 8)")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0,
+                        help="Share of upstream calls that fail (default: 0)")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep the per-user rate limiter enabled")
+    parser.add_argument("--json", metavar="PATH", help="Also write the full report as JSON to PATH")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's info logs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+
+    # The app reads its configuration at import time
+    os.environ["FIRESTORE_BACKEND"] = "memory"
+    os.environ["FAKE_FIRESTORE_LATENCY_MS"] = args.firestore_latency
+    os.environ.setdefault("PERPLEXITY_API_KEY", "loadtest")
+    os.environ.setdefault("TTL_SWEEP_INTERVAL_SECONDS", "0")
+    if not args.rate_limit:
+        os.environ["RATE_LIMIT"] = "0"
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    logging.getLogger("loadtest").setLevel(logging.INFO)
+
+    from .report import format_report
+    from .runner import LoadTestConfig, run_load_test
+    from .upstreams import LatencyProfile, Upstreams
+
+    market = LatencyProfile.parse(args.market_latency, args.upstream_error_rate)
+    upstreams = Upstreams({
+        "perplexity": LatencyProfile.parse(args.llm_latency, args.upstream_error_rate),
+        "coingecko": market,
+        "yahoo": market,
+        "yfinance": market,
+    }, seed=args.seed)
+    config = LoadTestConfig(
+        duration=args.duration,
+        concurrency=args.concurrency,
+        users=args.users,
+        refresh_rate=args.refresh_rate,
+        think_time_ms=args.think_time_ms,
+        warmup=not args.no_warmup,
+        seed=args.seed,
+    )
+    for name, profile in upstreams.latencies.items():
+        logging.getLogger("loadtest").info(f"{name}: {profile.describe()}")
+
+    report = asyncio.run(run_load_test(config, upstreams))
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"config": vars(args), **report}, file, indent=2, default=str)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
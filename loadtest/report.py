@@ -0,0 +1,55 @@
+"""Plain-text rendering of a load test report."""
+from typing import Any, Dict, List
+
+
+def _table(headers: List[str], rows: List[List[Any]]) -> str:
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    lines = ["  ".join(str(cell).rjust(width) if i else str(cell).ljust(width)
+                       for i, (cell, width) in enumerate(zip(row, widths)))
+             for row in [headers, *rows]]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render throughput and latency per endpoint, upstream calls and app metrics."""
+    endpoints = report["endpoints"]
+    rows = [
+        [name, values["requests"], values["errors"], values["rps"], values["p50_ms"],
+         values["p95_ms"], values["p99_ms"], values["max_ms"]]
+        for name, values in sorted(endpoints.items(), key=lambda item: -item[1]["requests"])
+    ]
+    rows.append(["TOTAL", report["requests"], report["errors"], report["throughput_rps"],
+                 report["p50_ms"], report["p95_ms"], report["p99_ms"], ""])
+    sections = [
+        f"{report['requests']} requests in {report['duration_seconds']}s "
+        f"({report['throughput_rps']} req/s, {report['errors']} errors)",
+        _table(["endpoint", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms"], rows),
+    ]
+
+    upstreams = report["upstreams"]
+    upstream_rows = [
+        [name, count, upstreams["failures"].get(name, 0), round(count / report["requests"], 3) if report["requests"] else 0]
+        for name, count in upstreams["calls"].items()
+    ]
+    if upstream_rows:
+        sections.append(
+            f"Upstream calls ({upstreams['calls_per_request']} per request)\n"
+            + _table(["upstream call", "calls", "failures", "per request"], upstream_rows)
+        )
+
+    app = report["app"]
+    pool_rows = [
+        [name, pool["size"], pool["completed"], pool["peak_active"], pool["peak_queued"],
+         pool["avg_queue_ms"], pool["max_queue_ms"], pool["saturated"]]
+        for name, pool in app["pools"].items()
+    ]
+    sections.append("Worker pools\n" + _table(
+        ["pool", "size", "jobs", "peak active", "peak queued", "avg queue ms", "max queue ms", "saturated"], pool_rows
+    ))
+    loop = app["event_loop"]
+    sections.append(
+        f"Event loop: avg lag {loop['avg_lag_ms']}ms, max lag {loop['max_lag_ms']}ms, "
+        f"{loop['stalls']} stalls ({loop['stall_ms']}ms)"
+    )
+    return "\n\n".join(sections)
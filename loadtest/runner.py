@@ -0,0 +1,218 @@
+"""Load test driver.
+
+Boots the app in-process with its startup and shutdown handlers, seeds
+virtual users, warms the content caches the way first visits do, then runs
+a closed loop of concurrent clients over the scenario mix for a fixed
+duration. Requests go through ``httpx.ASGITransport``, so the whole
+middleware stack runs but no sockets are involved.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import httpx
+
+from .scenarios import WARMUP_BUILDERS, RunState, VirtualUser, make_users, pick_scenario, seed_users
+from .upstreams import Upstreams
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadTestConfig:
+    duration: float = 30.0
+    concurrency: int = 20
+    users: int = 50
+    # Share of requests to refreshable endpoints that send refresh=true
+    refresh_rate: float = 0.02
+    think_time_ms: float = 0.0
+    warmup: bool = True
+    seed: int = 1
+    request_timeout: float = 60.0
+
+
+class Recorder:
+    """Latencies and outcomes per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.bytes: Counter = Counter()
+
+    def record(self, name: str, elapsed: float, status: str, size: int = 0) -> None:
+        self.latencies[name].append(elapsed * 1000)
+        self.statuses[name][status] += 1
+        self.bytes[name] += size
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+async def _send(client: httpx.AsyncClient, spec, state: RunState, recorder: Recorder) -> None:
+    started = time.perf_counter()
+    try:
+        response = await client.request(spec.method, spec.path, params=spec.params, json=spec.json)
+    except Exception as e:
+        recorder.record(spec.name, time.perf_counter() - started, type(e).__name__)
+        return
+    elapsed = time.perf_counter() - started
+    recorder.record(spec.name, elapsed, str(response.status_code), len(response.content))
+    if response.status_code == 404:
+        state.forget(spec.path.rsplit("/", 1)[-1])
+    if response.status_code == 200 and response.headers.get("content-type", "").startswith("application/json"):
+        try:
+            state.harvest(response.json())
+        except json.JSONDecodeError:
+            pass
+
+
+async def _client_loop(
+    worker: int,
+    client: httpx.AsyncClient,
+    users: List[VirtualUser],
+    state: RunState,
+    recorder: Recorder,
+    config: LoadTestConfig,
+    deadline: float,
+) -> None:
+    rng = random.Random(f"{config.seed}:{worker}")
+    while time.perf_counter() < deadline:
+        user = rng.choice(users)
+        scenario = pick_scenario(rng)
+        refresh = scenario.refreshable and rng.random() < config.refresh_rate
+        await _send(client, scenario.build(user, state, rng, refresh), state, recorder)
+        if config.think_time_ms:
+            await asyncio.sleep(rng.expovariate(1000 / config.think_time_ms))
+
+
+async def _warm_up(client: httpx.AsyncClient, users: List[VirtualUser], state: RunState, config: LoadTestConfig) -> None:
+    """Generate each user's topics and the news feed once, as first visits would."""
+    rng = random.Random(config.seed)
+    semaphore = asyncio.Semaphore(config.concurrency)
+    recorder = Recorder()
+
+    async def visit(user):
+        async with semaphore:
+            for build in WARMUP_BUILDERS:
+                await _send(client, build(user, state, rng, False), state, recorder)
+
+    await asyncio.gather(*(visit(user) for user in users))
+
+
+def _reset_app_metrics() -> None:
+    from app.services.firebase.instrumentation import reset_operation_totals
+    from app.services.monitoring import reset_loop_stats
+    from app.services.workers import reset_background_stats, reset_pool_stats
+
+    reset_operation_totals()
+    reset_loop_stats()
+    reset_pool_stats()
+    reset_background_stats()
+
+
+def _app_metrics() -> Dict[str, Any]:
+    from app.services.firebase.instrumentation import get_operation_totals
+    from app.services.monitoring import get_loop_stats
+    from app.services.workers import get_background_stats, get_pool_stats
+
+    loop = get_loop_stats()
+    background = get_background_stats()
+    return {
+        "event_loop": {key: loop[key] for key in ("avg_lag_ms", "max_lag_ms", "stalls", "stall_ms")},
+        "pools": get_pool_stats(),
+        "background": {key: background[key] for key in ("max_queue_depth", "jobs")},
+        "firestore": get_operation_totals(),
+    }
+
+
+def _summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    endpoints = {}
+    for name in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[name])
+        statuses = recorder.statuses[name]
+        errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors,
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(values[-1], 1),
+            "avg_bytes": int(recorder.bytes[name] / len(values)),
+            "statuses": dict(statuses),
+        }
+    every = sorted(value for values in recorder.latencies.values() for value in values)
+    total = len(every)
+    return {
+        "duration_seconds": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(every, 50), 1),
+        "p95_ms": round(percentile(every, 95), 1),
+        "p99_ms": round(percentile(every, 99), 1),
+        "endpoints": endpoints,
+    }
+
+
+async def run_load_test(config: LoadTestConfig, upstreams: Upstreams) -> Dict[str, Any]:
+    """Run the load test against the app with the upstream stand-ins installed.
+
+    Args:
+        config: Run settings
+        upstreams: Upstream stand-ins whose calls are counted
+
+    Returns:
+        Report with per-endpoint latency percentiles, throughput, upstream
+        call counts and the app's own loop, pool and Firestore metrics
+    """
+    from app.main import app
+
+    rng = random.Random(config.seed)
+    users = make_users(config.users, rng)
+    state = RunState()
+    recorder = Recorder()
+
+    with upstreams.install():
+        async with app.router.lifespan_context(app):
+            await asyncio.to_thread(seed_users, users)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=config.request_timeout) as client:
+                if config.warmup:
+                    started = time.perf_counter()
+                    await _warm_up(client, users, state, config)
+                    logger.info(
+                        f"Warm-up took {time.perf_counter() - started:.1f}s: "
+                        f"{len(state.topic_ids)} topics, {len(state.news_ids)} news items"
+                    )
+                upstreams.reset()
+                _reset_app_metrics()
+
+                started = time.perf_counter()
+                deadline = started + config.duration
+                await asyncio.gather(*(
+                    _client_loop(worker, client, users, state, recorder, config, deadline)
+                    for worker in range(config.concurrency)
+                ))
+                elapsed = time.perf_counter() - started
+                app_metrics = _app_metrics()
+
+    report = _summarize(recorder, elapsed)
+    calls = upstreams.stats()
+    report["upstreams"] = {
+        **calls,
+        "calls_per_request": round(sum(calls["calls"].values()) / report["requests"], 3) if report["requests"] else 0.0,
+    }
+    report["app"] = app_metrics
+    return report
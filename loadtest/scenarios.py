@@ -0,0 +1,219 @@
+"""Traffic mix driven by the load test.
+
+Each scenario builds one request for a virtual user. Scenarios are picked
+at random by weight, so the mix approximates production traffic: mostly
+watchlist and dashboard reads, some research and articles, few searches
+and summaries. Content ids that only exist once the app has generated them
+(topic and news ids) are harvested from responses as the run goes on.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.api.models import AssetType, ExpertiseLevel
+
+CATEGORIES = ["Stocks", "Crypto", "Personal Finance", "Macroeconomics", "Retirement", "Real Estate"]
+
+WATCHLIST_ASSETS = [
+    ("AAPL", AssetType.stock),
+    ("MSFT", AssetType.stock),
+    ("NVDA", AssetType.stock),
+    ("TSLA", AssetType.stock),
+    ("JPM", AssetType.stock),
+    ("BTC", AssetType.crypto),
+    ("ETH", AssetType.crypto),
+    ("SOL", AssetType.crypto),
+]
+
+SEARCH_QUERIES = [("ap", AssetType.stock), ("micro", AssetType.stock), ("bit", AssetType.crypto), ("sol", AssetType.crypto)]
+
+
+@dataclass
+class VirtualUser:
+    """A seeded user with preferences and a watchlist."""
+
+    user_id: str
+    expertise_level: str
+    categories: List[str]
+    watchlist: List[Tuple[str, AssetType]]
+
+
+@dataclass
+class RunState:
+    """Content ids discovered from responses during the run."""
+
+    topic_ids: List[str] = field(default_factory=list)
+    news_ids: List[str] = field(default_factory=list)
+
+    def harvest(self, body: Any) -> None:
+        """Remember the topic and news ids listed in a response body."""
+        if not isinstance(body, dict):
+            return
+        for topics in (body.get("recommendations") or {}).values():
+            self._add(self.topic_ids, (topic.get("topic_id") for topic in topics))
+        news = body.get("trending_news") or []
+        self._add(self.news_ids, (item.get("id") for item in news if isinstance(item, dict)))
+
+    def forget(self, content_id: str) -> None:
+        """Drop an id the app no longer knows, e.g. a topic replaced by a newer generation."""
+        for ids in (self.topic_ids, self.news_ids):
+            if content_id in ids:
+                ids.remove(content_id)
+
+    @staticmethod
+    def _add(ids: List[str], new_ids) -> None:
+        for new_id in new_ids:
+            if new_id and new_id not in ids:
+                ids.append(new_id)
+
+
+@dataclass
+class RequestSpec:
+    """One request of a scenario; ``name`` is the endpoint it is reported under."""
+
+    name: str
+    method: str
+    path: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    json: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: float
+    build: Callable[[VirtualUser, RunState, random.Random, bool], RequestSpec]
+    # Whether refresh=true is sent on a share of requests
+    refreshable: bool = False
+
+
+def make_users(count: int, rng: random.Random) -> List[VirtualUser]:
+    """Create virtual users with random expertise, interests and watchlists."""
+    levels = [level.value for level in ExpertiseLevel]
+    return [
+        VirtualUser(
+            user_id=f"loadtest-user-{i:04d}",
+            expertise_level=rng.choice(levels),
+            categories=rng.sample(CATEGORIES, rng.randint(1, 3)),
+            watchlist=rng.sample(WATCHLIST_ASSETS, rng.randint(2, 5)),
+        )
+        for i in range(count)
+    ]
+
+
+def seed_users(users: List[VirtualUser]) -> None:
+    """Store the users' preferences and watchlists in the app's database."""
+    from app.services.firebase import add_to_watchlist, save_user_selected_categories
+
+    for user in users:
+        save_user_selected_categories(user.user_id, user.expertise_level, user.categories)
+        for symbol, asset_type in user.watchlist:
+            add_to_watchlist(user.user_id, symbol, asset_type)
+
+
+def _with_refresh(params: Dict[str, Any], refresh: bool) -> Dict[str, Any]:
+    return {**params, "refresh": "true"} if refresh else params
+
+
+def _watchlist(user, state, rng, refresh):
+    return RequestSpec("watchlist", "GET", "/watchlist", {"user_id": user.user_id, "limit": 20})
+
+
+def _watchlist_item(user, state, rng, refresh):
+    symbol, asset_type = rng.choice(user.watchlist)
+    params = {"user_id": user.user_id, "asset_type": asset_type.value}
+    return RequestSpec("watchlist_item", "GET", f"/watchlist/items/{symbol}", params)
+
+
+def _search(user, state, rng, refresh):
+    query, asset_type = rng.choice(SEARCH_QUERIES)
+    return RequestSpec("search", "POST", "/watchlist/search", json={"query": query, "asset_type": asset_type.value, "limit": 5})
+
+
+def _asset(user, state, rng, refresh):
+    symbol, asset_type = rng.choice(user.watchlist)
+    return RequestSpec("asset", "GET", f"/watchlist/asset/{symbol}", {"user_id": user.user_id, "asset_type": asset_type.value})
+
+
+def _research(user, state, rng, refresh):
+    symbol, asset_type = rng.choice(user.watchlist)
+    params = {"user_id": user.user_id, "asset_type": asset_type.value}
+    return RequestSpec("research", "GET", f"/watchlist/research/{symbol}", _with_refresh(params, refresh))
+
+
+def _research_stream(user, state, rng, refresh):
+    symbol, asset_type = rng.choice(user.watchlist)
+    params = {"user_id": user.user_id, "asset_type": asset_type.value}
+    return RequestSpec("research_stream", "GET", f"/watchlist/research/{symbol}/stream", params)
+
+
+def _analysis(user, state, rng, refresh):
+    symbol, asset_type = rng.choice(user.watchlist)
+    params = {"user_id": user.user_id, "asset_type": asset_type.value}
+    return RequestSpec("analysis", "GET", f"/watchlist/analysis/{symbol}", _with_refresh(params, refresh))
+
+
+def _recommended_topics(user, state, rng, refresh):
+    return RequestSpec("recommended_topics", "GET", "/user/recommendedtopics", {"user_id": user.user_id})
+
+
+def _article(user, state, rng, refresh):
+    if not state.topic_ids:
+        return _recommended_topics(user, state, rng, refresh)
+    topic_id = rng.choice(state.topic_ids)
+    return RequestSpec("article", "GET", f"/article/topic/{topic_id}", _with_refresh({"user_id": user.user_id}, refresh))
+
+
+def _summary(user, state, rng, refresh):
+    params = {"user_id": user.user_id, "period": rng.choice(["day", "week", "month"])}
+    return RequestSpec("summary", "GET", "/summary", _with_refresh(params, refresh))
+
+
+def _dashboard_home(user, state, rng, refresh):
+    return RequestSpec("dashboard_home", "GET", "/dashboard/home", _with_refresh({"user_id": user.user_id}, refresh))
+
+
+def _dashboard_essential(user, state, rng, refresh):
+    return RequestSpec("dashboard_essential", "GET", "/dashboard/home/essential", _with_refresh({"user_id": user.user_id}, refresh))
+
+
+def _dashboard_news(user, state, rng, refresh):
+    return RequestSpec("dashboard_news", "GET", "/dashboard/home/news", {"user_id": user.user_id})
+
+
+def _news_article(user, state, rng, refresh):
+    if not state.news_ids:
+        return _dashboard_news(user, state, rng, refresh)
+    news_id = rng.choice(state.news_ids)
+    return RequestSpec("news_article", "GET", f"/dashboard/news/{news_id}", _with_refresh({"user_id": user.user_id}, refresh))
+
+
+def _selected_categories(user, state, rng, refresh):
+    return RequestSpec("selected_categories", "GET", "/selectedcategories", {"user_id": user.user_id})
+
+
+SCENARIOS = [
+    Scenario("watchlist", 14, _watchlist),
+    Scenario("watchlist_item", 4, _watchlist_item),
+    Scenario("search", 6, _search),
+    Scenario("asset", 8, _asset),
+    Scenario("research", 7, _research, refreshable=True),
+    Scenario("research_stream", 2, _research_stream),
+    Scenario("analysis", 3, _analysis, refreshable=True),
+    Scenario("recommended_topics", 6, _recommended_topics),
+    Scenario("article", 10, _article, refreshable=True),
+    Scenario("summary", 4, _summary, refreshable=True),
+    Scenario("dashboard_home", 12, _dashboard_home, refreshable=True),
+    Scenario("dashboard_essential", 6, _dashboard_essential, refreshable=True),
+    Scenario("dashboard_news", 5, _dashboard_news),
+    Scenario("news_article", 5, _news_article, refreshable=True),
+    Scenario("selected_categories", 8, _selected_categories),
+]
+
+
+# First visits generate each user's topics and the news feed
+WARMUP_BUILDERS = (_recommended_topics, _dashboard_news)
+
+
+def pick_scenario(rng: random.Random, scenarios: List[Scenario] = SCENARIOS) -> Scenario:
+    return rng.choices(scenarios, weights=[scenario.weight for scenario in scenarios])[0]
@@ -0,0 +1,356 @@
+"""Local stand-ins for the external services the app calls.
+
+Every outbound HTTP request of the app goes through ``requests`` and every
+market data lookup through the ``yfinance`` module, so the stand-ins are
+installed at those two seams and the app's own request building, parsing and
+caching code runs unchanged:
+
+    perplexity: answers chat completions. Structured calls get a document
+        generated from the request's JSON schema; free-text calls get
+        markdown, or a JSON list when the prompt asks for topics or quiz
+        questions.
+    coingecko: answers coin search and market queries.
+    yahoo: answers the Yahoo Finance symbol search.
+    yfinance: replaces ``yf.Ticker`` and ``yf.download`` with price history
+        and info built from a seeded random walk.
+
+Each upstream sleeps for a latency drawn from a log-normal distribution
+given by its median and p99, and fails a configurable share of calls. Calls
+to any other host fail as if the network were down. Every call is counted
+per upstream and operation.
+"""
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+PERPLEXITY_HOST = "api.perplexity.ai"
+COINGECKO_HOST = "api.coingecko.com"
+YAHOO_SEARCH_HOSTS = ("query1.finance.yahoo.com", "query2.finance.yahoo.com")
+
+# z-score of the 99th percentile of a standard normal distribution
+_Z99 = 2.3263
+
+CRYPTO_COINS = [
+    ("bitcoin", "BTC", "Bitcoin"),
+    ("ethereum", "ETH", "Ethereum"),
+    ("solana", "SOL", "Solana"),
+    ("cardano", "ADA", "Cardano"),
+    ("ripple", "XRP", "XRP"),
+    ("dogecoin", "DOGE", "Dogecoin"),
+]
+
+STOCK_SYMBOLS = [
+    ("AAPL", "Apple Inc."),
+    ("MSFT", "Microsoft Corporation"),
+    ("NVDA", "NVIDIA Corporation"),
+    ("AMZN", "Amazon.com, Inc."),
+    ("GOOGL", "Alphabet Inc."),
+    ("TSLA", "Tesla, Inc."),
+    ("JPM", "JPMorgan Chase & Co."),
+    ("V", "Visa Inc."),
+]
+
+_WORDS = (
+    "market liquidity yield inflation earnings volatility dividend portfolio "
+    "bond equity rate policy growth valuation risk sector index momentum "
+    "balance cash flow margin revenue guidance spread duration hedge"
+).split()
+
+
+class LatencyProfile:
+    """Log-normal latency given by its median and 99th percentile in milliseconds."""
+
+    def __init__(self, median_ms: float, p99_ms: float, error_rate: float = 0.0):
+        self.median_ms = median_ms
+        self.p99_ms = max(p99_ms, median_ms)
+        self.error_rate = error_rate
+        self._mu = math.log(max(median_ms, 0.001))
+        self._sigma = math.log(self.p99_ms / median_ms) / _Z99 if median_ms > 0 else 0.0
+
+    @classmethod
+    def parse(cls, spec: str, error_rate: float = 0.0) -> "LatencyProfile":
+        """Build a profile from ``"<median_ms>:<p99_ms>"`` or ``"<ms>"``."""
+        median, _, p99 = spec.partition(":")
+        return cls(float(median), float(p99 or median), error_rate)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        return rng.lognormvariate(self._mu, self._sigma) / 1000
+
+    def describe(self) -> str:
+        return f"median {self.median_ms:g}ms, p99 {self.p99_ms:g}ms, errors {self.error_rate:.0%}"
+
+
+class _FakeResponse(requests.Response):
+    """``requests.Response`` with a JSON or text body set in memory."""
+
+    def __init__(self, url: str, status_code: int = 200, payload: Any = None, text: Optional[str] = None):
+        super().__init__()
+        self.url = url
+        self.status_code = status_code
+        self.reason = "OK" if status_code < 400 else "Stand-in error"
+        body = text if text is not None else json.dumps(payload)
+        self._content = body.encode("utf-8")
+        self.encoding = "utf-8"
+        self.headers["Content-Type"] = "application/json" if text is None else "text/plain"
+
+
+def _document_from_schema(schema: Dict[str, Any], rng: random.Random, name: str = "") -> Any:
+    """Generate a document that satisfies a JSON schema of the app's structured prompts."""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "string")
+    if schema_type == "object":
+        return {
+            key: _document_from_schema(value, rng, key)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        count = max(schema.get("minItems", 0), min(schema.get("maxItems", 4), 4))
+        return [_document_from_schema(schema.get("items", {}), rng, name) for _ in range(count)]
+    if schema_type == "integer":
+        return rng.randint(1, 100)
+    if schema_type == "number":
+        return round(rng.uniform(1, 100), 2)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    if schema.get("format") == "date-time":
+        return datetime.now().isoformat()
+    if name == "id" or name.endswith("_id"):
+        return uuid.uuid4().hex[:12]
+    if "url" in name:
+        return f"https://example.com/{uuid.uuid4().hex[:8]}"
+    return _sentence(rng, 12 if name in ("content", "summary", "description", "explanation") else 4)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _markdown(rng: random.Random) -> str:
+    sections = []
+    for _ in range(4):
+        sections.append(f"## {_sentence(rng, 3)[:-1]}\n\n" + " ".join(_sentence(rng, 14) for _ in range(5)))
+    return "\n\n".join(sections)
+
+
+def _free_text_reply(prompt: str, rng: random.Random) -> str:
+    """Answer a prompt without a schema the way the app's parsers expect."""
+    if '"question"' in prompt:
+        items = [{
+            "question": _sentence(rng, 8)[:-1] + "?",
+            "options": [{"label": label, "text": _sentence(rng, 5)} for label in "ABCD"],
+            "correct_answer": rng.choice("ABCD"),
+            "explanation": _sentence(rng, 14),
+        } for _ in range(3)]
+        return "```json\n" + json.dumps(items) + "\n```"
+    if '"title"' in prompt and "JSON" in prompt:
+        items = [{
+            "title": _sentence(rng, 4)[:-1],
+            "description": _sentence(rng, 16),
+            "importance": _sentence(rng, 10),
+            "relevance": _sentence(rng, 10),
+        } for _ in range(5)]
+        return "```json\n" + json.dumps(items) + "\n```"
+    return _markdown(rng)
+
+
+class Upstreams:
+    """Stand-ins for Perplexity, CoinGecko, Yahoo Finance and yfinance with call accounting."""
+
+    def __init__(self, latencies: Dict[str, LatencyProfile], seed: int = 0):
+        self.latencies = latencies
+        self.seed = seed
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.busy_seconds: Counter = Counter()
+
+    def _rng(self) -> random.Random:
+        # One generator per thread keeps draws reproducible without a lock
+        rng = getattr(self._local, "rng", None)
+        if rng is None:
+            rng = self._local.rng = random.Random(f"{self.seed}:{threading.get_ident()}")
+        return rng
+
+    def _call(self, upstream: str, operation: str) -> bool:
+        """Wait out the upstream's latency and count the call; returns False if it fails."""
+        profile = self.latencies[upstream]
+        rng = self._rng()
+        delay = profile.sample(rng)
+        failed = rng.random() < profile.error_rate
+        with self._lock:
+            self.calls[f"{upstream}.{operation}"] += 1
+            self.busy_seconds[upstream] += delay
+            if failed:
+                self.failures[f"{upstream}.{operation}"] += 1
+        time.sleep(delay)
+        return not failed
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.failures.clear()
+            self.busy_seconds.clear()
+
+    # HTTP
+
+    def send(self, session: requests.Session, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        """Replacement for ``requests.Session.send`` routing each request to its stand-in."""
+        url = urlparse(request.url)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.hostname == PERPLEXITY_HOST:
+            return self._perplexity(request)
+        if url.hostname == COINGECKO_HOST:
+            return self._coingecko(request.url, url.path, params)
+        if url.hostname in YAHOO_SEARCH_HOSTS:
+            return self._yahoo_search(request.url, params)
+        with self._lock:
+            self.calls[f"unstubbed.{url.hostname}"] += 1
+        raise requests.ConnectionError(f"Load test has no stand-in for {url.hostname}")
+
+    def _perplexity(self, request: requests.PreparedRequest) -> requests.Response:
+        body = json.loads(request.body or b"{}")
+        schema = (body.get("response_format") or {}).get("json_schema", {}).get("schema")
+        operation = "structured" if schema else "text"
+        if not self._call("perplexity", operation):
+            return _FakeResponse(request.url, 429, {"error": {"message": "rate limited"}})
+        rng = self._rng()
+        if schema:
+            content = json.dumps(_document_from_schema(schema, rng))
+        else:
+            content = _free_text_reply(body["messages"][-1]["content"], rng)
+        return _FakeResponse(request.url, payload={
+            "id": uuid.uuid4().hex,
+            "model": body.get("model", "sonar"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+        })
+
+    def _coingecko(self, url: str, path: str, params: Dict[str, str]) -> requests.Response:
+        operation = path.rsplit("/", 1)[-1]
+        if not self._call("coingecko", operation):
+            return _FakeResponse(url, 429, {"status": {"error_message": "rate limited"}})
+        if operation == "search":
+            query = params.get("query", "").lower()
+            coins = [
+                {"id": coin_id, "symbol": symbol.lower(), "name": name, "market_cap_rank": rank + 1,
+                 "large": f"https://example.com/{coin_id}.png"}
+                for rank, (coin_id, symbol, name) in enumerate(CRYPTO_COINS)
+                if query in coin_id or query in symbol.lower() or query in name.lower()
+            ]
+            return _FakeResponse(url, payload={"coins": coins})
+        ids = params.get("ids", "").split(",")
+        markets = []
+        for rank, (coin_id, symbol, name) in enumerate(CRYPTO_COINS):
+            if coin_id not in ids:
+                continue
+            price = _price(coin_id, 0)
+            change = price - _price(coin_id, 1)
+            markets.append({
+                "id": coin_id, "symbol": symbol.lower(), "name": name,
+                "current_price": price, "price_change_24h": round(change, 2),
+                "price_change_percentage_24h": round(change / price * 100, 2),
+                "market_cap": int(price * 1e7), "market_cap_rank": rank + 1,
+                "image": f"https://example.com/{coin_id}.png",
+            })
+        return _FakeResponse(url, payload=markets)
+
+    def _yahoo_search(self, url: str, params: Dict[str, str]) -> requests.Response:
+        if not self._call("yahoo", "search"):
+            return _FakeResponse(url, 503, {"finance": {"error": "unavailable"}})
+        query = params.get("q", "").lower()
+        quotes = [
+            {"symbol": symbol, "shortname": name, "exchange": "NMS", "quoteType": "EQUITY", "score": 1000 - i}
+            for i, (symbol, name) in enumerate(STOCK_SYMBOLS)
+            if query in symbol.lower() or query in name.lower()
+        ]
+        return _FakeResponse(url, payload={"quotes": quotes})
+
+    # yfinance
+
+    def ticker(self, symbol: str) -> "_FakeTicker":
+        return _FakeTicker(self, symbol)
+
+    def download(self, symbols: List[str], period: str = "1d", **kwargs: Any) -> Any:
+        if not self._call("yfinance", "download"):
+            raise requests.ConnectionError("yfinance stand-in failure")
+        if len(symbols) == 1:
+            return _history(symbols[0], period)
+        return {symbol: _history(symbol, period) for symbol in symbols}
+
+    @contextmanager
+    def install(self) -> Iterator["Upstreams"]:
+        """Route the app's outbound calls to the stand-ins while the context is open."""
+        upstreams = self
+
+        def send(session, request, **kwargs):
+            return upstreams.send(session, request, **kwargs)
+
+        fake_yf = mock.MagicMock(Ticker=self.ticker, download=self.download)
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch.object(requests.Session, "send", send))
+            stack.enter_context(mock.patch("app.services.assets.data.yf", fake_yf))
+            yield self
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": dict(sorted(self.calls.items())),
+                "failures": dict(sorted(self.failures.items())),
+                "busy_seconds": {name: round(value, 2) for name, value in sorted(self.busy_seconds.items())},
+            }
+
+
+class _FakeTicker:
+    def __init__(self, upstreams: Upstreams, symbol: str):
+        self._upstreams = upstreams
+        self.symbol = symbol.upper()
+
+    def history(self, period: str = "1d", **kwargs: Any) -> pd.DataFrame:
+        if not self._upstreams._call("yfinance", "history"):
+            raise requests.ConnectionError("yfinance stand-in failure")
+        return _history(self.symbol, period)
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        if not self._upstreams._call("yfinance", "info"):
+            raise requests.ConnectionError("yfinance stand-in failure")
+        name = dict(STOCK_SYMBOLS).get(self.symbol, self.symbol)
+        return {
+            "shortName": name, "longName": name, "currency": "USD", "exchange": "NMS",
+            "sector": "Technology", "industry": "Software", "marketCap": int(_price(self.symbol, 0) * 1e9),
+        }
+
+
+def _price(symbol: str, days_ago: int) -> float:
+    """Deterministic random-walk price of a symbol on a past day."""
+    rng = random.Random(symbol)
+    price = rng.uniform(20, 500)
+    for _ in range(30 - days_ago):
+        price *= 1 + rng.gauss(0, 0.02)
+    return round(price, 2)
+
+
+def _history(symbol: str, period: str) -> pd.DataFrame:
+    days = int(period[:-1]) if period.endswith("d") and period[:-1].isdigit() else 5
+    today = datetime.now().date()
+    index = pd.DatetimeIndex([today - timedelta(days=days_ago) for days_ago in range(days - 1, -1, -1)])
+    closes = [_price(symbol, days_ago) for days_ago in range(days - 1, -1, -1)]
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes}, index=index)
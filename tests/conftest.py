@@ -0,0 +1,35 @@
+"""Test configuration.
+
+The app reads its configuration at import time, so the in-memory Firestore
+and the other test settings are set here before any test imports it.
+"""
+import os
+
+os.environ["FIRESTORE_BACKEND"] = "memory"
+os.environ.setdefault("PERPLEXITY_API_KEY", "test")
+os.environ.setdefault("FIREBASE_WARMUP", "0")
+os.environ.setdefault("TTL_SWEEP_INTERVAL_SECONDS", "0")
+os.environ.setdefault("RATE_LIMIT", "0")
+
+import pytest
+
+import app.main  # noqa: F401 - imports the app first, so service modules resolve their cycles
+from app.services.firebase.client import db as _db
+
+
+@pytest.fixture(autouse=True)
+def db():
+    """The in-memory Firestore, emptied before each test."""
+    _db.reset()
+    _db.latency.clear()
+    yield _db
+    _db.latency.clear()
+
+
+@pytest.fixture
+def client():
+    """Test client running the app's startup and shutdown handlers."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(app.main.app) as test_client:
+        yield test_client
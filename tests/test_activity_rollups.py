@@ -0,0 +1,61 @@
+"""Daily activity rollups and their backfill from the raw events."""
+from datetime import date, datetime, timedelta
+
+from app.services.firebase import activity_rollups
+from app.services.firebase.activity_rollups import get_activity_rollups
+from app.services.firebase.events import record_event
+
+USER_ID = "user-1"
+
+
+def _store_legacy_event(db, day, activity_type="topic_view", category="stocks"):
+    db.collection("user_learning_activity").document().set({
+        "user_id": USER_ID,
+        "activity_type": activity_type,
+        "category": category,
+        "date": day,
+        "timestamp": datetime.fromisoformat(day),
+    })
+
+
+def _rollup_ids(db):
+    return sorted(ref.id for ref in db.collection("user_activity_rollups").list_documents())
+
+
+def test_earlier_events_are_backfilled_once(db, monkeypatch):
+    today = date.today()
+    _store_legacy_event(db, "2025-03-02")
+    _store_legacy_event(db, "2025-03-02", activity_type="tooltip_view")
+    record_event(USER_ID, "topic_view", topic_id="t1", category="crypto")
+
+    days = get_activity_rollups(USER_ID, date(2025, 1, 1), today + timedelta(days=90))
+
+    assert days["2025-03-02"] == {"total": 2, "articles": 1, "tooltips": 1, "categories": {"stocks": 1}}
+    assert days[today.isoformat()]["articles"] == 1
+    # Only months with events and the backfill marker are written, nothing for the future
+    assert _rollup_ids(db) == sorted([f"{USER_ID}_2025-03", f"{USER_ID}_{today:%Y-%m}", f"{USER_ID}_backfill"])
+
+    monkeypatch.setattr(activity_rollups, "rebuild_activity_rollups", lambda user_id: 1 / 0)
+    record_event(USER_ID, "topic_view", topic_id="t2", category="crypto")
+    assert get_activity_rollups(USER_ID, today, today)[today.isoformat()]["articles"] == 2
+
+
+def test_event_recorded_during_backfill_is_counted(db, monkeypatch):
+    today = date.today()
+    _store_legacy_event(db, today.isoformat())
+    count_events = activity_rollups._count_events
+    calls = []
+
+    def count_then_record(user_id):
+        counted = count_events(user_id)
+        if len(calls) == 1:
+            # Another request records an event after the events were counted
+            record_event(USER_ID, "tooltip_view", word="yield")
+        calls.append(user_id)
+        return counted
+
+    monkeypatch.setattr(activity_rollups, "_count_events", count_then_record)
+
+    days = get_activity_rollups(USER_ID, today, today)
+
+    assert days[today.isoformat()] == {"total": 2, "articles": 1, "tooltips": 1, "categories": {"stocks": 1}}
@@ -0,0 +1,59 @@
+"""Tests for response compression and gzip splicing."""
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware.compression import CompressionMiddleware, deflate_segment, gzip_splice
+from app.api.responses import PrecompressedJSONResponse, precompress
+
+ARTICLE = {"title": "Bonds", "content": "Coupons and yields. " * 200}
+
+
+@pytest.fixture
+def spliced_client():
+    api = FastAPI()
+
+    @api.get("/article")
+    def article():
+        return PrecompressedJSONResponse({"cached": True}, "article", precompress(ARTICLE))
+
+    @api.get("/small")
+    def small():
+        return {"ok": True}
+
+    api.add_middleware(CompressionMiddleware)
+    with TestClient(api) as test_client:
+        yield test_client
+
+
+def test_gzip_splice_joins_precompressed_segments():
+    parts = [b'{"a":', b'"' + b"x" * 5000 + b'"', b"}"]
+    body = gzip_splice([(parts[0], None), (parts[1], deflate_segment(parts[1])), (parts[2], None)])
+
+    assert gzip.decompress(body) == b"".join(parts)
+
+
+def test_precompressed_payload_is_spliced_into_envelope(spliced_client):
+    response = spliced_client.get("/article", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == {"cached": True, "article": ARTICLE}
+
+
+def test_identity_response_varies_on_accept_encoding(spliced_client):
+    response = spliced_client.get("/article", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert json.loads(response.content) == {"cached": True, "article": ARTICLE}
+
+
+def test_small_response_varies_on_accept_encoding(spliced_client):
+    response = spliced_client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
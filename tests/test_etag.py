@@ -0,0 +1,85 @@
+"""ETags and conditional GETs of cached content."""
+import time
+
+import pytest
+
+from app.api.middleware.etag import etag_matches, make_etag
+from app.api.routes import watchlist as watchlist_routes
+from app.services.firebase.cache import cache_research_article
+from app.services.firebase.selectedcategories import save_user_selected_categories
+from loadtest.upstreams import LatencyProfile, Upstreams
+
+USER_ID = "user-1"
+
+
+@pytest.fixture
+def upstreams():
+    instant = LatencyProfile(0.1, 0.2)
+    with Upstreams({name: instant for name in ("perplexity", "coingecko", "yahoo", "yfinance")}).install() as stand_ins:
+        yield stand_ins
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag("article", "t1", "v1")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_cached_research_answers_304_before_loading_it(client, upstreams, monkeypatch):
+    save_user_selected_categories(USER_ID, "beginner", ["Stocks"])
+    cache_research_article("AAPL", "stock", "beginner", {"title": "Apple"})
+    params = {"user_id": USER_ID, "asset_type": "stock"}
+
+    response = client.get("/watchlist/research/AAPL", params=params)
+    assert response.status_code == 200
+    assert response.json()["research_article"] == {"title": "Apple"}
+    etag = response.headers["etag"]
+
+    loads = []
+    monkeypatch.setattr(watchlist_routes, "get_cached_research_payload", lambda *args: loads.append(args))
+    response = client.get("/watchlist/research/AAPL", params=params, headers={"If-None-Match": f"W/{etag}"})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert loads == []
+
+
+def test_regenerated_research_changes_the_etag(client, upstreams):
+    save_user_selected_categories(USER_ID, "beginner", ["Stocks"])
+    cache_research_article("AAPL", "stock", "beginner", {"title": "Apple"})
+    params = {"user_id": USER_ID, "asset_type": "stock"}
+    etag = client.get("/watchlist/research/AAPL", params=params).headers["etag"]
+
+    cache_research_article("AAPL", "stock", "beginner", {"title": "Apple, revised"})
+    response = client.get("/watchlist/research/AAPL", params=params, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["research_article"] == {"title": "Apple, revised"}
+    assert response.headers["etag"] != etag
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_generated_article_etag_matches_the_version_cached_in_background(client, upstreams, db):
+    save_user_selected_categories(USER_ID, "beginner", ["Stocks"])
+    recommendations = client.get("/user/recommendedtopics", params={"user_id": USER_ID}).json()["recommendations"]
+    topic_id = next(iter(recommendations.values()))[0]["topic_id"]
+    cached = db.collection("article_cache").document(f"{topic_id}_beginner")
+
+    response = client.get(f"/article/topic/{topic_id}", params={"user_id": USER_ID})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    _wait_for(lambda: cached.get().exists)
+
+    response = client.get(f"/article/topic/{topic_id}", params={"user_id": USER_ID}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
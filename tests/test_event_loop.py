@@ -0,0 +1,95 @@
+"""The event loop must keep serving while routes wait on slow upstreams.
+
+Every upstream stand-in and every in-memory Firestore operation is slower
+than the loop watchdog's stall threshold, so a single blocking call made on
+the loop instead of a worker pool shows up as a stall.
+"""
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.main import app
+from app.services.monitoring import get_loop_stats, reset_loop_stats
+from loadtest.scenarios import RunState, make_users, seed_users
+from loadtest.upstreams import LatencyProfile, Upstreams
+
+CONCURRENT_ROUNDS = 3
+
+# Latency of every in-memory Firestore operation, above the stall threshold
+FIRESTORE_LATENCY_SECONDS = 0.12
+
+
+def _slow_upstreams() -> Upstreams:
+    market = LatencyProfile(150, 300)
+    return Upstreams({
+        "perplexity": LatencyProfile(400, 800),
+        "coingecko": market,
+        "yahoo": market,
+        "yfinance": market,
+    }, seed=1)
+
+
+async def _get(client: httpx.AsyncClient, state: RunState, path: str, **params) -> httpx.Response:
+    response = await client.get(path, params=params)
+    assert response.status_code == 200, f"{path}: {response.status_code} {response.text[:200]}"
+    state.harvest(response.json())
+    return response
+
+
+async def _exercise_endpoints() -> dict:
+    users = make_users(3, random.Random(1))
+    state = RunState()
+    async with app.router.lifespan_context(app):
+        await asyncio.to_thread(seed_users, users)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            # First visits generate the topics and the news feed
+            for user in users:
+                await _get(client, state, "/user/recommendedtopics", user_id=user.user_id)
+                await _get(client, state, "/dashboard/home/news", user_id=user.user_id)
+            assert state.topic_ids and state.news_ids
+            reset_loop_stats()
+
+            pending = []
+            for round_ in range(CONCURRENT_ROUNDS):
+                for user in users:
+                    symbol, asset_type = user.watchlist[round_ % len(user.watchlist)]
+                    pending += [
+                        _get(client, state, f"/article/topic/{state.topic_ids[round_ % len(state.topic_ids)]}", user_id=user.user_id),
+                        _get(client, state, f"/watchlist/research/{symbol}", user_id=user.user_id, asset_type=asset_type.value),
+                        _get(client, state, "/dashboard/home", user_id=user.user_id),
+                        _get(client, state, "/dashboard/home/essential", user_id=user.user_id),
+                        _get(client, state, f"/dashboard/news/{state.news_ids[round_ % len(state.news_ids)]}", user_id=user.user_id),
+                    ]
+            health = asyncio.create_task(_probe_health(client))
+            await asyncio.gather(*pending)
+            health.cancel()
+            return {"loop": get_loop_stats(), "health_ms": await health}
+
+
+async def _probe_health(client: httpx.AsyncClient) -> list:
+    """Time /health requests until cancelled."""
+    latencies = []
+    try:
+        while True:
+            started = time.perf_counter()
+            response = await client.get("/health")
+            assert response.status_code == 200
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.05)
+    except asyncio.CancelledError:
+        return latencies
+
+
+def test_loop_never_stalls_under_concurrent_slow_requests(db):
+    db.latency["default"] = FIRESTORE_LATENCY_SECONDS
+    with _slow_upstreams().install():
+        result = asyncio.run(_exercise_endpoints())
+
+    loop = result["loop"]
+    assert loop["samples"] > 0
+    assert loop["stalls"] == 0, f"event loop stalled: {loop['recent_stalls']}"
+    assert result["health_ms"]
+    assert max(result["health_ms"]) < 250
@@ -0,0 +1,54 @@
+"""The activity event pipeline and the views derived from its events."""
+from datetime import date
+
+from app.services.firebase.activity_rollups import get_activity_rollups
+from app.services.firebase.events import event_doc_id, record_event
+from app.services.firebase.reading_log import get_reading_index, track_viewed_topic
+
+USER_ID = "user-1"
+
+
+def _record_view(event_id):
+    return record_event(
+        USER_ID,
+        "topic_view",
+        event_id=event_id,
+        topic_id="bonds",
+        topic_title="Bonds",
+        category="fixed-income",
+        expertise_level="beginner",
+    )
+
+
+def test_repeated_event_is_recorded_once(db):
+    event_id = event_doc_id(USER_ID, "bonds", date.today().isoformat())
+
+    assert _record_view(event_id) is True
+    first_view = get_reading_index(USER_ID)["bonds"]["timestamp"]
+    assert _record_view(event_id) is False
+
+    events = list(db.collection("user_learning_activity").stream())
+    assert [doc.id for doc in events] == [event_id]
+    today = date.today().isoformat()
+    assert get_activity_rollups(USER_ID, date.today(), date.today())[today]["articles"] == 1
+    assert db.collection("user_streaks").document(USER_ID).get().to_dict()["total_articles"] == 1
+    # Recency fields still follow the latest view
+    assert get_reading_index(USER_ID)["bonds"]["timestamp"] > first_view
+
+
+def test_events_without_id_are_always_appended(db):
+    assert _record_view(None) is True
+    assert _record_view(None) is True
+
+    assert len(list(db.collection("user_learning_activity").stream())) == 2
+    assert db.collection("user_streaks").document(USER_ID).get().to_dict()["total_articles"] == 2
+
+
+def test_topic_views_are_keyed_by_user_topic_and_date(db):
+    for _ in range(2):
+        track_viewed_topic(USER_ID, "fixed-income", "bonds", topic_title="Bonds")
+
+    today = date.today().isoformat()
+    events = list(db.collection("user_learning_activity").stream())
+    assert [doc.id for doc in events] == [f"{USER_ID}_bonds_{today}"]
+    assert get_activity_rollups(USER_ID, date.today(), date.today())[today]["articles"] == 1
@@ -0,0 +1,123 @@
+"""Per-user rate limiting of requests and forced refreshes."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import rate_limit
+from app.api.middleware.rate_limit import (
+    REFRESH_BUDGET,
+    REQUESTS_BUDGET,
+    RateLimiter,
+    RateLimitMiddleware,
+    TokenBucket,
+)
+
+ORIGIN = "https://app.example.com"
+
+
+def _rate_limit_middleware(app):
+    """Find the rate limit middleware in the app's built middleware stack."""
+    layer = app.middleware_stack
+    while not isinstance(layer, RateLimitMiddleware):
+        layer = layer.app
+    return layer
+
+
+@pytest.fixture
+def limited_client(client, monkeypatch):
+    """Client of the app with a request burst of 2 and a refresh burst of 1, without refill."""
+    limiter = RateLimiter({REQUESTS_BUDGET: (2, 0), REFRESH_BUDGET: (1, 0)})
+    middleware = _rate_limit_middleware(client.app)
+    monkeypatch.setattr(middleware, "enabled", True)
+    monkeypatch.setattr(middleware, "limiter", limiter)
+    monkeypatch.setattr(rate_limit, "_limiter", limiter)
+    return client
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock of the token buckets."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def generation_client():
+    """Client of an app echoing the refresh flag it receives, with a refresh burst of 1."""
+    api = FastAPI()
+
+    @api.get("/summary")
+    def summary(refresh: bool = False):
+        return {"refresh": refresh}
+
+    limiter = RateLimiter({REQUESTS_BUDGET: (100, 0), REFRESH_BUDGET: (1, 0)})
+    api.add_middleware(RateLimitMiddleware, limiter=limiter, enabled=True)
+    with TestClient(api) as test_client:
+        yield test_client
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(capacity=2, rate=0.5)
+
+    assert bucket.take() == 0 and bucket.take() == 0
+    assert bucket.take() == pytest.approx(2.0)
+    clock[0] += 1
+    assert bucket.take() == pytest.approx(1.0)
+    clock[0] += 1
+    assert bucket.take() == 0
+    assert bucket.limited == 2
+
+
+def test_limiter_keeps_a_bucket_per_user_and_budget(clock):
+    limiter = RateLimiter({REQUESTS_BUDGET: (1, 0), REFRESH_BUDGET: (1, 0)}, max_buckets=2)
+
+    assert limiter.take("user:a", REQUESTS_BUDGET) == 0
+    assert limiter.take("user:a", REQUESTS_BUDGET) == 3600.0
+    assert limiter.take("user:a", REFRESH_BUDGET) == 0
+    assert limiter.take("user:b", REQUESTS_BUDGET) == 0
+    # The least recently used bucket was evicted and starts full again
+    assert limiter.take("user:a", REQUESTS_BUDGET) == 0
+    assert limiter.totals[REQUESTS_BUDGET] == {"allowed": 3, "limited": 1}
+
+
+def test_refresh_over_budget_is_degraded(generation_client):
+    params = {"user_id": "u1", "refresh": "true"}
+
+    first = generation_client.get("/summary", params=params)
+    assert first.json() == {"refresh": True}
+    assert "x-ratelimit-degraded" not in first.headers
+
+    second = generation_client.get("/summary", params=params)
+    assert second.status_code == 200
+    assert second.json() == {"refresh": False}
+    assert second.headers["x-ratelimit-degraded"] == "refresh"
+
+    # Other users keep their own refresh budget
+    assert generation_client.get("/summary", params={**params, "user_id": "u2"}).json() == {"refresh": True}
+
+
+def test_rejection_carries_cors_headers(limited_client):
+    for _ in range(2):
+        assert limited_client.get("/", params={"user_id": "u1"}, headers={"Origin": ORIGIN}).status_code == 200
+
+    response = limited_client.get("/", params={"user_id": "u1"}, headers={"Origin": ORIGIN})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3600"
+    assert response.headers["access-control-allow-origin"] in (ORIGIN, "*")
+
+
+def test_metrics_hide_user_ids_and_reset_only_on_post(limited_client):
+    for _ in range(3):
+        limited_client.get("/", params={"user_id": "alice@example.com"})
+
+    budget = limited_client.get("/metrics/rate-limits").json()["budgets"][REQUESTS_BUDGET]
+    assert budget["limited"] == 1
+    [top] = budget["top_limited_users"]
+    assert top["limited"] == 1
+    assert top["user"].startswith("user:") and "alice" not in top["user"]
+
+    assert limited_client.get("/metrics/rate-limits", params={"reset": "true"}).json()["budgets"][REQUESTS_BUDGET]["limited"] == 1
+    assert limited_client.post("/metrics/rate-limits/reset").status_code == 200
+    assert limited_client.get("/metrics/rate-limits").json()["budgets"][REQUESTS_BUDGET]["limited"] == 0
@@ -0,0 +1,54 @@
+"""The per-user reading index and its backfill from topic_view events."""
+from datetime import date, datetime
+
+from app.services.firebase.reading_log import get_reading_index, get_user_read_history, update_reading_index
+
+USER_ID = "user-1"
+
+
+def _store_legacy_view(db, topic_id, viewed_at, title=None):
+    db.collection("user_learning_activity").document().set({
+        "user_id": USER_ID,
+        "activity_type": "topic_view",
+        "topic_id": topic_id,
+        "topic_title": title or topic_id.title(),
+        "category": "stocks",
+        "timestamp": viewed_at,
+        "date": viewed_at.date().isoformat(),
+    })
+
+
+def _stored(db):
+    return db.collection("user_reading_index").document(USER_ID).get().to_dict()
+
+
+def test_index_is_backfilled_from_events_once(db):
+    _store_legacy_view(db, "dividends", datetime(2025, 3, 1, 9))
+    _store_legacy_view(db, "dividends", datetime(2025, 3, 4, 9), title="Dividends, revised")
+    _store_legacy_view(db, "etfs", datetime(2025, 3, 2, 9))
+
+    topics = get_reading_index(USER_ID)
+
+    assert set(topics) == {"dividends", "etfs"}
+    assert topics["dividends"]["topic_title"] == "Dividends, revised"
+    assert _stored(db)["backfilled"] is True
+
+    # Later reads use the stored index instead of scanning the events
+    _store_legacy_view(db, "bonds", datetime(2025, 3, 5, 9))
+    assert set(get_reading_index(USER_ID)) == {"dividends", "etfs"}
+
+
+def test_backfill_keeps_newer_indexed_views(db):
+    _store_legacy_view(db, "etfs", datetime(2025, 3, 2, 9), title="Old title")
+    update_reading_index(USER_ID, "etfs", "stocks", "New title", "beginner", datetime(2025, 3, 6, 9))
+
+    assert get_reading_index(USER_ID)["etfs"]["topic_title"] == "New title"
+
+
+def test_read_history_filters_index_by_date(db):
+    _store_legacy_view(db, "dividends", datetime(2025, 3, 1, 9))
+    _store_legacy_view(db, "etfs", datetime(2025, 3, 2, 9))
+
+    history = get_user_read_history(USER_ID, date(2025, 3, 2), date(2025, 3, 31))
+
+    assert [entry["topic_id"] for entry in history] == ["etfs"]
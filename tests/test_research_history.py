@@ -0,0 +1,56 @@
+"""Per-user research history and daily research counts."""
+from app.services.firebase.events import record_event
+from app.services.firebase.watchlist import (
+    _migrate_legacy_research_history,
+    get_popular_assets,
+    get_user_research_history,
+)
+
+USER_ID = "user-1"
+
+
+def _store_legacy_history(db):
+    db.collection("asset_research_history").document(USER_ID).set({
+        "user_id": USER_ID,
+        "items": [
+            {"symbol": "AAPL", "asset_type": "stock", "count": 3, "first_researched": "2024-01-01T00:00:00"},
+            {"symbol": "BTC", "asset_type": "crypto", "count": 1, "first_researched": "2024-02-01T00:00:00"},
+        ],
+    })
+
+
+def _research(symbol, asset_type):
+    record_event(USER_ID, "asset_research", symbol=symbol, asset_type=asset_type)
+
+
+def test_legacy_counts_are_added_to_new_counts(db):
+    _store_legacy_history(db)
+    _research("AAPL", "stock")
+
+    history = get_user_research_history(USER_ID)
+
+    assert [(item["symbol"], item["count"]) for item in history] == [("AAPL", 4), ("BTC", 1)]
+    stored = db.collection("asset_research_history").document(USER_ID).get().to_dict()
+    assert "items" not in stored
+    assert stored["assets"]["AAPL:stock"]["first_researched"] == "2024-01-01T00:00:00"
+    assert [(item["symbol"], item["count"]) for item in get_user_research_history(USER_ID)] == [("AAPL", 4), ("BTC", 1)]
+
+
+def test_concurrent_migrations_count_legacy_items_once(db):
+    _store_legacy_history(db)
+    history_ref = db.collection("asset_research_history").document(USER_ID)
+    # Both readers see the legacy document before either migrates it
+    first, second = history_ref.get(), history_ref.get()
+
+    _migrate_legacy_research_history(history_ref, {}, first.to_dict()["items"], first.update_time)
+    _migrate_legacy_research_history(history_ref, {}, second.to_dict()["items"], second.update_time)
+
+    assert history_ref.get().to_dict()["assets"]["AAPL:stock"]["count"] == 3
+
+
+def test_popular_assets_of_the_day(db):
+    for symbol, asset_type in [("AAPL", "stock"), ("BTC", "crypto"), ("AAPL", "stock")]:
+        _research(symbol, asset_type)
+
+    assert get_popular_assets(limit=1) == [{"symbol": "AAPL", "asset_type": "stock", "count": 2}]
+    assert get_popular_assets(day="2000-01-01") == []
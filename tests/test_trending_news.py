@@ -0,0 +1,31 @@
+"""Trending news lists and their per-item documents."""
+from datetime import datetime, timedelta
+
+from app.services.firebase.trending_news import (
+    cleanup_old_trending_news,
+    get_news_item_by_id,
+    store_trending_news,
+)
+
+
+def _item_ids(db):
+    return {doc.id for doc in db.collection("trending_news").stream()}
+
+
+def test_cleanup_deletes_only_expired_items(db):
+    store_trending_news([{"id": "fed-rates", "title": "Rates"}, {"id": "oil", "title": "Oil"}], "beginner")
+    expired = (datetime.now() - timedelta(minutes=1)).isoformat()
+    db.collection("trending_news").document("oil").update({"expires_at": expired})
+
+    cleanup_old_trending_news("advanced")
+
+    assert _item_ids(db) == {"fed-rates"}
+    assert get_news_item_by_id("fed-rates")["title"] == "Rates"
+
+
+def test_cleanup_keeps_items_listed_by_other_levels(db):
+    store_trending_news([{"id": "fed-rates", "title": "Rates"}], "beginner")
+
+    cleanup_old_trending_news("beginner")
+
+    assert _item_ids(db) == {"fed-rates"}
@@ -0,0 +1,109 @@
+"""Watchlist storage, including documents still using the legacy ``assets`` array."""
+from app.api.models import AssetType
+from app.api.routes import watchlist as watchlist_routes
+from app.services.firebase.watchlist import (
+    add_to_watchlist,
+    get_user_watchlists,
+    remove_from_watchlist,
+    update_watchlist_notes,
+)
+
+USER_ID = "user-1"
+
+
+def _store_legacy_watchlist(db, *symbols, items=None):
+    db.collection("watchlists").document(USER_ID).set({
+        "user_id": USER_ID,
+        "assets": [
+            {"symbol": symbol, "asset_type": "stock", "added_on": f"2024-01-0{i + 1}T00:00:00", "notes": ""}
+            for i, symbol in enumerate(symbols)
+        ],
+        **({"items": items} if items is not None else {}),
+    })
+
+
+def _stored(db):
+    return db.collection("watchlists").document(USER_ID).get().to_dict()
+
+
+def test_legacy_watchlist_is_migrated_on_read(db):
+    _store_legacy_watchlist(db, "AAPL", "MSFT")
+
+    assert [item["symbol"] for item in get_user_watchlists(USER_ID)] == ["AAPL", "MSFT"]
+    stored = _stored(db)
+    assert "assets" not in stored
+    assert set(stored["items"]) == {"AAPL:stock", "MSFT:stock"}
+
+
+def test_empty_legacy_array_keeps_items(db):
+    add_to_watchlist(USER_ID, "NVDA", AssetType.stock)
+    db.collection("watchlists").document(USER_ID).update({"assets": []})
+
+    assert [item["symbol"] for item in get_user_watchlists(USER_ID)] == ["NVDA"]
+    assert set(_stored(db)["items"]) == {"NVDA:stock"}
+
+
+def test_removed_legacy_item_stays_removed(db):
+    _store_legacy_watchlist(db, "AAPL", "MSFT")
+
+    remove_from_watchlist(USER_ID, "AAPL", AssetType.stock)
+
+    assert [item["symbol"] for item in get_user_watchlists(USER_ID)] == ["MSFT"]
+    assert [item["symbol"] for item in get_user_watchlists(USER_ID)] == ["MSFT"]
+
+
+def test_notes_update_of_legacy_item(db):
+    _store_legacy_watchlist(db, "AAPL")
+
+    assert update_watchlist_notes(USER_ID, "AAPL", AssetType.stock, "long term") is True
+    item = get_user_watchlists(USER_ID)[0]
+    assert item["notes"] == "long term"
+    assert item["added_on"] == "2024-01-01T00:00:00"
+
+
+def test_notes_update_does_not_create_items(db, client):
+    add_to_watchlist(USER_ID, "AAPL", AssetType.stock)
+
+    response = client.put(
+        "/watchlist/notes",
+        params={"user_id": USER_ID},
+        json={"symbol": "TSLA", "asset_type": "stock", "notes": "x"},
+    )
+
+    assert response.status_code == 404
+    assert set(_stored(db)["items"]) == {"AAPL:stock"}
+    response = client.put(
+        "/watchlist/notes",
+        params={"user_id": USER_ID},
+        json={"symbol": "AAPL", "asset_type": "stock", "notes": "x"},
+    )
+    assert response.status_code == 200
+    assert _stored(db)["items"]["AAPL:stock"]["notes"] == "x"
+
+
+def test_empty_watchlist_has_page_envelope(client):
+    response = client.get("/watchlist", params={"user_id": USER_ID})
+
+    assert response.status_code == 200
+    assert response.json() == {"watchlist": [], "count": 0, "total": 0, "next_cursor": None}
+
+
+def test_watchlist_pages_follow_cursor(db, client, monkeypatch):
+    _store_legacy_watchlist(db, "AAPL", "MSFT", "NVDA")
+
+    async def no_asset_info(*args, **kwargs):
+        raise AssertionError("projection should not fetch asset data")
+
+    monkeypatch.setattr(watchlist_routes, "get_asset_info_async", no_asset_info)
+    params = {"user_id": USER_ID, "limit": 2, "fields": "notes"}
+
+    first = client.get("/watchlist", params=params).json()
+    assert first["watchlist"] == [
+        {"symbol": "AAPL", "asset_type": "stock", "notes": ""},
+        {"symbol": "MSFT", "asset_type": "stock", "notes": ""},
+    ]
+    assert (first["count"], first["total"]) == (2, 3)
+
+    second = client.get("/watchlist", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [item["symbol"] for item in second["watchlist"]] == ["NVDA"]
+    assert (second["count"], second["total"], second["next_cursor"]) == (1, 3, None)